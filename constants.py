@@ -7,7 +7,11 @@ WINDOW = {
 }
 WINDOW.update({"aspect_ratio": WINDOW["width"] / WINDOW["height"]})
 WINDOW.update({"display": (WINDOW["width"], WINDOW["height"])})
-FRAME_RATE = 244 # FPS
+FRAME_RATE = 244 # FPS (max, while something changes or moves: the scene is only re-rendered when needed, see `FrameScheduler`)
+PULSE_FRAME_RATE = 30 # FPS (while only the glow of the king pulses)
+IDLE_FRAME_RATE = 10 # How often (per second) the game loop polls while nothing changes (nothing is re-rendered).
+MAX_FRAME_DELTA_TIME = 0.1 # seconds (max time step of the animations, e.g. for the first frame after an idle period)
+VSYNC = True # Sync the buffer swaps to the display's refresh rate (if the driver supports it).
 
 # ~ GUI
 ENABLE_GUI = False
@@ -30,6 +34,8 @@ STORE_MENU_BACKGROUND_IMAGE = 'images/menu/1.png'
 PAUSE_MENU_BACKGROUND_IMAGE = 'images/menu/2.png'
 PROMOTE_PAWN_BACKGROUND_IMAGE = 'images/menu/promote_pawn.png'
 GAME_OVER_BACKGROUND_IMAGE = 'images/menu/game_over.png'
+MAIN_MENU_3D_BACKGROUND = False # Draw the main menu (and its settings, store and credits) over the 3D scene, the camera orbiting the board, instead of its background image.
+MENU_CAMERA_ORBIT_SPEED = 10 # degrees per second (see `MAIN_MENU_3D_BACKGROUND`)
 DEFAULT_SELECTION = 0 # 0 := classic, 1 := wood, 2 := metal
 
 # ~ Pieces
@@ -41,24 +47,63 @@ PIECE_ABR_DICT.update({ v: k for k, v in PIECE_ABR_DICT.items() })
 # ~ Objects and textures
 MODEL_TEMPLATE = { "obj": None, "texture": None, "vao": None, "vbo": None, "model_matrix": None }
 CHESSBOARD_OBJECT_PATH = 'models/board/board.obj'
+BOARD_SQUARE_SIZE = 1.575 # Size of a chessboard square (in model units, i.e. before the pieces are scaled down).
 
 CLASSIC_CHESSBOARD_TEXTURE_PATH = 'models/board/board_black.png'
 WOOD_CHESSBOARD_TEXTURE_PATH = 'models/board/board_wood.png'
 RGB_CHESSBOARD_TEXTURE_PATH = 'models/board/board_rgb.png'
+CHESSBOARD_TEXTURE_PATHS = [WOOD_CHESSBOARD_TEXTURE_PATH, CLASSIC_CHESSBOARD_TEXTURE_PATH, RGB_CHESSBOARD_TEXTURE_PATH] # By board selection (0 := wood, 1 := classic, 2 := RGB)
+TEXTURE_ARRAY_LAYER_SIZE = 1024 # px (every skin of the board, and of the pieces, is scaled to this size to share one texture array)
 
 SQUARE_OBJECT_PATH = 'models/square.obj'
 HIGHLIGHTED_SQUARE_TEXTURE_PATH = 'models/highlighted_square.png'
 SELECTED_SQUARE_TEXTURE_PATH = 'models/selected_square.png'
 VALID_MOVES_SQUARE_TEXTURE_PATH = 'models/valid_moves_square.png'
 INVALID_MOVE_SQUARE_TEXTURE_PATH = 'models/invalid_move_square.png'
+BOARD_HIGHLIGHT_TEXTURE_PATHS = [HIGHLIGHTED_SQUARE_TEXTURE_PATH, SELECTED_SQUARE_TEXTURE_PATH, VALID_MOVES_SQUARE_TEXTURE_PATH, INVALID_MOVE_SQUARE_TEXTURE_PATH] # (In drawing order: a later highlight covers an earlier one on the same square.)
 
 PIECE_OBJECT_PATHS = { piece: f'models/pieces/objects/{piece}/{piece}.obj' for piece in PIECES }
 CLASSIC_PIECE_TEXTURE_PATHS = { color: { piece: f'models/pieces/classic/{piece}/{color}.png' for piece in PIECES } for color in PIECE_COLORS }
 WOOD_PIECE_TEXTURE_PATHS = { color: { piece: f'models/pieces/wood/{piece}/{color}.png' for piece in PIECES } for color in PIECE_COLORS }
 METAL_PIECE_TEXTURE_PATHS = { color: { piece: f'models/pieces/metal/{piece}/{color}.png' for piece in PIECES } for color in PIECE_COLORS }
+PIECE_TEXTURE_PATHS = [CLASSIC_PIECE_TEXTURE_PATHS, WOOD_PIECE_TEXTURE_PATHS, METAL_PIECE_TEXTURE_PATHS] # By piece selection (see `DEFAULT_SELECTION`)
 
 SKYBOX_PATHS = ['skybox/set_in_space', 'skybox/space_with_blackholes', 'skybox/insane_chess_fantasy_land1', 'skybox/insane_chess_fantasy_land2']
 
+# ~ Skybox streaming
+CACHE_DIR = '.cache' # Generated assets (e.g. low-resolution skybox previews) are stored here between runs.
+SKYBOX_PREVIEW_FACE_SIZE = 64 # px (low-resolution faces shown while the full-resolution faces stream in)
+SKYBOX_VRAM_BUDGET_MB = 64 # Caps the resolution of the cubemap faces so that all 6 faces (+ mipmaps) fit in this budget.
+SKYBOX_CACHE_SIZE = 2 # Number of decoded skyboxes kept in memory (i.e. the current one + the one being browsed in the store).
+
+# ~ Mesh LOD
+MESH_CACHE_DIR = f'{CACHE_DIR}/meshes' # The decimated piece meshes are generated on the first run and stored here.
+MESH_LOD_GRID_SIZES = [24, 12] # Grid resolution of the decimated LODs (LOD 1, LOD 2; LOD 0 is the original mesh; lower := coarser).
+MESH_LOD_SCREEN_RADII = [60, 35] # px (projected radius of the bounding sphere a piece needs to use LOD 0, LOD 1; smaller pieces use the next LOD)
+MESH_LOD_HYSTERESIS = 0.15 # A piece has to cross a threshold by this fraction before switching LODs (to avoid flickering).
+
+# ~ Shadows
+SHADOW_MAP_SIZE = 1024 # px (the light frustum is fitted to the board, so the shadow map doesn't need to match the window size)
+
+# ~ Dynamic resolution
+DYNAMIC_RESOLUTION = False # Render the 3D scene at a lower resolution when it's over budget (upscaled to the window; the overlays stay at the native resolution).
+DYNAMIC_RESOLUTION_FRAME_TIME_BUDGET = 12.0 # ms (GPU time of the 3D scene to hold)
+DYNAMIC_RESOLUTION_MIN_SCALE = 0.5 # Per axis (0.5 := a quarter of the pixels).
+DYNAMIC_RESOLUTION_MAX_SCALE = 1.0
+DYNAMIC_RESOLUTION_SCALE_STEP = 0.05 # The scale changes in steps of this (so the resolution doesn't change every frame).
+
+# ~ Profiler
+PROFILER_MAX_SAMPLES = 600 # Rolling window (per section) of the profiler overlay.
+PROFILER_OVERLAY_REFRESH_INTERVAL = 0.25 # seconds (the overlay's text is re-rendered this often)
+PROFILER_OVERLAY_FONT_SIZE = 14
+PROFILER_DUMP_DIR = 'profiles' # The profiler's statistics are written here (JSON and CSV) when dumped.
+
+# ~ Shaders
+FRAME_DATA_UNIFORM_BLOCK = "FrameData" # Uniform block (UBO) holding the per-frame view, projection, eye and light data.
+FRAME_DATA_BINDING_POINT = 0
+PIECE_ANIMATION_UNIFORM_BLOCK = "PieceAnimations" # Uniform block (UBO) holding the piece animations (written once per move).
+PIECE_ANIMATION_BINDING_POINT = 1
+
 # ~ Camera
 CAMERA_MOUSE_DRAG_SENSITIVITY = 0.1
 CAMERA_DEFAULT_YAW = {
@@ -71,21 +116,48 @@ CAMERA_MAX_DISTANCE = 5
 CAMERA_ZOOM_SCROLL_SENSITIVITY = 0.25
 
 # ~ Camera animation
-CAMERA_DEFAULT_ANIMATION_SPEED = 1.5
+CAMERA_SIDE_SWITCH_DURATION = 2.0 # seconds (to rotate the camera to the side of the player to move)
 CAMERA_USE_INTRO_ANIMATION = True
+CAMERA_INTRO_PATH = "20" # Any of `INTRO_CAMERA_PATHS` ("1" to "23"), or of the custom camera paths.
+CAMERA_PATHS_PATH = 'camera_paths.json' # Custom camera paths (optional, see `load_camera_paths`).
 CAMERA_ANIMATE_AFTER_MOVE = True
 CAMERA_ANIMATE_AFTER_MOVE_DELAY = 1200 # ms
 
 # ~ Piece animation
 PIECE_ANIMATION_DURATION = 1.0 # seconds
+PIECE_ANIMATION_MAX_HEIGHT = 2.5 # How high a piece is lifted while it moves (in board units, like `BOARD_SQUARE_SIZE`).
+PIECE_ANIMATION_SHAKE_INTENSITY = 0.05 # How far a piece shakes when it is lifted and put down (in board units).
+MAX_PIECE_ANIMATIONS = 8 # Slots of the animation table (evaluated in the vertex shaders, see `PieceAnimationTable`).
 DISPLAY_TURN = True
 BLACK_TURN_GLOW_COLOR = [1.0, 1.0, 0.0]  # Yellow for black king
 WHITE_TURN_GLOW_COLOR = [0.0, 0.0, 1.0]  # Blue for white king
 CHECK_TURN_GLOW_COLOR = [1.0, 0.0, 0.0]  # Red for both when in check
 
-# ~ HUD items
-HUD_TEXT_MODEL_OBJECT_PATH = 'models/hud_items/hud_text.obj'
-HUD_TEXT_EXAMPLE_TEXTURE_PATH = 'models/hud_items/text_example.png'
+# ~ HUD text
+ENABLE_HUD_TEXT = True # Draw whose turn it is, check and the move list over the scene.
+HUD_FONT_PATH = None # None := pygame's default font.
+HUD_FONT_SIZE = 28
+HUD_TEXT_MARGIN = 16 # px (from the edges of the window)
+HUD_TEXT_COLOR = (1.0, 1.0, 1.0, 1.0)
+HUD_TEXT_ALERT_COLOR = (1.0, 0.35, 0.3, 1.0) # (Check and the result.)
+HUD_MOVE_LIST_LENGTH = 12 # Full moves shown (the latest ones).
+
+# ~ Sounds
+SOUND_EFFECTS = { # name -> (path, volume); decoded on first use (see `SoundBank`).
+    "move_start": ('./sounds/start_move.mp3', 1.0),
+    "move_end": ('./sounds/end_move.mp3', 1.0),
+    "capture": ('./sounds/capture.mp3', 1.0),
+    "check": ('./sounds/move-check.mp3', 1.0),
+    "invalid_move": ('./sounds/invalid-move.mp3', 0.25),
+    "notify": ('./sounds/notify.mp3', 1.0),
+    "game_end": ('./sounds/game-end.mp3', 1.0),
+    "click": ('./sounds/item_click.wav', 1.0),
+    "game_start": ('./sounds/game-start.mp3', 1.0),
+}
+HOT_SOUNDS = ("move_start", "move_end", "capture", "check") # Decoded on a background thread when the game starts.
+SOUND_CHANNELS = 8 # Sound effects played at once (the oldest one is cut off).
+MENU_MUSIC = ('./sounds/menu.mp3', 0.5) # (path, volume); music is streamed.
+AMBIENCE_MUSIC = [('./sounds/chill.mp3', 0.2), ('./sounds/orchestra.mp3', 0.1), ('./sounds/beats.mp3', 0.2)] # By ambience selection (past the end := off).
 
 # ~ Custom pygame events
 ROTATE_CAMERA_EVENT = USEREVENT + 1
@@ -93,6 +165,11 @@ DISABLE_INVALID_MOVE_SQUARE_EVENT = USEREVENT + 2
 DELAYED_MOVE_SOUND_EVENT = USEREVENT + 3
 RESET_GAME_EVENT = USEREVENT + 4
 
+# ~ Debug keys
+TOGGLE_PROFILER_OVERLAY_KEY = K_F3
+DUMP_PROFILE_KEY = K_F4
+TOGGLE_DYNAMIC_RESOLUTION_KEY = K_F5
+
 INVALID_MOVE_SQUARE_FLASH_DURATION = 500 # ms
 MOUSE_POSITION_DELTA = 2.1 # Delta that determines a click, in pixels
 
@@ -1,6 +1,5 @@
 # Third-party imports.
 import chess
-from stockfish import Stockfish
 import platform
 
 # Local application imports.
@@ -8,28 +7,21 @@ from constants import STOCKFISH_PATH_WINDOWS, STOCKFISH_PATH_LINUX, AI_OPPONENT_
 
 class ChessGame:
     def __init__(self, game_settings=None):
-        # Automatically detect the OS and set the appropriate path for Stockfish.
-        if platform.system() == 'Windows': stockfish_path = STOCKFISH_PATH_WINDOWS
-        else: stockfish_path = STOCKFISH_PATH_LINUX
-
-        # Initialize the Stockfish engine and python-chess board.
-        self.engine = Stockfish(path=stockfish_path, parameters={
-                "Threads": 2, 
-                "Minimum Thinking Time": 30
-            }) # (using the `stockfish` library)
+        # Initialize the python-chess board. (The Stockfish engine is started on first use, see `get_engine`.)
+        self.engine = None
         self.board = chess.Board() # (using the `python-chess` library)
         
         # AI opponent settings.
         if game_settings:
             self.ai_opponent_enabled = game_settings["ai_opponent_enabled"]
-            self.engine.set_skill_level(game_settings["ai_elo"])
+            self.ai_elo = game_settings["ai_elo"]
             self.piece_selection = game_settings["selected_piece"]
             self.board_selection = game_settings["selected_board"]
             self.ambience_selection = game_settings["selected_ambience"]
             self.skybox_selection = game_settings["selected_skybox"]
         else:
             self.ai_opponent_enabled = AI_OPPONENT_DEFAULT_ENABLED
-            self.engine.set_skill_level(AI_OPPONENT_DEFAULT_ELO)
+            self.ai_elo = AI_OPPONENT_DEFAULT_ELO
             self.piece_selection = DEFAULT_SELECTION
             self.board_selection = DEFAULT_SELECTION
             self.ambience_selection = DEFAULT_SELECTION
@@ -41,6 +33,14 @@ class ChessGame:
         # Promote pawn settings.
         self.pawn_promotion_selection = None
         
+    # ~ Game
+    def reset(self):
+        ''' Starts a new game with the same settings (and the same Stockfish process, if it was started). '''
+        self.board = chess.Board()
+        if self.engine: self.engine.set_position([])
+        self.go_to_main_menu = False
+        self.pawn_promotion_selection = None
+    
     # ~ Settings
     def get_settings(self):
         return {
@@ -95,11 +95,29 @@ class ChessGame:
         return self.go_to_main_menu
 
     # ~ AI opponent
+    def get_engine(self):
+        ''' Returns the Stockfish engine, started on first use (i.e. the first AI move) in the position of the board. '''
+        if self.engine is None:
+            from stockfish import Stockfish # (Imported here, so a game without the AI opponent never loads it.)
+            
+            # Automatically detect the OS and set the appropriate path for Stockfish.
+            if platform.system() == 'Windows': stockfish_path = STOCKFISH_PATH_WINDOWS
+            else: stockfish_path = STOCKFISH_PATH_LINUX
+            
+            self.engine = Stockfish(path=stockfish_path, parameters={
+                    "Threads": 2, 
+                    "Minimum Thinking Time": 30
+                }) # (using the `stockfish` library)
+            self.engine.set_skill_level(self.ai_elo)
+            self.engine.set_position([move.uci() for move in self.board.move_stack])
+        return self.engine
+    
     def set_ai_elo(self, elo):
-        self.engine.set_skill_level(elo)
+        self.ai_elo = elo
+        if self.engine: self.engine.set_skill_level(elo)
         
     def get_ai_elo(self):
-        return self.engine.get_parameters()["Skill Level"]
+        return self.ai_elo
     
     def set_ai_opponent_enabled(self, enabled):
         self.ai_opponent_enabled = enabled
@@ -108,7 +126,7 @@ class ChessGame:
         return self.ai_opponent_enabled
     
     def make_ai_move(self):
-        best_move = self.engine.get_best_move()
+        best_move = self.get_engine().get_best_move()
         if best_move:
             self.make_move(best_move)
             return best_move
@@ -117,13 +135,13 @@ class ChessGame:
     
     # ~ Game State
     def set_position(self, moves):
-        # Update both the `stockfish` engine and `python-chess` board.
-        self.engine.set_position(moves)
+        # Update both the `stockfish` engine (if started) and `python-chess` board.
+        if self.engine: self.engine.set_position(moves)
         self.board = chess.Board()
         for move in moves: self.board.push(chess.Move.from_uci(move))
 
     def make_move(self, move):
-        if not self.engine.is_move_correct(move):
+        if not self.is_move_legal(move):
             # Check if the move needs pawn promotion.
             try:
                 if chess.Move.from_uci(move + 'q') in self.board.legal_moves:
@@ -136,12 +154,17 @@ class ChessGame:
             
             return False
         
-        # Update both the `stockfish` engine and `python-chess` board.
-        self.engine.make_moves_from_current_position([move])
+        # Update both the `stockfish` engine (if started) and `python-chess` board.
+        if self.engine: self.engine.make_moves_from_current_position([move])
         self.board.push(chess.Move.from_uci(move))
         
         return True
     
+    def is_move_legal(self, move):
+        ''' Returns whether the UCI move is legal on the board (checked by python-chess, so the engine isn't needed). '''
+        try: return chess.Move.from_uci(move) in self.board.legal_moves
+        except ValueError: return False
+    
     def get_game_result(self):
         '''Check the game result using python-chess library'''
         if self.board.is_checkmate(): return "white" if self.board.turn == chess.BLACK else "black"
@@ -159,7 +182,7 @@ class ChessGame:
 
     # ~ Board
     def get_board_visual(self):
-        return self.engine.get_board_visual()
+        return self.get_engine().get_board_visual()
     
     def get_2d_board_array(self):
             ''' 
@@ -183,7 +206,7 @@ class ChessGame:
                 row = []
                 for file in range(8):  # 0 to 7, corresponding to 'a' to 'h' ("files" are columns)
                     square = f'{chr(97 + file)}{rank}'  # From 'a1' to 'h8'
-                    row.append(self.engine.get_what_is_on_square(square))
+                    row.append(self.get_engine().get_what_is_on_square(square))
                     
                 board.insert(0, row)  # Insert rows at the beginning to start from 'a1'
                 
@@ -218,7 +241,7 @@ class ChessGame:
     # ~ Cleanup
     def __del__(self):
         ''' Properly terminate the Stockfish engine process when the ChessGame object is deleted '''
-        self.engine.__del__()
+        if self.engine: self.engine.__del__()
 
 if __name__ == "__main__":
     # Example usage:
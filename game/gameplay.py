@@ -5,45 +5,47 @@ import numpy as np
 import pygame
 import chess
 import math
+import os
+import time
 
 # Local application imports.
-from constants import WINDOW, FRAME_RATE, PIECE_ANIMATION_DURATION, CAMERA_DEFAULT_YAW, CAMERA_DEFAULT_PITCH, CAMERA_ANIMATE_AFTER_MOVE, CAMERA_ANIMATE_AFTER_MOVE_DELAY, ROTATE_CAMERA_EVENT, DISABLE_INVALID_MOVE_SQUARE_EVENT, INVALID_MOVE_SQUARE_FLASH_DURATION, DELAYED_MOVE_SOUND_EVENT, RESET_GAME_EVENT
+from constants import WINDOW, FRAME_RATE, PULSE_FRAME_RATE, IDLE_FRAME_RATE, MAX_FRAME_DELTA_TIME, PIECE_ANIMATION_DURATION, CAMERA_DEFAULT_YAW, CAMERA_DEFAULT_PITCH, CAMERA_ANIMATE_AFTER_MOVE, CAMERA_ANIMATE_AFTER_MOVE_DELAY, ROTATE_CAMERA_EVENT, DISABLE_INVALID_MOVE_SQUARE_EVENT, INVALID_MOVE_SQUARE_FLASH_DURATION, DELAYED_MOVE_SOUND_EVENT, RESET_GAME_EVENT, TOGGLE_PROFILER_OVERLAY_KEY, DUMP_PROFILE_KEY, TOGGLE_DYNAMIC_RESOLUTION_KEY, PROFILER_DUMP_DIR, HOT_SOUNDS
 from game.chess_game import ChessGame
 # from graphics.graphics_2d import pixel_to_board_coords, board_coords_to_notation, display_endgame_message, display_turn_indicator
-from graphics.graphics_3d import handle_mouse_events, create_piece_animation, start_camera_rotation_animation #, get_ray_from_mouse, intersect_ray_with_plane, determine_square_from_intersection
+from graphics.graphics_3d import handle_mouse_events, create_piece_animation, start_camera_rotation_animation, is_scene_animating, is_scene_pulsing, toggle_profiler_overlay, toggle_dynamic_resolution, pick_square
 from util.game import notation_to_coords
 from util.guiV3 import SimpleGUI
-from util.gui_ext import setup_gui
-
-pygame.mixer.init()
+from util.gui_ext import setup_gui, update_gui, post_gui_event
+from util.frame_scheduler import FrameScheduler
+from util.profiler import profiler
+from util.sound_bank import sound_bank
 
 # Global variables.
 game: Optional['ChessGame'] = None
 gui: Optional['SimpleGUI'] = None
-clock: Optional['pygame.time.Clock'] = None
+scheduler: Optional[FrameScheduler] = None # Decides when the scene is re-rendered (render on demand).
 selected_square: Optional[str] = None  # Keep track of the user-selected square.
 valid_move_squares: Optional[List[Tuple[int, int]]] = None # Displays highlighted squares that the user can move to.
 highlighted_square: Tuple[int, int] = notation_to_coords('d2')  # Currently highlighted square coordinates (file, rank)
 last_highlighted_white: Tuple[int, int] = notation_to_coords('d2')
 last_highlighted_black: Tuple[int, int] = notation_to_coords('e7')
 is_selected: bool = False  # State to track if a square is selected
-end_move_sound = pygame.mixer.Sound('./sounds/end_move.mp3')
-start_move_sound = pygame.mixer.Sound('./sounds/start_move.mp3')
-capture_sound = pygame.mixer.Sound('./sounds/capture.mp3')
 side_to_rotate_to = None
 invalid_move_square = None
 
 # ~ Main
-def gameplay_setup(game_settings=None):
-    global game, clock, highlighted_square, last_highlighted_white, last_highlighted_black
-    game = ChessGame(game_settings)
+def gameplay_setup():
+    ''' Sets up the session (once): pygame, the game (and its engine, see `ChessGame.reset`) and the HUD window are reused by every game. '''
+    global game, gui, scheduler, highlighted_square, last_highlighted_white, last_highlighted_black
+    game = ChessGame()
     gui = setup_gui(game)
     
     # Initialize pygame.
     pygame.init()
     pygame.font.init()
     pygame.display.set_caption("3D Chess")
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler(FRAME_RATE, PULSE_FRAME_RATE, IDLE_FRAME_RATE, MAX_FRAME_DELTA_TIME)
+    sound_bank.preload(HOT_SOUNDS) # Decode the sounds of a move while the menu and the scene load.
     
     # Set the initial highlighted square based on the player's turn
     highlighted_square = last_highlighted_white if game.get_whos_turn() == "white" else last_highlighted_black
@@ -51,10 +53,16 @@ def gameplay_setup(game_settings=None):
     return game, gui
 
 # ~ Game loop
+def wait_for_next_frame():
+    ''' Sleeps until the next frame is due (or until an event arrives, see `FrameScheduler`). '''
+    scheduler.wait(is_scene_animating(), is_scene_pulsing())
+
 def pre_draw_gameloop():
-    global clock, highlighted_square, selected_square, valid_move_squares, is_selected, invalid_move_square
-    clock.tick(FRAME_RATE)
+    global highlighted_square, selected_square, valid_move_squares, is_selected, invalid_move_square
+    
+    # Every event (input, timers, window) may change the scene.
     events = pygame.event.get()
+    if events: scheduler.request_redraw()
     
     # Check if awaiting a successful pawn promotion.
     pawn_promotion_selection = game.get_pawn_promotion_selection()
@@ -91,6 +99,9 @@ def pre_draw_gameloop():
                 print("Selected square cleared.")
             elif event.key == pygame.K_ESCAPE:
                 return 'pause'
+            elif event.key == TOGGLE_PROFILER_OVERLAY_KEY: toggle_profiler_overlay()
+            elif event.key == DUMP_PROFILE_KEY: dump_profile()
+            elif event.key == TOGGLE_DYNAMIC_RESOLUTION_KEY: toggle_dynamic_resolution()
                 
         elif event.type == ROTATE_CAMERA_EVENT:
             start_camera_rotation_animation(CAMERA_DEFAULT_YAW[side_to_rotate_to], CAMERA_DEFAULT_PITCH)
@@ -99,7 +110,7 @@ def pre_draw_gameloop():
             invalid_move_square = None
 
         elif event.type == DELAYED_MOVE_SOUND_EVENT:
-            end_move_sound.play()
+            sound_bank.play("move_end")
             
         elif event.type == RESET_GAME_EVENT:
             highlighted_square = notation_to_coords('d2')
@@ -108,12 +119,27 @@ def pre_draw_gameloop():
             selected_square = False
             is_selected = False
             invalid_move_square = None
+            post_gui_event(gui, "game_reset")
                 
-    handle_mouse_events(events)
+    click_position = handle_mouse_events(events)
+    if click_position:
+        result = handle_mouse_click(*click_position, pawn_promotion_selection)
+        if result == 'needs_pawn_promotion': return result
     attempt_move_ai_opponent()
     
+    # Update the HUD window (only does work after a game state change, or when Tk has pending events, see `update_gui`).
+    if gui:
+        with profiler.section("update_gui"): update_gui(gui, game)
+    
     return { 'highlighted_square': highlighted_square, 'selected_square': selected_square, 'valid_move_squares': valid_move_squares, 'invalid_move_square': invalid_move_square }
 
+def begin_frame():
+    ''' Returns the time step (in seconds) of the next frame if the scene needs to be re-rendered now, else None. '''
+    return scheduler.begin_frame(is_scene_animating(), is_scene_pulsing())
+
+def request_redraw():
+    scheduler.request_redraw()
+
 def post_draw_gameloop():
     # Display endgame message if the game is over.
     global game
@@ -124,7 +150,14 @@ def post_draw_gameloop():
 
     # Draw everything to the screen.
     pygame.display.flip()
-    pygame.time.wait(10)
+
+def dump_profile():
+    ''' Writes the profiler's statistics (shown by the overlay, see `toggle_profiler_overlay`) to a JSON and a CSV file. '''
+    os.makedirs(PROFILER_DUMP_DIR, exist_ok=True)
+    path = os.path.join(PROFILER_DUMP_DIR, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+    profiler.dump_json(f"{path}.json")
+    profiler.dump_csv(f"{path}.csv")
+    print(f"Profile written to {path}.json/.csv")
 
 def rotate_camera_to_side(side):
     global side_to_rotate_to
@@ -134,6 +167,7 @@ def rotate_camera_to_side(side):
 def set_invalid_move_square(square):
     global invalid_move_square
     invalid_move_square = square
+    sound_bank.play("invalid_move")
     pygame.time.set_timer(DISABLE_INVALID_MOVE_SQUARE_EVENT, INVALID_MOVE_SQUARE_FLASH_DURATION, 1)
 
 # ~ Click detection (for 2D graphics)
@@ -147,10 +181,26 @@ def set_invalid_move_square(square):
 #             if selected_square and selected_square != clicked_square: process_move(clicked_square)
 #             else: select_square(clicked_square)
 
-# ~ TODO: Click detection (for 3D graphics)
-def handle_mouse_click(x, y): 
-    # print(f"Accessed handle_mouse_click with: {x}, {y}")
-    pass
+# ~ Click detection (for 3D graphics)
+def handle_mouse_click(x, y, pawn_promotion_selection=None):
+    ''' Selects the clicked square (a piece of the side to move), or moves the selected piece to it (see `pick_square`). '''
+    global highlighted_square, selected_square, valid_move_squares, is_selected
+    square = pick_square(x, y)
+    if square is None: return
+    highlighted_square = square
+    
+    # Clicking the selected piece again clears the selection, and clicking another piece of the side to move selects it instead.
+    piece = game.board.piece_at(square[1] * 8 + square[0])
+    is_own_piece = piece is not None and game.get_whos_turn() == ("white" if piece.color == chess.WHITE else "black")
+    if selected_square and square == selected_square:
+        selected_square = None
+        valid_move_squares = None
+        print("Selected square cleared.")
+    elif selected_square and not is_own_piece:
+        result = process_move(square, pawn_promotion_selection)
+        if result == 'needs_pawn_promotion': return result
+    else: select_square(square)
+    is_selected = bool(selected_square)
 
 # ~ Movement
 def move_highlighted_square(direction: str) -> Tuple[int, int]:
@@ -199,7 +249,7 @@ def process_move(target_square: Tuple[int, int], pawn_promotion_selection=None):
             create_piece_animation(from_square_name, to_square_name, piece_symbol, start_time, PIECE_ANIMATION_DURATION)
             post_successful_move_processing(move, target_square)
             if piece and piece_after and piece.color != piece_after.color:
-                capture_sound.play()
+                sound_bank.play("capture")
 
         elif result == False:
             print(f"Invalid move: {move}")
@@ -213,8 +263,10 @@ def post_successful_move_processing(move=None, target_square=None):
     
     print(f"~ You moved: {move}")
     is_selected = False
+    post_gui_event(gui, "move_made")
     game.display_whos_turn()
     play_move_sound()
+    if game.board.is_check(): sound_bank.play("check")
     
     if game.get_ai_opponent_enabled(): return
     if CAMERA_ANIMATE_AFTER_MOVE: rotate_camera_to_side(game.get_whos_turn())
@@ -228,7 +280,7 @@ def post_successful_move_processing(move=None, target_square=None):
         highlighted_square = last_highlighted_white
 
 def play_move_sound():
-    start_move_sound.play()
+    sound_bank.play("move_start")
     pygame.time.set_timer(DELAYED_MOVE_SOUND_EVENT, int(math.floor(PIECE_ANIMATION_DURATION * 1000)), 1)
 
 def select_square(square_to_select: Tuple[int, int]):
@@ -275,5 +327,8 @@ def attempt_move_ai_opponent():
             start_time = pygame.time.get_ticks() / 1000.0
             create_piece_animation(from_square, to_square, piece_symbol, start_time, PIECE_ANIMATION_DURATION)
 
+            scheduler.request_redraw()
+            post_gui_event(gui, "move_made")
             print(f"~ AI moved: {ai_move}")
             game.display_whos_turn()
+            if game.board.is_check(): sound_bank.play("check")
@@ -1,3 +1,5 @@
+import json
+import os
 import numpy as np
 import pygame
 import random
@@ -9,182 +11,345 @@ def ease_in_out(t):
         f = ((2 * t) - 2)
         return 0.5 * f * f * f + 1
 
-def add_shake(position, progress, max_intensity):
-    # Interpolate the shake intensity based on progress
-    shake_intensity = ease_in_out(progress) * max_intensity
-    shake = np.random.uniform(-shake_intensity, shake_intensity, size=position.shape)
-    shake[1] = 0  # No shake on the y-axis
-    return position + shake
-
-# ~ Camera animation
-def build_intro_camera_animations(yaw, pitch, camera_distance): return {
-    "1": [ # "Grand Entrance"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 10, "time": 0},  # Start from top-down
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(45), "distance": 5, "time": 3},  # Spin around above the board
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(30), "distance": 3, "time": 5},  # Move to a lower side-view
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 8}  # Ease to starting point
-    ],
-    "2": [ # "Orbit Descend"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 12, "time": 0},  # Start from high top-down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(60), "distance": 6, "time": 4},  # Descend halfway around the board
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(30), "distance": 4, "time": 7},  # Complete the orbit closer
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 10}  # Ease to starting point
-    ],
-    "3": [ # "Aerial Spiral"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 15, "time": 0},  # Start from very high top-down
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(80), "distance": 8, "time": 2},  # Quick descent to side
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(80), "distance": 8, "time": 4},  # Continue orbit at same elevation
-        {"yaw": np.deg2rad(450), "pitch": np.deg2rad(80), "distance": 8, "time": 6},  # Complete the orbit
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 9}  # Ease to starting point
-    ],
-    "4": [ # "Hovering Glide"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 10, "time": 0},  # Start from top-down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(45), "distance": 5, "time": 3},  # Half orbit to side-view
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(10), "distance": 5, "time": 5},  # Lower the pitch for a flatter view
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(10), "distance": 5, "time": 7},  # Complete the orbit at flatter angle
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 9}  # Ease to starting point
-    ],
-    "5": [ # "Double Helix"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 15, "time": 0},  # Start from high top-down
-        {"yaw": np.deg2rad(720), "pitch": np.deg2rad(45), "distance": 5, "time": 5},  # Double spin around the board
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 8}  # Ease to starting point
-    ],
-    "6": [ # "Vertical Dive"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 10, "time": 0},  # Start from top-down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(90), "distance": 10, "time": 2},  # Descend to a vertical side-view
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(45), "distance": 3, "time": 4},  # Lower the pitch for a closer view
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(45), "distance": 3, "time": 6},  # Orbit around the board at angle
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 8}  # Ease to starting point
-    ],
-    "7": [ # "Elevated Carousel"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 12, "time": 0},  # Start from high top-down
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(60), "distance": 7, "time": 3},  # Descend to a high side-view
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(60), "distance": 7, "time": 5},  # Continue orbit at same elevation
-        {"yaw": np.deg2rad(450), "pitch": np.deg2rad(60), "distance": 7, "time": 7},  # Complete the orbit
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 9}  # Ease to starting point
-    ],
-    "8": [ # "Sky Dancer"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 14, "time": 0},  # Start from very high top-down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(70), "distance": 6, "time": 3},  # Half orbit to a high side-view
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(70), "distance": 6, "time": 5},  # Complete the orbit at same elevation
-        {"yaw": np.deg2rad(540), "pitch": np.deg2rad(70), "distance": 6, "time": 7},  # Continue spinning around
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 10}  # Ease to starting point
-    ],
-    "9": [ # "Serene Orbit"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 12, "time": 0},  # Start from high top-down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(45), "distance": 8, "time": 3},  # Begin orbit descent
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(30), "distance": 7, "time": 5},  # Continue gentle orbit
-        {"yaw": np.deg2rad(540), "pitch": np.deg2rad(20), "distance": 7, "time": 7},  # Further orbit with lower pitch
-        {"yaw": np.deg2rad(720), "pitch": np.deg2rad(10), "distance": 7, "time": 9},  # Complete the serene orbit
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 11}  # Ease to starting point
-    ],
-    "10": [ # "Celestial Glide"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 14, "time": 0},  # Start from a lofty top-down
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(80), "distance": 6, "time": 4},  # Steady descent in a wide orbit
-        {"yaw": np.deg2rad(720), "pitch": np.deg2rad(40), "distance": 4, "time": 8},  # Continue orbiting at lower altitude
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 12}  # Glide into the starting position
-    ],
-    "11": [ # "Panoramic Spiral"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 13, "time": 0},  # Begin from an expansive top-down
-        {"yaw": np.deg2rad(540), "pitch": np.deg2rad(60), "distance": 9, "time": 4},  # Spiral down in a panoramic orbit
-        {"yaw": np.deg2rad(1080), "pitch": np.deg2rad(20), "distance": 5, "time": 8},  # Continue the spiral closer to the board
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 12}  # Smoothly transition to the game view
-    ],
-    "12": [ # "Orbiting Observer"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 11, "time": 0},  # Start with a broad view from above
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(70), "distance": 7, "time": 3},  # Begin a high-altitude orbit
-        {"yaw": np.deg2rad(540), "pitch": np.deg2rad(50), "distance": 7, "time": 6},  # Maintain orbit with a slight descent
-        {"yaw": np.deg2rad(810), "pitch": np.deg2rad(30), "distance": 7, "time": 9},  # Continue orbiting with a gradual approach
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 12}  # Conclude with a smooth transition to start
-    ],
-    "13": [  # "Swift Approach"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 12, "time": 0}, # Start high and distant for a full view
-        {"yaw": np.deg2rad(60), "pitch": np.deg2rad(45), "distance": 9, "time": 1}, # Begin descent with a slight turn
-        {"yaw": np.deg2rad(120), "pitch": np.deg2rad(45), "distance": 6, "time": 2}, # Continue turning, coming in closer
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(30), "distance": 4, "time": 3}, # Halfway through the orbit, lower the camera
-        {"yaw": np.deg2rad(240), "pitch": np.deg2rad(30), "distance": 3, "time": 4}, # Start to level out the pitch as we near the board
-        {"yaw": np.deg2rad(300), "pitch": np.deg2rad(15), "distance": 2, "time": 5}, # Final approach, almost level with the board
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6}, # Ease into the starting position
-    ],
-    "14": [  # "Rapid Orbit"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 14, "time": 0},
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(60), "distance": 11, "time": 1},
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(60), "distance": 8, "time": 2},
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(45), "distance": 5, "time": 3},
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(45), "distance": 3, "time": 4},
-        {"yaw": np.deg2rad(450), "pitch": np.deg2rad(30), "distance": 2, "time": 5},
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6},
-    ],
-    "15": [  # "Descending Spiral"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 13, "time": 0},
-        {"yaw": np.deg2rad(120), "pitch": np.deg2rad(75), "distance": 10, "time": 1},
-        {"yaw": np.deg2rad(240), "pitch": np.deg2rad(50), "distance": 7, "time": 2},
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(50), "distance": 5, "time": 3},
-        {"yaw": np.deg2rad(480), "pitch": np.deg2rad(25), "distance": 4, "time": 4},
-        {"yaw": np.deg2rad(600), "pitch": np.deg2rad(25), "distance": 3, "time": 5},
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6},
-    ],
-    "16": [  # "Glide and Slide"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 15, "time": 0},
-        {"yaw": np.deg2rad(70), "pitch": np.deg2rad(65), "distance": 12, "time": 1},
-        {"yaw": np.deg2rad(140), "pitch": np.deg2rad(65), "distance": 9, "time": 2},
-        {"yaw": np.deg2rad(210), "pitch": np.deg2rad(40), "distance": 6, "time": 3},
-        {"yaw": np.deg2rad(280), "pitch": np.deg2rad(40), "distance": 4, "time": 4},
-        {"yaw": np.deg2rad(350), "pitch": np.deg2rad(20), "distance": 3, "time": 5},
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6},
-    ],
-    "17": [  # "Hovering Advance"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 14, "time": 0},
-        {"yaw": np.deg2rad(50), "pitch": np.deg2rad(70), "distance": 11, "time": 1},
-        {"yaw": np.deg2rad(100), "pitch": np.deg2rad(70), "distance": 8, "time": 2},
-        {"yaw": np.deg2rad(150), "pitch": np.deg2rad(45), "distance": 6, "time": 3},
-        {"yaw": np.deg2rad(200), "pitch": np.deg2rad(45), "distance": 5, "time": 4},
-        {"yaw": np.deg2rad(250), "pitch": np.deg2rad(20), "distance": 4, "time": 5},
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6},
-    ],
-    "18": [  # "Circling Descent"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 16, "time": 0},
-        {"yaw": np.deg2rad(30), "pitch": np.deg2rad(80), "distance": 13, "time": 1},
-        {"yaw": np.deg2rad(60), "pitch": np.deg2rad(80), "distance": 10, "time": 2},
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(55), "distance": 8, "time": 3},
-        {"yaw": np.deg2rad(120), "pitch": np.deg2rad(55), "distance": 6, "time": 4},
-        {"yaw": np.deg2rad(150), "pitch": np.deg2rad(30), "distance": 5, "time": 5},
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6},
-    ],
-    "19": [  # "The Grand Panorama"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(0), "distance": 16, "time": 0}, # Begin with a panoramic view from above
-        {"yaw": np.deg2rad(30), "pitch": np.deg2rad(75), "distance": 14, "time": 0.5}, # Start the descent with a gentle turn
-        {"yaw": np.deg2rad(60), "pitch": np.deg2rad(70), "distance": 12, "time": 1}, # Continue the descent, orbiting the board
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(65), "distance": 10, "time": 1.5}, # Lower the pitch slightly, coming in closer
-        {"yaw": np.deg2rad(120), "pitch": np.deg2rad(60), "distance": 8, "time": 2}, # Keep the smooth descent with a steady turn
-        {"yaw": np.deg2rad(150), "pitch": np.deg2rad(55), "distance": 7, "time": 2.5}, # Halfway through the orbit, lower the camera further
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(50), "distance": 6, "time": 3}, # Continue the orbit, preparing for a closer look
-        {"yaw": np.deg2rad(210), "pitch": np.deg2rad(45), "distance": 5, "time": 3.5}, # Orbit closer to the board, lowering the pitch
-        {"yaw": np.deg2rad(240), "pitch": np.deg2rad(40), "distance": 4, "time": 4}, # Close in on the board, maintaining a steady orbit
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(35), "distance": 3.5, "time": 4.5}, # Start to level out the pitch as we near the game
-        {"yaw": np.deg2rad(300), "pitch": np.deg2rad(30), "distance": 3, "time": 5}, # Final approach, almost level with the board
-        {"yaw": np.deg2rad(330), "pitch": np.deg2rad(25), "distance": 2.5, "time": 5.5}, # Ease into the starting position, ready for the game
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 6}, # Settle into the starting position
-    ],
-    "20": [  # "Butterfly Dance" (* BEST ONE *)
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(90), "distance": 14, "time": 0},  # High above, looking straight down
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(45), "distance": 7, "time": 2},  # Swoop down, half orbit to side view
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 4},  # Glide into the starting position
-    ],
-    "21": [  # "Silken Slide" (* SECOND BEST *)
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(10), "distance": 10, "time": 0},  # Start slightly elevated from the end position
-        {"yaw": np.deg2rad(90), "pitch": np.deg2rad(20), "distance": 5, "time": 1.5},  # Smooth transition to a closer side view
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 3},  # Softly settle into the starting view
-    ],
-    "22": [  # "Velvet Orbit"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(30), "distance": 12, "time": 0},  # Begin with a gentle look from above
-        {"yaw": np.deg2rad(270), "pitch": np.deg2rad(45), "distance": 6, "time": 2},  # Graceful wide orbit around the board
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 4},  # Ease into the final position
-    ],
-    "23": [  # "CCurve"
-        {"yaw": np.deg2rad(1), "pitch": np.deg2rad(80), "distance": 15, "time": 0},  # High and distant, steep angle for drama
-        {"yaw": np.deg2rad(180), "pitch": np.deg2rad(60), "distance": 8, "time": 2},  # Smooth descent into a closer orbit
-        {"yaw": np.deg2rad(360), "pitch": np.deg2rad(40), "distance": 4, "time": 3.5},  # Continue the descent, circling the board
-        {"yaw": yaw, "pitch": pitch, "distance": camera_distance, "time": 5},  # Round off into the starting position
-    ],
-}
\ No newline at end of file
+def ease_in_out_array(t):
+    ''' `ease_in_out` of every element of an array. '''
+    f = 2 * t - 2
+    return np.where(t < 0.5, 4 * t * t * t, 0.5 * f * f * f + 1)
+
+# ~ Piece animations
+PIECE_ANIMATION_CURVES = { "arc": 0, "slide": 1 } # Curve ids (the same as `PIECE_ANIMATION_ARC` and `PIECE_ANIMATION_SLIDE` in shaders/common/piece_animation.glsl).
+
+class PieceAnimationTable:
+    def __init__(self, capacity, max_height, shake_intensity):
+        '''
+        This PieceAnimationTable class holds the piece animations in a fixed-size struct-of-arrays table, which is evaluated on the GPU.
+
+        Each slot holds the start and end positions (in board units, see `calc_square_position`), start time, duration and curve of a move.
+        The table is only written to its uniform block when an animation is added (see `write`): the vertex shaders lift, carry and shake
+        the pieces from the frame's `time` (see shaders/common/piece_animation.glsl), so nothing is computed per frame on the CPU.
+        The pieces stay on their end square on the CPU side (e.g. for the LODs and picking); each is drawn with its slot (see `get_shader_slot`).
+        A slot is recycled once its animation is over (see `recycle`).
+
+        :param max_height:          how high a piece is lifted by the arc (board units)
+        :param shake_intensity:     how far a piece shakes at the top of the arc (board units)
+        '''
+        self.capacity = capacity
+        self.max_height = max_height
+        self.shake_intensity = shake_intensity
+        self.start_positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.end_positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.start_times = np.zeros(capacity, dtype=np.float32)
+        self.durations = np.ones(capacity, dtype=np.float32)
+        self.curve_ids = np.zeros(capacity, dtype=np.float32)
+        self.end_times = np.full(capacity, -np.inf) # (-inf := free slot.)
+        self.square_names = [None] * capacity # The square each animated piece ends on.
+        self.slots = {} # square name -> slot
+        self.is_dirty = True # (The table has to be written to the uniform block.)
+
+    def add(self, start_position, end_position, square_name, start_time, duration, curve="arc"):
+        ''' Animates the piece that ends on `square_name` (replacing its previous animation, if any). Returns its slot. '''
+        slot = self.slots.get(square_name)
+        if slot is None:
+            # Take a free slot (or, if every slot is in use, the animation that ends first).
+            free_slots = np.flatnonzero(self.end_times <= start_time)
+            slot = int(free_slots[0]) if len(free_slots) else int(np.argmin(self.end_times))
+            self.release(slot)
+
+        self.start_positions[slot] = start_position
+        self.end_positions[slot] = end_position
+        self.start_times[slot] = start_time
+        self.durations[slot] = duration
+        self.curve_ids[slot] = PIECE_ANIMATION_CURVES[curve]
+        self.end_times[slot] = start_time + duration
+        self.square_names[slot] = square_name
+        self.slots[square_name] = slot
+        self.is_dirty = True
+        return slot
+
+    def release(self, slot):
+        if self.square_names[slot] is not None: del self.slots[self.square_names[slot]]
+        self.square_names[slot] = None
+        self.end_times[slot] = -np.inf
+
+    def recycle(self, time):
+        ''' Frees the slots of the animations that are over (nothing has to be re-uploaded: the shaders stop at the end of an animation). '''
+        for slot in np.flatnonzero(np.isfinite(self.end_times) & (self.end_times <= time)): self.release(int(slot))
+
+    def get_slot(self, square_name):
+        return self.slots.get(square_name)
+
+    def get_shader_slot(self, square_name):
+        ''' Returns the `animationSlot` uniform of the piece on `square_name`: its slot + 1 (0 := not animated). '''
+        slot = self.slots.get(square_name)
+        return 0 if slot is None else slot + 1
+
+    def is_active(self, time):
+        return bool(np.any(self.end_times > time))
+
+    def write(self, uniform_buffer):
+        ''' Writes the table to its uniform block (see `UniformBuffer`, uploaded by the caller). '''
+        uniform_buffer["animationStarts"] = np.column_stack((self.start_positions, self.start_times))
+        uniform_buffer["animationEnds"] = np.column_stack((self.end_positions, self.durations))
+        uniform_buffer["animationCurves"] = np.column_stack((self.curve_ids, np.zeros((self.capacity, 3))))
+        uniform_buffer["animationMaxHeight"] = self.max_height
+        uniform_buffer["animationShakeIntensity"] = self.shake_intensity
+        self.is_dirty = False
+
+# ~ Camera paths
+# Keyframes: (time (seconds), yaw (degrees), pitch (degrees), distance); None := the camera's resting position (i.e. where the intro ends).
+INTRO_CAMERA_PATHS = {
+    "1": { "name": "Grand Entrance", "keyframes": [
+        (0, 1, 0, 10),  # Start from top-down
+        (3, 360, 45, 5),  # Spin around above the board
+        (5, 180, 30, 3),  # Move to a lower side-view
+        (8, None, None, None),  # Ease to starting point
+    ]},
+    "2": { "name": "Orbit Descend", "keyframes": [
+        (0, 1, 0, 12),  # Start from high top-down
+        (4, 180, 60, 6),  # Descend halfway around the board
+        (7, 360, 30, 4),  # Complete the orbit closer
+        (10, None, None, None),  # Ease to starting point
+    ]},
+    "3": { "name": "Aerial Spiral", "keyframes": [
+        (0, 1, 0, 15),  # Start from very high top-down
+        (2, 90, 80, 8),  # Quick descent to side
+        (4, 270, 80, 8),  # Continue orbit at same elevation
+        (6, 450, 80, 8),  # Complete the orbit
+        (9, None, None, None),  # Ease to starting point
+    ]},
+    "4": { "name": "Hovering Glide", "keyframes": [
+        (0, 1, 0, 10),  # Start from top-down
+        (3, 180, 45, 5),  # Half orbit to side-view
+        (5, 180, 10, 5),  # Lower the pitch for a flatter view
+        (7, 360, 10, 5),  # Complete the orbit at flatter angle
+        (9, None, None, None),  # Ease to starting point
+    ]},
+    "5": { "name": "Double Helix", "keyframes": [
+        (0, 1, 0, 15),  # Start from high top-down
+        (5, 720, 45, 5),  # Double spin around the board
+        (8, None, None, None),  # Ease to starting point
+    ]},
+    "6": { "name": "Vertical Dive", "keyframes": [
+        (0, 1, 0, 10),  # Start from top-down
+        (2, 180, 90, 10),  # Descend to a vertical side-view
+        (4, 180, 45, 3),  # Lower the pitch for a closer view
+        (6, 360, 45, 3),  # Orbit around the board at angle
+        (8, None, None, None),  # Ease to starting point
+    ]},
+    "7": { "name": "Elevated Carousel", "keyframes": [
+        (0, 1, 0, 12),  # Start from high top-down
+        (3, 90, 60, 7),  # Descend to a high side-view
+        (5, 270, 60, 7),  # Continue orbit at same elevation
+        (7, 450, 60, 7),  # Complete the orbit
+        (9, None, None, None),  # Ease to starting point
+    ]},
+    "8": { "name": "Sky Dancer", "keyframes": [
+        (0, 1, 0, 14),  # Start from very high top-down
+        (3, 180, 70, 6),  # Half orbit to a high side-view
+        (5, 360, 70, 6),  # Complete the orbit at same elevation
+        (7, 540, 70, 6),  # Continue spinning around
+        (10, None, None, None),  # Ease to starting point
+    ]},
+    "9": { "name": "Serene Orbit", "keyframes": [
+        (0, 1, 0, 12),  # Start from high top-down
+        (3, 180, 45, 8),  # Begin orbit descent
+        (5, 360, 30, 7),  # Continue gentle orbit
+        (7, 540, 20, 7),  # Further orbit with lower pitch
+        (9, 720, 10, 7),  # Complete the serene orbit
+        (11, None, None, None),  # Ease to starting point
+    ]},
+    "10": { "name": "Celestial Glide", "keyframes": [
+        (0, 1, 0, 14),  # Start from a lofty top-down
+        (4, 360, 80, 6),  # Steady descent in a wide orbit
+        (8, 720, 40, 4),  # Continue orbiting at lower altitude
+        (12, None, None, None),  # Glide into the starting position
+    ]},
+    "11": { "name": "Panoramic Spiral", "keyframes": [
+        (0, 1, 0, 13),  # Begin from an expansive top-down
+        (4, 540, 60, 9),  # Spiral down in a panoramic orbit
+        (8, 1080, 20, 5),  # Continue the spiral closer to the board
+        (12, None, None, None),  # Smoothly transition to the game view
+    ]},
+    "12": { "name": "Orbiting Observer", "keyframes": [
+        (0, 1, 0, 11),  # Start with a broad view from above
+        (3, 270, 70, 7),  # Begin a high-altitude orbit
+        (6, 540, 50, 7),  # Maintain orbit with a slight descent
+        (9, 810, 30, 7),  # Continue orbiting with a gradual approach
+        (12, None, None, None),  # Conclude with a smooth transition to start
+    ]},
+    "13": { "name": "Swift Approach", "keyframes": [
+        (0, 1, 0, 12),  # Start high and distant for a full view
+        (1, 60, 45, 9),  # Begin descent with a slight turn
+        (2, 120, 45, 6),  # Continue turning, coming in closer
+        (3, 180, 30, 4),  # Halfway through the orbit, lower the camera
+        (4, 240, 30, 3),  # Start to level out the pitch as we near the board
+        (5, 300, 15, 2),  # Final approach, almost level with the board
+        (6, None, None, None),  # Ease into the starting position
+    ]},
+    "14": { "name": "Rapid Orbit", "keyframes": [
+        (0, 1, 0, 14),
+        (1, 90, 60, 11),
+        (2, 180, 60, 8),
+        (3, 270, 45, 5),
+        (4, 360, 45, 3),
+        (5, 450, 30, 2),
+        (6, None, None, None),
+    ]},
+    "15": { "name": "Descending Spiral", "keyframes": [
+        (0, 1, 0, 13),
+        (1, 120, 75, 10),
+        (2, 240, 50, 7),
+        (3, 360, 50, 5),
+        (4, 480, 25, 4),
+        (5, 600, 25, 3),
+        (6, None, None, None),
+    ]},
+    "16": { "name": "Glide and Slide", "keyframes": [
+        (0, 1, 0, 15),
+        (1, 70, 65, 12),
+        (2, 140, 65, 9),
+        (3, 210, 40, 6),
+        (4, 280, 40, 4),
+        (5, 350, 20, 3),
+        (6, None, None, None),
+    ]},
+    "17": { "name": "Hovering Advance", "keyframes": [
+        (0, 1, 0, 14),
+        (1, 50, 70, 11),
+        (2, 100, 70, 8),
+        (3, 150, 45, 6),
+        (4, 200, 45, 5),
+        (5, 250, 20, 4),
+        (6, None, None, None),
+    ]},
+    "18": { "name": "Circling Descent", "keyframes": [
+        (0, 1, 0, 16),
+        (1, 30, 80, 13),
+        (2, 60, 80, 10),
+        (3, 90, 55, 8),
+        (4, 120, 55, 6),
+        (5, 150, 30, 5),
+        (6, None, None, None),
+    ]},
+    "19": { "name": "The Grand Panorama", "keyframes": [
+        (0, 1, 0, 16),  # Begin with a panoramic view from above
+        (0.5, 30, 75, 14),  # Start the descent with a gentle turn
+        (1, 60, 70, 12),  # Continue the descent, orbiting the board
+        (1.5, 90, 65, 10),  # Lower the pitch slightly, coming in closer
+        (2, 120, 60, 8),  # Keep the smooth descent with a steady turn
+        (2.5, 150, 55, 7),  # Halfway through the orbit, lower the camera further
+        (3, 180, 50, 6),  # Continue the orbit, preparing for a closer look
+        (3.5, 210, 45, 5),  # Orbit closer to the board, lowering the pitch
+        (4, 240, 40, 4),  # Close in on the board, maintaining a steady orbit
+        (4.5, 270, 35, 3.5),  # Start to level out the pitch as we near the game
+        (5, 300, 30, 3),  # Final approach, almost level with the board
+        (5.5, 330, 25, 2.5),  # Ease into the starting position, ready for the game
+        (6, None, None, None),  # Settle into the starting position
+    ]},
+    "20": { "name": "Butterfly Dance", "keyframes": [ # (* BEST ONE *)
+        (0, 1, 90, 14),  # High above, looking straight down
+        (2, 180, 45, 7),  # Swoop down, half orbit to side view
+        (4, None, None, None),  # Glide into the starting position
+    ]},
+    "21": { "name": "Silken Slide", "keyframes": [ # (* SECOND BEST *)
+        (0, 1, 10, 10),  # Start slightly elevated from the end position
+        (1.5, 90, 20, 5),  # Smooth transition to a closer side view
+        (3, None, None, None),  # Softly settle into the starting view
+    ]},
+    "22": { "name": "Velvet Orbit", "keyframes": [
+        (0, 1, 30, 12),  # Begin with a gentle look from above
+        (2, 270, 45, 6),  # Graceful wide orbit around the board
+        (4, None, None, None),  # Ease into the final position
+    ]},
+    "23": { "name": "CCurve", "keyframes": [
+        (0, 1, 80, 15),  # High and distant, steep angle for drama
+        (2, 180, 60, 8),  # Smooth descent into a closer orbit
+        (3.5, 360, 40, 4),  # Continue the descent, circling the board
+        (5, None, None, None),  # Round off into the starting position
+    ]},
+}
+
+def load_camera_paths(path):
+    '''
+    Returns the built-in camera paths (see `INTRO_CAMERA_PATHS`), updated with the ones in a JSON file (if it exists), e.g.:
+        { "my-path": { "name": "My path", "keyframes": [[0, 1, 90, 14], [2, 180, 45, 7], [4, null, null, null]] } }
+    '''
+    camera_paths = dict(INTRO_CAMERA_PATHS)
+    if path and os.path.exists(path):
+        with open(path) as f: camera_paths.update(json.load(f))
+    return camera_paths
+
+CAMERA_PATH_SAMPLE_RATE = 120 # Samples per second of a compiled camera path.
+
+class CameraPath:
+    def __init__(self, keyframes, home=None, sample_rate=CAMERA_PATH_SAMPLE_RATE, arc_length_samples=64):
+        '''
+        This CameraPath class compiles camera keyframes once into a table of (yaw, pitch, distance) samples, evenly spaced in time,
+        so placing the camera on the path only looks up the table (see `sample`).
+
+        The keyframes are joined by a monotone cubic spline (it doesn't overshoot a keyframe, e.g. under the board), and each segment
+        is parameterized by the arc length of the camera's position, eased in and out: the camera comes to rest on each keyframe
+        (like the original keyframe interpolation) and moves evenly along the curve in between.
+
+        :param keyframes:           [(time (seconds), yaw (degrees), pitch (degrees), distance), ...]; None := the value of `home`
+        :param home:                the camera's resting (yaw, pitch, distance) (radians, radians, units), e.g. where the intro ends
+        :param arc_length_samples:  samples per segment used to measure its arc length
+        '''
+        keyframes = np.array([[np.nan if value is None else value for value in keyframe] for keyframe in keyframes], dtype=float)
+        keyframes[:, 1:3] = np.deg2rad(keyframes[:, 1:3])
+        if home is not None: keyframes[:, 1:] = np.where(np.isnan(keyframes[:, 1:]), home, keyframes[:, 1:])
+        times, values = keyframes[:, 0], keyframes[:, 1:]
+        if len(times) < 2 or np.any(np.diff(times) <= 0): raise ValueError("A camera path needs at least 2 keyframes, with increasing times.")
+        if np.isnan(values).any(): raise ValueError("A camera path that ends in the resting position needs its `home`.")
+        self.sample_rate = sample_rate
+        self.duration = times[-1] - times[0]
+
+        # Measure the arc length along each segment (on the spline, sampled in its own parameter).
+        tangents = calc_monotone_tangents(times, values)
+        u = np.linspace(0, 1, arc_length_samples + 1)
+        segment_lengths = []
+        for k in range(len(times) - 1):
+            positions = calc_camera_positions(calc_hermite(values[k], values[k + 1], tangents[k], tangents[k + 1], times[k + 1] - times[k], u))
+            segment_lengths.append(np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(positions, axis=0), axis=1)))))
+
+        # Sample the path evenly in time: the eased progress through a segment is the fraction of its arc length covered.
+        sample_times = np.minimum(np.arange(int(np.ceil(self.duration * sample_rate)) + 1) / sample_rate, self.duration) + times[0]
+        segments = np.clip(np.searchsorted(times, sample_times, side="right") - 1, 0, len(times) - 2)
+        self.samples = np.empty((len(sample_times), 3))
+        for k in range(len(times) - 1):
+            in_segment = segments == k
+            progress = ease_in_out_array((sample_times[in_segment] - times[k]) / (times[k + 1] - times[k]))
+            lengths = segment_lengths[k]
+            segment_u = np.interp(progress * lengths[-1], lengths, u) if lengths[-1] > 1e-9 else progress
+            self.samples[in_segment] = calc_hermite(values[k], values[k + 1], tangents[k], tangents[k + 1], times[k + 1] - times[k], segment_u)
+
+    def sample(self, time):
+        ''' Returns the camera's (yaw, pitch, distance) (radians, radians, units) `time` seconds into the path (clamped to the path). '''
+        position = min(max(time, 0), self.duration) * self.sample_rate
+        i = min(int(position), len(self.samples) - 2)
+        return self.samples[i] + (self.samples[i + 1] - self.samples[i]) * min(position - i, 1)
+
+def calc_monotone_tangents(times, values):
+    ''' Returns the tangents (per unit of time) of a monotone cubic spline through the keyframes (Fritsch-Carlson), for each of the columns of `values`. '''
+    intervals = np.diff(times)[:, np.newaxis]
+    slopes = np.diff(values, axis=0) / intervals
+    tangents = np.concatenate((slopes[:1], slopes[:-1], slopes[-1:])) # (The first and last tangents follow their segment.)
+    if len(times) > 2:
+        # (Weighted harmonic mean of the slopes on either side of a keyframe; 0 at a local extremum, so the spline doesn't overshoot it.)
+        w1, w2 = 2 * intervals[1:] + intervals[:-1], intervals[1:] + 2 * intervals[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            harmonic_means = (w1 + w2) / (w1 / slopes[:-1] + w2 / slopes[1:])
+        tangents[1:-1] = np.where(slopes[:-1] * slopes[1:] > 0, harmonic_means, 0)
+    return tangents
+
+def calc_hermite(start, end, start_tangent, end_tangent, duration, u):
+    ''' Evaluates a cubic Hermite segment at the parameters `u` (0 to 1): returns (len(u), n) values. '''
+    u = np.asarray(u, dtype=float)[:, np.newaxis]
+    u2, u3 = u * u, u * u * u
+    return ((2 * u3 - 3 * u2 + 1) * start + (u3 - 2 * u2 + u) * duration * start_tangent
+            + (-2 * u3 + 3 * u2) * end + (u3 - u2) * duration * end_tangent)
+
+def calc_camera_positions(values):
+    ''' Returns the positions of the camera (orbiting the origin, see `FrameContext.update`) for (N, 3) (yaw, pitch, distance) values. '''
+    yaw, pitch, distance = values[:, 0], values[:, 1], values[:, 2]
+    return np.column_stack((distance * np.sin(pitch) * np.cos(yaw), distance * np.cos(pitch), distance * np.sin(pitch) * np.sin(yaw)))
@@ -0,0 +1,169 @@
+# Third-party imports.
+import ctypes
+import math
+from collections import deque
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v # (The wrapped version can't return 64-bit results.)
+import numpy as np
+
+class DynamicResolution:
+    def __init__(self, frame_time_budget, min_scale, max_scale, scale_step, smoothing=0.2, query_latency=3):
+        '''
+        This DynamicResolution class renders the 3D scene into an offscreen framebuffer whose resolution is scaled to hold a GPU frame time budget,
+        then upscales it to the render target (the window), so the overlays drawn afterwards stay at the native resolution.
+
+        The GPU time of the scene is measured with two timestamp queries (`GL_TIMESTAMP`, so they don't conflict with the profiler's timer queries)
+        and read back up to `query_latency` frames later, without stalling the pipeline. The scale follows the smoothed GPU time
+        (the cost of a frame is roughly proportional to its number of pixels, i.e. to the scale squared), in multiples of `scale_step`
+        so the resolution doesn't change every frame. Only the frames rendered at the current scale are taken into account.
+
+        The framebuffer is allocated once at `max_scale` and the scene is drawn into its bottom-left corner, so changing the scale is free.
+
+        :param frame_time_budget:   ms (GPU time of the scene to hold)
+        :param min_scale:           lowest resolution scale (per axis, e.g. 0.5 := a quarter of the pixels)
+        :param max_scale:           highest resolution scale (1 := native)
+        :param scale_step:          the scale is a multiple of this (hysteresis)
+        :param smoothing:           weight of the latest GPU time in the running average
+        :param query_latency:       max number of frames the GPU times can lag behind (they are dropped if not available by then)
+        '''
+        self.is_enabled = False
+        self.frame_time_budget = frame_time_budget
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale_step = scale_step
+        self.smoothing = smoothing
+        self.query_latency = query_latency
+        self.scale = max_scale
+        self.gpu_time = None # ms (smoothed, at the current scale)
+        self.framebuffer = None
+        self.color_texture_id = None
+        self.depth_renderbuffer_id = None
+        self.size = (0, 0) # px (of the framebuffer, i.e. at `max_scale`)
+        self.output_size = (0, 0)
+        self.free_queries = []
+        self.frame_queries = None # (start, end, scale) of the current frame
+        self.pending_queries = deque() # (start, end, scale) of the previous frames, oldest first
+
+    def setup(self, output_width, output_height):
+        ''' Creates the scaled framebuffer for a render target of the given size (in the current context). '''
+        self.cleanup()
+        self.output_size = (output_width, output_height)
+        self.size = (max(1, round(output_width * self.max_scale)), max(1, round(output_height * self.max_scale)))
+
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+
+        # (A texture rather than a renderbuffer, so the scene could be upscaled by a shader too: e.g. with sharpening.)
+        self.color_texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.color_texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.size[0], self.size[1], 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.color_texture_id, 0)
+
+        self.depth_renderbuffer_id = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_renderbuffer_id)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, self.size[0], self.size[1])
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth_renderbuffer_id)
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise Exception("Framebuffer is not complete!")
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        self.reset()
+
+    def cleanup(self):
+        if self.framebuffer is None: return
+        glDeleteFramebuffers(1, [self.framebuffer])
+        glDeleteTextures(1, [self.color_texture_id])
+        glDeleteRenderbuffers(1, [self.depth_renderbuffer_id])
+        queries = self.free_queries + [query for start, end, scale in self.pending_queries for query in (start, end)]
+        if self.frame_queries is not None: queries += self.frame_queries[:2] # (A frame that began but never ended.)
+        if queries: glDeleteQueries(len(queries), queries)
+        self.invalidate()
+
+    def invalidate(self):
+        ''' Forgets the OpenGL objects without deleting them (their context was destroyed: they are created again by the next frame). '''
+        self.framebuffer = None
+        self.free_queries = []
+        self.frame_queries = None
+        self.pending_queries.clear()
+
+    def reset(self):
+        self.scale = self.max_scale
+        self.gpu_time = None
+        for start, end, scale in self.pending_queries: self.free_queries.extend((start, end))
+        self.pending_queries.clear()
+
+    def set_enabled(self, is_enabled):
+        self.is_enabled = is_enabled
+        self.reset()
+
+    def get_scene_size(self):
+        ''' Returns the resolution (in px) the scene is drawn at with the current scale. '''
+        return (max(1, round(self.output_size[0] * self.scale)), max(1, round(self.output_size[1] * self.scale)))
+
+    def begin_frame(self, output_target):
+        '''
+        Returns the render target the scene should be drawn into this frame: the scaled framebuffer,
+        or `output_target` itself if dynamic resolution is disabled.
+        '''
+        if not self.is_enabled: return output_target
+        if self.framebuffer is None or self.output_size != (output_target["width"], output_target["height"]):
+            self.setup(output_target["width"], output_target["height"])
+
+        self.frame_queries = (self.get_query(), self.get_query(), self.scale)
+        glQueryCounter(self.frame_queries[0], GL_TIMESTAMP)
+        width, height = self.get_scene_size()
+        return { "framebuffer": self.framebuffer, "width": width, "height": height }
+
+    def end_frame(self, output_target):
+        ''' Upscales the scene to `output_target` (which stays bound, for the overlays), then adjusts the scale for the next frames. '''
+        if not self.is_enabled or self.frame_queries is None: return
+        glQueryCounter(self.frame_queries[1], GL_TIMESTAMP)
+        self.pending_queries.append(self.frame_queries)
+        self.frame_queries = None
+
+        width, height = self.get_scene_size()
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.framebuffer)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, output_target["framebuffer"])
+        glBlitFramebuffer(0, 0, width, height, 0, 0, output_target["width"], output_target["height"], GL_COLOR_BUFFER_BIT, GL_LINEAR)
+        glBindFramebuffer(GL_FRAMEBUFFER, output_target["framebuffer"])
+        glViewport(0, 0, output_target["width"], output_target["height"])
+
+        for gpu_time, scale in self.read_gpu_times():
+            if scale == self.scale: self.update_scale(gpu_time)
+
+    def get_query(self):
+        if not self.free_queries: self.free_queries.extend(int(query) for query in np.atleast_1d(glGenQueries(8)))
+        return self.free_queries.pop()
+
+    def read_gpu_times(self):
+        ''' Returns the GPU times (in ms) and scales of the previous frames that are available, oldest first. '''
+        gpu_times = []
+        while self.pending_queries:
+            start_query, end_query, scale = self.pending_queries[0]
+            is_available = glGetQueryObjectiv(end_query, GL_QUERY_RESULT_AVAILABLE)
+            if not is_available and len(self.pending_queries) <= self.query_latency: break
+
+            self.pending_queries.popleft()
+            if is_available:
+                start, end = ctypes.c_uint64(), ctypes.c_uint64()
+                glGetQueryObjectui64v(start_query, GL_QUERY_RESULT, ctypes.byref(start))
+                glGetQueryObjectui64v(end_query, GL_QUERY_RESULT, ctypes.byref(end))
+                gpu_times.append(((end.value - start.value) / 1e6, scale))
+            self.free_queries.extend((start_query, end_query))
+        return gpu_times
+
+    def update_scale(self, gpu_time):
+        ''' Moves the scale towards the one that would hold the budget, given the GPU time (in ms) of a frame rendered at the current scale. '''
+        self.gpu_time = gpu_time if self.gpu_time is None else self.gpu_time + (gpu_time - self.gpu_time) * self.smoothing
+        if self.gpu_time <= 0: return
+
+        # (Rounded down to a multiple of the step, so the scale settles just under the budget instead of oscillating around it.)
+        target_scale = self.scale * math.sqrt(self.frame_time_budget / self.gpu_time)
+        new_scale = round(math.floor(target_scale / self.scale_step + 1e-6) * self.scale_step, 6)
+        new_scale = min(max(new_scale, self.min_scale), self.max_scale)
+        if new_scale == self.scale: return
+
+        self.scale = new_scale
+        self.gpu_time = None # (Measure the new scale from scratch.)
@@ -0,0 +1,294 @@
+# Third-party imports.
+import numpy as np
+import pyrr
+import chess
+
+# Local application imports.
+from constants import PIECES, PIECE_COLORS, BOARD_SQUARE_SIZE
+
+# ~ Square transforms
+# Rotation applied to the pieces of each color (the white pieces are turned around to face the center of the board).
+ORIENTATION_ROTATIONS = {
+    "white": pyrr.matrix44.create_from_y_rotation(np.radians(180)),
+    "black": np.identity(4),
+}
+
+def calc_square_position(row, col, square_size=BOARD_SQUARE_SIZE):
+    ''' Returns the position of a square (row 0 := rank 8, col 0 := file a) relative to the center of the board (in model units). '''
+    return np.array([(col - 3.5) * square_size, 0, (row - 3.5) * square_size])
+
+def calc_transform(position, orientation="black"):
+    '''
+    Returns the transform that rotates a model to the given orientation and then moves it to `position`.
+    (Equivalent to `pyrr.matrix44.multiply(rotation_matrix, pyrr.matrix44.create_from_translation(position))`, without the intermediate allocations.)
+    '''
+    transform = ORIENTATION_ROTATIONS[orientation].copy()
+    transform[3, :3] = position
+    return transform
+
+def build_square_transforms():
+    '''
+    Precomputes the square→world transforms of all 64 squares for each color orientation:
+        SQUARE_TRANSFORMS[orientation][row * 8 + col]   (row 0 := rank 8, col 0 := file a)
+    A model is drawn on a square with: `SQUARE_TRANSFORMS[orientation][row * 8 + col] @ model["model_matrix"]`.
+    '''
+    return {
+        orientation: np.array([calc_transform(calc_square_position(row, col), orientation) for row in range(8) for col in range(8)])
+        for orientation in PIECE_COLORS
+    }
+
+SQUARE_TRANSFORMS = build_square_transforms()
+
+def is_rigid_transform(transform, tolerance=1e-5):
+    ''' Returns whether a 4x4 transform only rotates, translates and scales uniformly (i.e. doesn't skew normals). '''
+    basis = np.asarray(transform)[:3, :3]
+    gram = basis @ basis.T
+    return bool(np.allclose(gram, np.identity(3) * gram[0, 0], atol=tolerance * max(gram[0, 0], 1e-12)))
+
+def calc_normal_matrices(model_matrices):
+    '''
+    Returns the normal matrices (the transpose of the inverse of the upper 3x3) of a batch of (row-vector, i.e. pyrr) model matrices,
+    laid out like the model matrices so they can be uploaded to a `mat3` uniform as is.
+    '''
+    return np.linalg.inv(np.asarray(model_matrices)[..., :3, :3]).swapaxes(-1, -2)
+
+def transform_points(points, transform):
+    ''' Transforms an (N, 3) array of points by a 4x4 (row-vector, i.e. pyrr) transform. '''
+    return points @ transform[:3, :3] + transform[3, :3]
+
+def get_square_transform(row, col, orientation="black"):
+    ''' Returns the (precomputed) transform of a square; squares off the board (e.g. the indicators) are computed on the fly. '''
+    if 0 <= row < 8 and 0 <= col < 8: return SQUARE_TRANSFORMS[orientation][row * 8 + col]
+    return calc_transform(calc_square_position(row, col), orientation)
+
+# ~ Frustum culling
+def extract_frustum_planes(view_projection_matrix):
+    '''
+    Extracts the 6 planes (left, right, bottom, top, near, far) of a view frustum from its (row-vector, i.e. pyrr) view-projection matrix.
+    Each plane is (a, b, c, d) with a normalized, inward-facing normal: a point p is inside the plane if `dot(p, (a, b, c)) + d >= 0`.
+    (Source: Gribb & Hartmann, "Fast Extraction of Viewing Frustum Planes from the World-View-Projection Matrix".)
+    '''
+    columns = np.asarray(view_projection_matrix).T
+    planes = np.array([
+        columns[3] + columns[0], columns[3] - columns[0], # (left, right)
+        columns[3] + columns[1], columns[3] - columns[1], # (bottom, top)
+        columns[3] + columns[2], columns[3] - columns[2], # (near, far)
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+def calc_bounding_spheres(local_centers, local_radii, model_matrices):
+    ''' Transforms model-space bounding spheres to world space (in batch): returns the (N, 3) centers and (N,) radii. '''
+    centers = np.einsum('ij,ijk->ik', local_centers, model_matrices[:, :3, :3]) + model_matrices[:, 3, :3]
+    scales = np.sqrt((model_matrices[:, :3, :3] ** 2).sum(axis=2).max(axis=1)) # (The largest scale factor of each model matrix.)
+    return centers, local_radii * scales
+
+def cull_spheres(centers, radii, frustum_planes):
+    ''' Returns which of the (N, 3) bounding spheres are (at least partially) inside the frustum. '''
+    distances = centers @ frustum_planes[:, :3].T + frustum_planes[:, 3]
+    return (distances >= -radii[:, np.newaxis]).all(axis=1)
+
+# ~ Picking
+def calc_ray_from_screen(x, y, width, height, view_matrix, projection_matrix):
+    ''' Unprojects a window position (in px, from the top-left corner) into a world-space ray: returns its origin (on the near plane) and unit direction. '''
+    ndc_x, ndc_y = 2 * x / width - 1, 1 - 2 * y / height
+    inv_view_projection_matrix = np.linalg.inv(np.asarray(view_matrix) @ np.asarray(projection_matrix))
+    near, far = np.array([[ndc_x, ndc_y, -1, 1], [ndc_x, ndc_y, 1, 1]]) @ inv_view_projection_matrix
+    near, far = near[:3] / near[3], far[:3] / far[3]
+    return near, (far - near) / np.linalg.norm(far - near)
+
+def intersect_ray_with_grid(origin, direction, grid_matrix):
+    '''
+    Intersects a ray with the board's plane, where `grid_matrix` maps the world space onto a grid with square (row, col) spanning [col, col + 1] x [row, row + 1] at y = 0.
+    Returns the distance along the ray and the (row, col) hit (which may be off the board), or None if the ray doesn't point at the plane.
+    '''
+    grid_origin = transform_points(np.asarray(origin)[np.newaxis], grid_matrix)[0]
+    grid_direction = np.asarray(direction) @ grid_matrix[:3, :3]
+    if abs(grid_direction[1]) < 1e-9: return None
+    t = -grid_origin[1] / grid_direction[1] # (An affine map keeps the ray's parameter, so `t` is a distance in world space too.)
+    if t <= 0: return None
+    hit = grid_origin + t * grid_direction
+    return t, (int(np.floor(hit[2])), int(np.floor(hit[0])))
+
+def intersect_ray_with_boxes(origin, direction, local_mins, local_maxs, model_matrices):
+    '''
+    Intersects a ray with a batch of model-space bounding boxes (transformed by their model matrices, i.e. oriented boxes in world space).
+    Returns the (N,) distances along the ray to each box (`np.inf` where the ray misses it).
+    '''
+    if len(model_matrices) == 0: return np.zeros(0)
+    inv_model_matrices = np.linalg.inv(model_matrices)
+    local_origins = np.einsum('j,ijk->ik', origin, inv_model_matrices[:, :3, :3]) + inv_model_matrices[:, 3, :3]
+    local_directions = np.einsum('j,ijk->ik', direction, inv_model_matrices[:, :3, :3])
+
+    # Slab test: the ray is inside the box between the last entry and the first exit of the three slabs.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t0 = (local_mins - local_origins) / local_directions
+        t1 = (local_maxs - local_origins) / local_directions
+    t_enter = np.nan_to_num(np.minimum(t0, t1), nan=-np.inf).max(axis=1)
+    t_exit = np.nan_to_num(np.maximum(t0, t1), nan=np.inf).min(axis=1)
+    is_hit = (t_enter <= t_exit) & (t_exit > 0)
+    return np.where(is_hit, np.maximum(t_enter, 0), np.inf)
+
+# ~ Frame context
+class FrameContext:
+    def __init__(self, fov, aspect_ratio, near_plane, far_plane, light_position, target, up):
+        '''
+        This FrameContext class holds the camera and light matrices used to draw a frame.
+
+        The FOV, aspect ratio and light never change, so the projection and light matrices are computed once, here.
+        `update()` recomputes the camera (eye position, view matrix, and the inverse view-projection matrix of the skybox)
+        once per frame, so the draw calls can share them instead of rebuilding them for every object.
+        '''
+        self.target = np.array(target)
+        self.up = np.array(up)
+
+        # Create a 4x4 projection matrix (to define the perspective projection).
+        self.projection_matrix = pyrr.matrix44.create_perspective_projection(fov, aspect_ratio, near_plane, far_plane)
+
+        # Calculate the view and projection matrices from the light's point of view (for shadows).
+        # (The light projection is fitted to the scene once the models are loaded, see `fit_light_frustum`.)
+        self.light_position = np.array(light_position)
+        self.light_view_matrix = pyrr.matrix44.create_look_at(self.light_position, self.target, self.up)
+        self.light_projection_matrix = pyrr.matrix44.create_perspective_projection_matrix(45, aspect_ratio, near_plane, far_plane)
+
+        self.light_frustum_planes = extract_frustum_planes(pyrr.matrix44.multiply(self.light_view_matrix, self.light_projection_matrix))
+
+        # (Updated once per frame.)
+        self.eye = None
+        self.view_matrix = None
+        self.view_frustum_planes = None
+        self.inv_view_projection_matrix = None
+        self.time = 0.0
+
+    def fit_light_frustum(self, bounds_min, bounds_max, padding=0.05):
+        '''
+        Fits an orthographic light projection tightly around the given (world-space) bounds of the shadow casters/receivers,
+        so the whole shadow map resolution is spent on the board (instead of a wide perspective frustum around the light).
+        '''
+        # Transform the corners of the bounds to the light's view space.
+        corners = np.array([[x, y, z, 1] for x in (bounds_min[0], bounds_max[0]) for y in (bounds_min[1], bounds_max[1]) for z in (bounds_min[2], bounds_max[2])])
+        corners = corners @ self.light_view_matrix
+        light_min, light_max = corners[:, :3].min(axis=0) - padding, corners[:, :3].max(axis=0) + padding
+
+        # (The light looks down the negative z-axis of its view space.)
+        self.light_projection_matrix = pyrr.matrix44.create_orthogonal_projection(light_min[0], light_max[0], light_min[1], light_max[1], -light_max[2], -light_min[2])
+        self.light_frustum_planes = extract_frustum_planes(pyrr.matrix44.multiply(self.light_view_matrix, self.light_projection_matrix))
+
+    def update(self, yaw, pitch, camera_distance, time):
+        # Calculate camera position using spherical coordinates.
+        self.eye = np.array([
+            camera_distance * np.sin(pitch) * np.cos(yaw),
+            camera_distance * np.cos(pitch),
+            camera_distance * np.sin(pitch) * np.sin(yaw)
+        ])
+        self.view_matrix = pyrr.matrix44.create_look_at(self.eye, self.target, self.up)
+        self.view_frustum_planes = extract_frustum_planes(pyrr.matrix44.multiply(self.view_matrix, self.projection_matrix))
+        self.time = time
+
+        # Remove the translation component from the view matrix because we want the skybox to be static.
+        view_matrix_without_translation = self.view_matrix.copy()
+        view_matrix_without_translation[3][:3] = [0, 0, 0]
+        self.inv_view_projection_matrix = pyrr.matrix44.inverse(pyrr.matrix44.multiply(view_matrix_without_translation, self.projection_matrix))
+
+# ~ Piece transforms
+MAX_PIECE_INSTANCES = 32 # (There are never more than 32 pieces on the board.)
+
+class PieceTransformBatch:
+    def __init__(self, capacity=MAX_PIECE_INSTANCES):
+        '''
+        This PieceTransformBatch class computes the model matrices of every piece on the board in one batch per frame.
+
+        `update()` collects the pieces (from the python-chess board) and their squares (the animations are evaluated by the vertex shaders,
+        see `PieceAnimationTable`), then computes all model matrices at once into a preallocated (capacity, 4, 4) buffer:
+            model_matrices[i] = rotation[orientation] · translation[position] · base_model_matrix[color, piece]
+        The draw and shadow passes both iterate over the same instances (see `get_instances()`).
+        `version` is incremented whenever a piece moves (or is added/removed), e.g. so the shadow map is only re-rendered then.
+        '''
+        self.capacity = capacity
+        self.count = 0
+        self.version = 0
+
+        # Per-instance data (filled by `update()`).
+        self.positions = np.zeros((capacity, 3))
+        self.orientations = np.zeros(capacity, dtype=np.intp) # Index into `PIECE_COLORS`.
+        self.model_indices = np.zeros(capacity, dtype=np.intp) # Index into the flattened (color, piece) base model matrices.
+        self.animation_slots = np.zeros(capacity, dtype=np.intp) # The `animationSlot` uniform of each piece (0 := not animated).
+        self.instances = [] # [(color, piece_type, square_name, row, col, is_animating), ...]
+
+        # Reusable buffers (so the hot loop doesn't allocate any matrices).
+        self.rotations = np.array([ORIENTATION_ROTATIONS[color] for color in PIECE_COLORS])
+        self.base_matrices = np.tile(np.identity(4), (len(PIECE_COLORS) * len(PIECES), 1, 1))
+        self.bounds_centers = np.zeros((len(PIECE_COLORS) * len(PIECES), 3)) # (Model-space bounding spheres of the piece models.)
+        self.bounds_radii = np.zeros(len(PIECE_COLORS) * len(PIECES))
+        self.bounds_mins = np.zeros((len(PIECE_COLORS) * len(PIECES), 3)) # (Model-space bounding boxes of the piece models, for picking.)
+        self.bounds_maxs = np.zeros((len(PIECE_COLORS) * len(PIECES), 3))
+        self.prefix_matrices = np.zeros((capacity, 4, 4))
+        self.instance_base_matrices = np.zeros((capacity, 4, 4))
+        self.model_matrices = np.zeros((capacity, 4, 4))
+        self.normal_matrices = None # (Computed on demand, see `get_normal_matrices()`.)
+        self.previous_positions = np.zeros((capacity, 3))
+        self.previous_model_indices = np.zeros(capacity, dtype=np.intp)
+
+    def set_base_matrices(self, pieces):
+        ''' Sets the model-space matrices (center and scale) and bounds of the piece models: `pieces[color][piece]["model_matrix"]`. '''
+        for color_index, color in enumerate(PIECE_COLORS):
+            for piece_index, piece in enumerate(PIECES):
+                self.base_matrices[color_index * len(PIECES) + piece_index] = pieces[color][piece]["model_matrix"]
+                self.bounds_centers[color_index * len(PIECES) + piece_index] = pieces[color][piece]["obj"].bounds_center
+                self.bounds_radii[color_index * len(PIECES) + piece_index] = pieces[color][piece]["obj"].bounds_radius
+                self.bounds_mins[color_index * len(PIECES) + piece_index] = pieces[color][piece]["obj"].bounds_min
+                self.bounds_maxs[color_index * len(PIECES) + piece_index] = pieces[color][piece]["obj"].bounds_max
+
+    def update(self, board, piece_animations):
+        ''' Collects the pieces on the board (and their animation slots, see `PieceAnimationTable`) and computes all of their model matrices. '''
+        self.instances.clear()
+
+        # Iterate over the board starting from a1 (the order matters for the blending of the pieces).
+        for square, piece in sorted(board.piece_map().items()):
+            color = 'white' if piece.color == chess.WHITE else 'black'
+            piece_type = chess.piece_name(piece.piece_type)
+            square_name = chess.square_name(square)
+            row, col = 7 - chess.square_rank(square), chess.square_file(square)
+
+            # (A moving piece is placed on the square it moves to: its shader offsets it along its animation.)
+            i = len(self.instances)
+            self.animation_slots[i] = piece_animations.get_shader_slot(square_name)
+            is_animating = self.animation_slots[i] != 0
+            self.positions[i] = SQUARE_TRANSFORMS["black"][row * 8 + col, 3, :3]
+            self.orientations[i] = PIECE_COLORS.index(color)
+            self.model_indices[i] = self.orientations[i] * len(PIECES) + PIECES.index(piece_type)
+            self.instances.append((color, piece_type, square_name, row, col, is_animating))
+
+        # Check if any piece moved since the last frame.
+        n = len(self.instances)
+        if n != self.count or not np.array_equal(self.positions[:n], self.previous_positions[:n]) or not np.array_equal(self.model_indices[:n], self.previous_model_indices[:n]):
+            self.version += 1
+            self.previous_positions[:n] = self.positions[:n]
+            self.previous_model_indices[:n] = self.model_indices[:n]
+
+        # Compute the model matrices of all pieces at once.
+        self.count = n
+        np.take(self.rotations, self.orientations[:n], axis=0, out=self.prefix_matrices[:n])
+        self.prefix_matrices[:n, 3, :3] = self.positions[:n]
+        np.take(self.base_matrices, self.model_indices[:n], axis=0, out=self.instance_base_matrices[:n])
+        np.matmul(self.prefix_matrices[:n], self.instance_base_matrices[:n], out=self.model_matrices[:n])
+        self.normal_matrices = None
+
+    def get_normal_matrices(self):
+        ''' Returns the normal matrices of the pieces (computed in one batch, once per frame, and only if a shader needs them). '''
+        if self.normal_matrices is None: self.normal_matrices = calc_normal_matrices(self.model_matrices[:self.count])
+        return self.normal_matrices
+
+    def get_bounding_spheres(self):
+        ''' Returns the world-space bounding spheres (centers, radii) of the pieces. '''
+        model_indices = self.model_indices[:self.count]
+        return calc_bounding_spheres(self.bounds_centers[model_indices], self.bounds_radii[model_indices], self.model_matrices[:self.count])
+
+    def get_bounding_boxes(self):
+        ''' Returns the model-space bounding boxes (mins, maxs) of the pieces, to be transformed by their model matrices. '''
+        model_indices = self.model_indices[:self.count]
+        return self.bounds_mins[model_indices], self.bounds_maxs[model_indices]
+
+    def get_instances(self):
+        ''' Yields (color, piece_type, square_name, row, col, is_animating, model_matrix) for every piece on the board. '''
+        for instance, model_matrix in zip(self.instances, self.model_matrices[:self.count]):
+            yield (*instance, model_matrix)
@@ -1,7 +1,5 @@
 # Third-party imports.
 from OpenGL.GL import *
-from OpenGL.GLU import *
-from OpenGL.GLUT import *
 import pygame
 import chess
 
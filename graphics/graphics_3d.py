@@ -1,9 +1,7 @@
 # Third-party imports.
 import math
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 from OpenGL.GL import *
-from OpenGL.GLU import *
-from OpenGL.GLUT import *
 from pygame.locals import *
 import pygame
 import pyrr
@@ -15,39 +13,53 @@ import time
 # Local application imports.
 from graphics.graphics_2d import setup_2d_graphics
 from game.chess_game import ChessGame
-from graphics.animation import ease_in_out, add_shake, build_intro_camera_animations
-from constants import WINDOW, PIECES, PIECE_ABR_DICT, PIECE_COLORS, MODEL_TEMPLATE, CHESSBOARD_OBJECT_PATH, CLASSIC_CHESSBOARD_TEXTURE_PATH, WOOD_CHESSBOARD_TEXTURE_PATH, RGB_CHESSBOARD_TEXTURE_PATH, SQUARE_OBJECT_PATH, HIGHLIGHTED_SQUARE_TEXTURE_PATH, SELECTED_SQUARE_TEXTURE_PATH, VALID_MOVES_SQUARE_TEXTURE_PATH, INVALID_MOVE_SQUARE_TEXTURE_PATH, SKYBOX_PATHS, PIECE_OBJECT_PATHS, CLASSIC_PIECE_TEXTURE_PATHS, WOOD_PIECE_TEXTURE_PATHS, METAL_PIECE_TEXTURE_PATHS, CAMERA_MOUSE_DRAG_SENSITIVITY, CAMERA_DEFAULT_YAW, CAMERA_DEFAULT_PITCH, CAMERA_MIN_DISTANCE, CAMERA_MAX_DISTANCE, CAMERA_DEFAULT_ANIMATION_SPEED, CAMERA_USE_INTRO_ANIMATION, MOUSE_POSITION_DELTA, CAMERA_ZOOM_SCROLL_SENSITIVITY, HUD_TEXT_MODEL_OBJECT_PATH, HUD_TEXT_EXAMPLE_TEXTURE_PATH, BLACK_TURN_GLOW_COLOR, WHITE_TURN_GLOW_COLOR, CHECK_TURN_GLOW_COLOR, DISPLAY_TURN
-from util.cubemap import load_cubemap_textures, load_texture
+from graphics.animation import CameraPath, load_camera_paths, PieceAnimationTable
+from constants import WINDOW, PIECES, PIECE_COLORS, MODEL_TEMPLATE, CHESSBOARD_OBJECT_PATH, CHESSBOARD_TEXTURE_PATHS, TEXTURE_ARRAY_LAYER_SIZE, SQUARE_OBJECT_PATH, BOARD_HIGHLIGHT_TEXTURE_PATHS, BOARD_SQUARE_SIZE, SKYBOX_PATHS, CACHE_DIR, SKYBOX_PREVIEW_FACE_SIZE, SKYBOX_VRAM_BUDGET_MB, SKYBOX_CACHE_SIZE, PIECE_OBJECT_PATHS, PIECE_TEXTURE_PATHS, CAMERA_MOUSE_DRAG_SENSITIVITY, CAMERA_DEFAULT_YAW, CAMERA_DEFAULT_PITCH, CAMERA_MIN_DISTANCE, CAMERA_MAX_DISTANCE, CAMERA_SIDE_SWITCH_DURATION, CAMERA_USE_INTRO_ANIMATION, CAMERA_INTRO_PATH, CAMERA_PATHS_PATH, MOUSE_POSITION_DELTA, CAMERA_ZOOM_SCROLL_SENSITIVITY, ENABLE_HUD_TEXT, HUD_FONT_PATH, HUD_FONT_SIZE, HUD_TEXT_MARGIN, HUD_TEXT_COLOR, HUD_TEXT_ALERT_COLOR, HUD_MOVE_LIST_LENGTH, BLACK_TURN_GLOW_COLOR, WHITE_TURN_GLOW_COLOR, CHECK_TURN_GLOW_COLOR, DISPLAY_TURN, VSYNC, PIECE_ANIMATION_MAX_HEIGHT, PIECE_ANIMATION_SHAKE_INTENSITY, MAX_PIECE_ANIMATIONS, PIECE_ANIMATION_UNIFORM_BLOCK, PIECE_ANIMATION_BINDING_POINT, MESH_CACHE_DIR, MESH_LOD_GRID_SIZES, MESH_LOD_SCREEN_RADII, MESH_LOD_HYSTERESIS, FRAME_DATA_UNIFORM_BLOCK, FRAME_DATA_BINDING_POINT, PROFILER_OVERLAY_REFRESH_INTERVAL, PROFILER_OVERLAY_FONT_SIZE, DYNAMIC_RESOLUTION, DYNAMIC_RESOLUTION_FRAME_TIME_BUDGET, DYNAMIC_RESOLUTION_MIN_SCALE, DYNAMIC_RESOLUTION_MAX_SCALE, DYNAMIC_RESOLUTION_SCALE_STEP, MAIN_MENU_3D_BACKGROUND, MENU_CAMERA_ORBIT_SPEED
+from util.cubemap import CubemapStreamer, calc_max_cubemap_face_size, create_cubemap_texture, upload_cubemap_face, load_texture
 from util.game import notation_to_coords
 from util.objLoaderV4 import ObjLoader
-from util.shaderLoaderV3 import ShaderProgram
+from util.shaderLoaderV3 import ShaderProgram, UniformBuffer
 from util.guiV3 import SimpleGUI
-from util.gui_ext import prepare_gui, update_gui
+from util.gui_ext import prepare_gui
 from graphics.graphics_shadows import render_shadow_map, setup_shadows
-
-pygame.mixer.init()
+from graphics.mesh_lod import MeshLodSelector, load_mesh_lods
+from graphics.render_queue import RenderQueue, LAYER_CHESSBOARD, LAYER_PIECES
+from util.profiler import profiler
+from util.startup_profiler import startup_profiler
+from graphics.profiler_overlay import ProfilerOverlay
+from graphics.dynamic_resolution import DynamicResolution
+from graphics.text_renderer import TextRenderer
+from graphics.menu_overlay import MenuOverlay
+from graphics.texture_array import TextureArray
+from graphics.frame_context import FrameContext, PieceTransformBatch, calc_square_position, calc_transform, get_square_transform, transform_points, is_rigid_transform, calc_normal_matrices, calc_ray_from_screen, intersect_ray_with_grid, intersect_ray_with_boxes
 
 # Global variables.
 game: Optional['ChessGame'] = None
 gui: Optional['SimpleGUI'] = None
 chessboard: dict = MODEL_TEMPLATE.copy()
-highlighted_square_model: dict = MODEL_TEMPLATE.copy()
-selected_square_model: dict = MODEL_TEMPLATE.copy()
-valid_move_square_model: dict = MODEL_TEMPLATE.copy()
-invalid_move_square_model: dict = MODEL_TEMPLATE.copy()
+board_highlights: dict = {} # The highlighted squares, drawn by the board's shader (see `setup_highlights`).
 pieces: dict = { color: { piece: MODEL_TEMPLATE.copy() for piece in PIECES } for color in PIECE_COLORS }
+# (Every skin of the board, and of the pieces, is a layer of one texture array: switching skins only changes the layer drawn, see `TextureArray`.)
+chessboard_textures = TextureArray(TEXTURE_ARRAY_LAYER_SIZE)
+piece_textures = TextureArray(TEXTURE_ARRAY_LAYER_SIZE)
 skybox: dict = {}
+skybox_streamer = CubemapStreamer(
+    max_face_size=calc_max_cubemap_face_size(SKYBOX_VRAM_BUDGET_MB),
+    preview_face_size=SKYBOX_PREVIEW_FACE_SIZE,
+    cache_dir=CACHE_DIR,
+    max_cached_sets=SKYBOX_CACHE_SIZE
+)
 shaderProgram: Optional[ShaderProgram] = None
-invalid_move_sound = pygame.mixer.Sound('./sounds/invalid-move.mp3')
-invalid_move_sound.set_volume(0.25)
-check_move_sound = pygame.mixer.Sound('./sounds/move-check.mp3')
-check_move_sound_played = False
+rigidShaderProgram: Optional[ShaderProgram] = None # (Variant of `shaderProgram` for objects that are only rotated, translated and scaled uniformly.)
+boardShaderProgram: Optional[ShaderProgram] = None # (Variant of `shaderProgram` that also draws the highlighted squares onto the board.)
+frame_data: Optional[UniformBuffer] = None # Per-frame view, projection, eye and light data (shared by every shader program).
+piece_animation_data: Optional[UniformBuffer] = None # The piece animation table (shared by the programs that draw the pieces, written once per move).
+loaded_assets: dict = {} # (kind, path) -> parsed model, decoded texture or mesh LODs (loaded once per session: a new OpenGL context only re-uploads them).
+is_scene_set_up: bool = False # Whether the window, its OpenGL context and the scene are set up (once per session, see `setup_3d_window`).
+scene_selections: dict = {} # The board, piece and skybox selections the scene shows (see `apply_scene_selections`).
 
 
 # ~ Camera
-view_matrix: Optional[np.ndarray] = None
-projection_matrix: Optional[np.ndarray] = None
-rotated_eye: Optional[np.ndarray] = None
 eye = np.array([0, 0, 2])  # Make the camera "eye" 2 units away from the origin along the positive z-axis.
 target = np.array([0, 0, 0])  # Make the camera look at (target) the origin.
 up = np.array([0, 1, 0]) # Make the camera's "up" direction the positive y-axis.
@@ -56,6 +68,8 @@ far_plane = 15
 fov = 45
 # Shadows
 lightPos = np.array([1, 1, 1])
+# (The camera and light matrices of the current frame, shared by every draw call):
+frame = FrameContext(fov, WINDOW["aspect_ratio"], near_plane, far_plane, lightPos, target, up)
 shadowTex_id = None
 shadowBuffer_id = None
 # (Mouse dragging - rotate around the board - uses yaw/pitch instead of angleX/angleY):
@@ -66,21 +80,31 @@ yaw: float = np.deg2rad(CAMERA_DEFAULT_YAW["white"])
 pitch: float = np.deg2rad(CAMERA_DEFAULT_PITCH)
 # (Mouse scrolling - zoom in/out - uses camera_distance to adjust the distance of the camera from the target):
 camera_distance: float = np.linalg.norm(eye)
-# (Camera-pan animation):
-target_yaw = yaw
-target_pitch = pitch
+# (Camera-pan animation, e.g. to the side of the player to move):
 is_animating = False
-animation_speed = CAMERA_DEFAULT_ANIMATION_SPEED
-# (Intro camera animation):
+camera_rotation_path: Optional[CameraPath] = None
+camera_rotation_time = 0
+# (Intro camera animation, compiled once: it ends where the camera rests):
 intro_animation_started = CAMERA_USE_INTRO_ANIMATION
 intro_animation_time = 0
-intro_keyframes = build_intro_camera_animations(yaw, pitch, camera_distance)["20"] # Change from range 1 to 23 for varying intro camera animations
-current_intro_keyframe = 0
-# ~ Piece animation:
-piece_animations = {}
-# ~ Hud text
-hudShaderProgram: Optional[ShaderProgram] = None
-hud_text_model: dict = MODEL_TEMPLATE.copy()
+intro_camera_path = CameraPath(load_camera_paths(CAMERA_PATHS_PATH)[CAMERA_INTRO_PATH]["keyframes"], home=(yaw, pitch, camera_distance)) # (See `CAMERA_INTRO_PATH`.)
+# ~ Piece animation (evaluated by the vertex shaders, see `PieceAnimationTable`):
+piece_animations = PieceAnimationTable(MAX_PIECE_ANIMATIONS, PIECE_ANIMATION_MAX_HEIGHT, PIECE_ANIMATION_SHAKE_INTENSITY)
+piece_batch = PieceTransformBatch() # (The model matrices of every piece on the board, computed once per frame.)
+# ~ Render queue (everything drawn by the shadow and main passes, submitted once per frame):
+render_queue = RenderQueue()
+profiler_overlay = ProfilerOverlay(profiler, PROFILER_OVERLAY_REFRESH_INTERVAL, PROFILER_OVERLAY_FONT_SIZE) # (Toggled with F3.)
+render_target = { "framebuffer": 0, "width": WINDOW["width"], "height": WINDOW["height"] } # Where the scene is drawn (0 := the window, see `set_render_target`).
+scene_clock: Optional[Callable[[], float]] = None # Returns the time (in seconds) the piece animations and the glow run on (None := pygame's clock, see `set_scene_clock`).
+dynamic_resolution = DynamicResolution(DYNAMIC_RESOLUTION_FRAME_TIME_BUDGET, DYNAMIC_RESOLUTION_MIN_SCALE, DYNAMIC_RESOLUTION_MAX_SCALE, DYNAMIC_RESOLUTION_SCALE_STEP) # (Toggled with F5.)
+dynamic_resolution.set_enabled(DYNAMIC_RESOLUTION)
+# ~ Mesh LOD (the pieces use a decimated mesh when they are small on the screen):
+piece_lod_selector = MeshLodSelector(MESH_LOD_SCREEN_RADII, MESH_LOD_HYSTERESIS, fov, WINDOW["height"])
+# ~ HUD text (drawn over the scene from a glyph atlas, see `update_hud_text`):
+text_renderer = TextRenderer(HUD_FONT_PATH, HUD_FONT_SIZE)
+hud_text_state: dict = {} # (The position the HUD's strings were laid out for.)
+# ~ Menus (drawn over the scene in the same OpenGL context, see `open_menu_surface`):
+menu_overlay = MenuOverlay()
 # ~ Indicators
 indicator_squares = {
     "whos_turn": MODEL_TEMPLATE.copy()  # Assuming MODEL_TEMPLATE is a dictionary or similar structure
@@ -107,14 +131,31 @@ for key, nested_values in indicator_square_ext.items():
 
 # ~ Main
 def setup_3d_graphics(new_game, new_gui, is_resume=False):
-    global game, gui, shaderProgram, intro_animation_started, shadowTex_id, shadowBuffer_id
+    global game, gui, intro_animation_started
     game = new_game
     gui = new_gui
     
-    # Reset the intro animation (if enabled).
+    # Reset the intro animation (if enabled), or the camera (e.g. after the main menu's orbit).
     if not is_resume:
         intro_animation_started = CAMERA_USE_INTRO_ANIMATION
         start_intro_camera_animation()
+        if not intro_animation_started: stop_intro_camera_animation()
+    
+    screen = setup_3d_window(game)
+    prepare_gui(gui, game)
+    
+    return screen
+
+def setup_3d_window(new_game):
+    '''
+    Creates the OpenGL window and sets up the scene in it, once per session: afterwards, it only applies the selections
+    changed since (e.g. in the store, see `apply_scene_selections`). The menus are drawn in the same context (see `open_menu_surface`).
+    '''
+    global game, is_scene_set_up
+    game = new_game
+    if is_scene_set_up:
+        apply_scene_selections(game)
+        return pygame.display.get_surface()
     
     # Set up OpenGL context's major and minor version numbers.
     pygame.display.gl_set_attribute(GL_CONTEXT_MAJOR_VERSION, 3)
@@ -126,8 +167,68 @@ def setup_3d_graphics(new_game, new_gui, is_resume=False):
         pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
         pygame.display.gl_set_attribute(pygame.GL_CONTEXT_FORWARD_COMPATIBLE_FLAG, True)
     
-    screen = pygame.display.set_mode(WINDOW["display"], DOUBLEBUF | OPENGL)
-    prepare_gui(gui, game)
+    try: screen = pygame.display.set_mode(WINDOW["display"], DOUBLEBUF | OPENGL, vsync=int(VSYNC))
+    except pygame.error: screen = pygame.display.set_mode(WINDOW["display"], DOUBLEBUF | OPENGL) # (The driver doesn't support vsync.)
+    ShaderProgram.invalidate_active_program() # (A new OpenGL context was created.)
+    set_render_target(0, WINDOW["width"], WINDOW["height"])
+    setup_3d_scene(game)
+    menu_overlay.setup(WINDOW["width"], WINDOW["height"])
+    is_scene_set_up = True
+    
+    return screen
+
+# ~ Menus
+def open_menu_surface(new_game, is_over_game=False):
+    '''
+    Returns the surface the menus are drawn on (drawn over the scene by `present_menu`, in the window's OpenGL context).
+    Over a game (e.g. the pause menu), the game's last frame is frozen behind the menu.
+    '''
+    setup_3d_window(new_game)
+    menu_overlay.is_frozen = False
+    if is_over_game:
+        draw_graphics(0, None, None, None, None)
+        menu_overlay.freeze(render_target["framebuffer"])
+    elif MAIN_MENU_3D_BACKGROUND:
+        stop_intro_camera_animation() # (The camera orbits the board from its resting position, the intro plays once the game starts, see `setup_3d_graphics`.)
+    return menu_overlay.surface
+
+def present_menu(delta_time):
+    '''
+    Draws the menu's surface over the frozen frame of the game, or over the live scene with the camera orbiting the board
+    (see `MAIN_MENU_3D_BACKGROUND`), then presents the frame.
+    '''
+    global yaw
+    if not menu_overlay.is_frozen and MAIN_MENU_3D_BACKGROUND:
+        apply_scene_selections(game) # (The store's changes show right away.)
+        yaw += np.deg2rad(MENU_CAMERA_ORBIT_SPEED) * delta_time
+        draw_graphics(delta_time, None, None, None, None)
+    elif not menu_overlay.is_frozen:
+        # (The menu's background image covers the window.)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glClear(GL_COLOR_BUFFER_BIT)
+    menu_overlay.draw()
+    pygame.display.flip()
+
+def apply_scene_selections(game):
+    '''
+    Applies the selections changed since the scene was set up (e.g. in the store): the board and piece skins are already in their texture arrays
+    (this only uploads their layers if they weren't streamed in yet, see `TextureArray`), the skybox is re-loaded.
+    '''
+    if game.board_selection != scene_selections["board"]:
+        chessboard_textures.require([CHESSBOARD_TEXTURE_PATHS[game.board_selection]])
+    if game.piece_selection != scene_selections["piece"]:
+        piece_textures.require(get_piece_texture_paths(game.piece_selection))
+    if game.skybox_selection != scene_selections["skybox"]:
+        load_skybox(game.skybox_selection)
+    record_scene_selections(game)
+
+def record_scene_selections(game):
+    scene_selections.update(board=game.board_selection, piece=game.piece_selection, skybox=game.skybox_selection)
+
+def setup_3d_scene(new_game):
+    ''' Sets up the OpenGL state and the 3D scene in the current OpenGL 3.3 context (the pygame window, or an offscreen context, see `graphics.headless`). '''
+    global game, shadowTex_id, shadowBuffer_id
+    game = new_game
     
     # Set the background color to a medium dark shade of cyan-blue: #4c6680
     glClearColor(0.3, 0.4, 0.5, 1.0)
@@ -140,53 +241,123 @@ def setup_3d_graphics(new_game, new_gui, is_resume=False):
     print("Selection", game.piece_selection)
     
     # Setup the 3D scene.
-    setup_generic_shaderProgram()
-    shadowBuffer_id, shadowTex_id = setup_shadows()
-    setup_chessboard()
-    setup_pieces()
-    setup_skybox(game)
+    with startup_profiler.phase("shaders"): setup_generic_shaderProgram()
+    with startup_profiler.phase("shadows"): shadowBuffer_id, shadowTex_id = setup_shadows()
+    with startup_profiler.phase("chessboard"): setup_chessboard()
+    with startup_profiler.phase("pieces"): setup_pieces()
+    setup_light_frustum()
+    with startup_profiler.phase("skybox"): setup_skybox(game)
     setup_highlights()
     setup_indicators()
+    record_scene_selections(game)
+    profiler_overlay.setup()
+    dynamic_resolution.invalidate() # (Its framebuffer is created by the next frame, in the current context.)
     
     # Setup the HUD text.
-    # setup_hudShaderProgram()
-    # setup_hud_text()
-    
-    return screen
+    if ENABLE_HUD_TEXT:
+        text_renderer.setup()
+        hud_text_state.clear()
+
+def set_render_target(framebuffer, width, height):
+    ''' Draws the scene into the given framebuffer (0 := the window) from now on. '''
+    render_target.update({ "framebuffer": framebuffer, "width": width, "height": height })
+
+def set_scene_clock(clock):
+    ''' Runs the piece animations and the glow on `clock()` (seconds) from now on, e.g. a fixed-step frame clock (None := pygame's clock). '''
+    global scene_clock
+    scene_clock = clock
+
+def get_scene_time():
+    return scene_clock() if scene_clock else pygame.time.get_ticks() / 1000.0
+
+# ~ Assets
+def load_asset(kind, path, load):
+    ''' Returns the asset `load()` loads from `path` (e.g. a parsed model), loaded on first use then kept for the session (see `loaded_assets`). '''
+    if (kind, path) not in loaded_assets: loaded_assets[(kind, path)] = load()
+    return loaded_assets[(kind, path)]
+
+def load_model(path):
+    return load_asset("model", path, lambda: ObjLoader(path))
+
+def load_texture_pixels(path, flip=False):
+    ''' Returns the decoded pixels and the size of a texture (see `load_texture`). '''
+    return load_asset(("texture", flip), path, lambda: load_texture(path, flip=flip))
 
 # ~ Graphics
 def draw_graphics(delta_time, highlighted_square, selected_square, valid_move_squares, invalid_move_square):
     global game, gui, intro_animation_started, chessboard, pieces, piece_animations
-    if not intro_animation_started: update_camera_animation(delta_time)
     
-    # Prepare the 3D scene.
+    # Prepare the 3D scene (drawn into a lower resolution framebuffer when dynamic resolution is enabled, then upscaled to the render target).
+    scene_target = dynamic_resolution.begin_frame(render_target)
+    glBindFramebuffer(GL_FRAMEBUFFER, scene_target["framebuffer"])
+    glViewport(0, 0, scene_target["width"], scene_target["height"])
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-
-    # Draw the 3D scene.
-    update_graphics(delta_time)
-    render_shadow_map(game, chessboard, pieces, piece_animations)
-    draw_chessboard()
-    draw_highlights(highlighted_square, selected_square, valid_move_squares, invalid_move_square)
+    update_skybox_streaming()
+    chessboard_textures.update()
+    piece_textures.update()
+
+    # Submit the 3D scene to the render queue (once per frame).
+    with profiler.section("update_graphics"):
+        update_graphics(delta_time)
+        render_queue.clear()
+        render_queue.reset_stats()
+        update_highlights(highlighted_square, selected_square, valid_move_squares, invalid_move_square)
+        submit_chessboard()
+        submit_pieces()
+    
+    # Draw the 3D scene (the shadow and main passes both draw from the render queue).
+    with profiler.section("render_shadow_map"):
+        render_shadow_map(render_queue, (piece_batch.version, frame.time if piece_animations.is_active(frame.time) else None), frame.light_frustum_planes, scene_target)
+    draw_render_queue()
     # draw_indicators(game)
-    draw_pieces()
-    draw_skybox()
+    with profiler.section("draw_skybox"):
+        draw_skybox()
+    dynamic_resolution.end_frame(render_target)
+    
+    # Draw text on top of the 3D scene (at the native resolution).
+    if ENABLE_HUD_TEXT:
+        with profiler.section("draw_hud_text"):
+            update_hud_text(game)
+            draw_hud_text()
     
-    # Draw text on top of the 3D scene.
-    # draw_text("Sample Text", WINDOW["width"] / 2, WINDOW["height"] / 2)
-    # draw_hud_text()
+    profiler_overlay.draw(render_target["width"], render_target["height"])
     
-    update_gui(gui, game)
+def draw_render_queue():
+    global render_queue, skybox, shadowTex_id
     
-def draw_highlights(highlighted_square, selected_square, valid_move_squares, invalid_move_square):
-    global highlighted_square_model, selected_square_model, valid_move_square_model
-    if highlighted_square != selected_square and highlighted_square != invalid_move_square: draw_at_board_position(highlighted_square_model, 7 - highlighted_square[1], highlighted_square[0])
-    if selected_square: draw_at_board_position(selected_square_model, 7 - selected_square[1], selected_square[0])
+    # Bind the textures shared by every object once: the skybox (for environment mapping) and the shadow map.
+    glActiveTexture(GL_TEXTURE1)
+    glBindTexture(GL_TEXTURE_CUBE_MAP, skybox["texture_id"])
+    glActiveTexture(GL_TEXTURE2)
+    glBindTexture(GL_TEXTURE_2D, shadowTex_id)
+    glActiveTexture(GL_TEXTURE3)
+    glBindTexture(GL_TEXTURE_2D, board_highlights["mask_texture_id"])
+    
+    # Draw the objects (sorted by layer, shader, VAO and texture) that are inside the view frustum (one layer at a time, so each is profiled on its own).
+    # (The board's shader draws the highlighted squares too.)
+    with profiler.section("draw_chessboard"):
+        render_queue.draw(default_uniforms={ "isGlowing": False, "animationSlot": 0 }, frustum_planes=frame.view_frustum_planes, layers=(LAYER_CHESSBOARD,))
+    with profiler.section("draw_pieces"):
+        render_queue.draw(default_uniforms={ "isGlowing": False, "animationSlot": 0 }, frustum_planes=frame.view_frustum_planes, layers=(LAYER_PIECES,))
+
+def update_highlights(highlighted_square, selected_square, valid_move_squares, invalid_move_square):
+    global board_highlights
+    
+    # Mark the highlight of each square in the mask (each write replaces the previous one on its square).
+    # (Priority, lowest first: valid move, hovered, selected, invalid move - i.e. the hovered square stays visible over the valid moves.)
+    mask = np.zeros((8, 8), dtype=np.uint8)
     if valid_move_squares:
-        for square in valid_move_squares:
-            draw_at_board_position(valid_move_square_model, 7 - square[1], square[0])
-    if invalid_move_square: 
-        invalid_move_sound.play()
-        draw_at_board_position(invalid_move_square_model, 7 - invalid_move_square[1], invalid_move_square[0])
+        for square in valid_move_squares: mask[7 - square[1], square[0]] = 3
+    if highlighted_square: mask[7 - highlighted_square[1], highlighted_square[0]] = 1
+    if selected_square: mask[7 - selected_square[1], selected_square[0]] = 2
+    if invalid_move_square: mask[7 - invalid_move_square[1], invalid_move_square[0]] = 4
+    
+    # Only re-upload the mask when the highlights change.
+    if np.array_equal(mask, board_highlights["mask"]): return
+    board_highlights["mask"] = mask
+    glActiveTexture(GL_TEXTURE3)
+    glBindTexture(GL_TEXTURE_2D, board_highlights["mask_texture_id"])
+    glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, 8, 8, GL_RED_INTEGER, GL_UNSIGNED_BYTE, mask)
     
 def setup_indicators():
     global indicator_squares
@@ -202,367 +373,205 @@ def draw_indicators(game):
     draw_at_board_position(indicator_squares[indicator_to_use], 7 - indicator_squares[indicator_to_use]["position"][whos_turn]["row"], indicator_squares[indicator_to_use]["position"][whos_turn]["col"])
 
 def update_graphics(delta_time):
-    global rotated_eye, camera_distance, yaw, pitch, view_matrix, projection_matrix, is_animating
+    global camera_distance, yaw, pitch, is_animating, frame, frame_data, piece_batch
     update_animations(delta_time)
+    current_time = get_scene_time()
     
-    # Calculate camera position using spherical coordinates.
-    camera_x = camera_distance * np.sin(pitch) * np.cos(yaw)
-    camera_y = camera_distance * np.cos(pitch)
-    camera_z = camera_distance * np.sin(pitch) * np.sin(yaw)
-    rotated_eye = np.array([camera_x, camera_y, camera_z])
-
-    view_matrix = pyrr.matrix44.create_look_at(rotated_eye, target, up)
+    # Compute the model matrices of all pieces (shared by the shadow and draw passes), after freeing the animations that are over.
+    piece_animations.recycle(current_time)
+    piece_batch.update(game.board, piece_animations)
+    
+    # Update the camera (the projection and light matrices never change, see `FrameContext`).
+    frame.update(yaw, pitch, camera_distance, current_time)
     
-    # Create a 4x4 projection matrix (to define the perspective projection).
-    projection_matrix = pyrr.matrix44.create_perspective_projection(fov, WINDOW["aspect_ratio"], near_plane, far_plane)
+    # Upload the per-frame data (shared by every shader program) once.
+    frame_data["view_matrix"] = frame.view_matrix
+    frame_data["eye_pos"] = frame.eye
+    frame_data["time"] = frame.time
+    frame_data.upload()
+    
+    # Upload the piece animation table (only after a move: the animations are evaluated from the frame's time).
+    if piece_animations.is_dirty:
+        piece_animations.write(piece_animation_data)
+        piece_animation_data.upload()
     
 def cleanup_graphics():
     global chessboard, skybox 
     glDeleteVertexArrays(2, [chessboard["vao"], skybox["vao"]])
     glDeleteBuffers(2, [chessboard["vbo"], skybox["vbo"]])
     glDeleteProgram(shaderProgram.shader)
+    glDeleteProgram(rigidShaderProgram.shader)
+    glDeleteProgram(boardShaderProgram.shader)
+    profiler_overlay.cleanup()
+    dynamic_resolution.cleanup()
+    text_renderer.cleanup()
+    menu_overlay.cleanup()
+    glDeleteTextures(1, [board_highlights["mask_texture_id"]])
+    chessboard_textures.cleanup()
+    piece_textures.cleanup()
+    for square_model in indicator_squares.values(): square_model["texture_array"].cleanup()
     glDeleteProgram(skybox["shaderProgram"].shader)
+    frame_data.delete()
+    piece_animation_data.delete()
 
 # ~ HUD text
-# def draw_text(text, x, y, font_size=32, color=(255, 255, 255)):
-#     font = pygame.font.SysFont('arial', 64)
-#     textSurface = font.render(text, True, color).convert_alpha()
-#     textData = pygame.image.tostring(textSurface, "RGBA", True)
-#     glWindowPos2d(x, y)
-#     glDrawPixels(textSurface.get_width(), textSurface.get_height(), GL_RGBA, GL_UNSIGNED_BYTE, textData)
-    
-def setup_hud_text():
-    global hud_text_model
-    hud_text_model["obj"] = ObjLoader(HUD_TEXT_MODEL_OBJECT_PATH)
-    
-    # Create a VAO and VBO for the object.
-    hud_text_model["vao"] = glGenVertexArrays(1)
-    hud_text_model["vbo"] = glGenBuffers(1)
-    
-    # Upload the object's model data to the GPU.
-    glBindVertexArray(hud_text_model["vao"])
-    glBindBuffer(GL_ARRAY_BUFFER, hud_text_model["vbo"])
-    glBufferData(GL_ARRAY_BUFFER, hud_text_model["obj"].vertices, GL_STATIC_DRAW)
-    
-    # Configure the vertex attributes for the object (position, normal, and uv).
-    position_loc, normal_loc, uv_loc = 0, 1, 2
-    glVertexAttribPointer(position_loc, hud_text_model["obj"].size_position, GL_FLOAT,
-                          GL_FALSE, hud_text_model["obj"].stride, ctypes.c_void_p(hud_text_model["obj"].offset_position))
-    glVertexAttribPointer(normal_loc, hud_text_model["obj"].size_normal, GL_FLOAT,
-                          GL_FALSE, hud_text_model["obj"].stride, ctypes.c_void_p(hud_text_model["obj"].offset_normal))
-    glVertexAttribPointer(uv_loc, hud_text_model["obj"].size_texture, GL_FLOAT,
-                          GL_FALSE, hud_text_model["obj"].stride, ctypes.c_void_p(hud_text_model["obj"].offset_texture))
-    glEnableVertexAttribArray(position_loc)
-    glEnableVertexAttribArray(normal_loc)
-    glEnableVertexAttribArray(uv_loc)
-    
-    # Create a 4x4 model matrix (to transform the object from model space to world space) for the object.
-    scale_factor = 2 / hud_text_model["obj"].dia
-    translation_matrix = pyrr.matrix44.create_from_translation(-hud_text_model["obj"].center)
-    scale_matrix = pyrr.matrix44.create_from_scale([scale_factor, scale_factor, scale_factor])
-    hud_text_model["model_matrix"] = pyrr.matrix44.multiply(translation_matrix, scale_matrix)
-    
-    # Load the object's texture.
-    hud_text_model["texture"] = {}
-    hud_text_model["texture"]["texture_pixels"], hud_text_model["texture"]["texture_size"] = load_texture(HUD_TEXT_EXAMPLE_TEXTURE_PATH, flip=True)
-    hud_text_model["texture"]["texture_id"] = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, hud_text_model["texture"]["texture_id"])
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, hud_text_model["texture"]["texture_size"]["width"], hud_text_model["texture"]["texture_size"]["height"],
-                 0, GL_RGB, GL_UNSIGNED_BYTE, hud_text_model["texture"]["texture_pixels"])
-
-# # It's recommend to draw head-up display elements using orthographic projection.
-# # • Source: https://stackoverflow.com/a/54086253
-# def draw_hud_text():
-#     # # Apply the projection matrix to the projection matrix stack and the model matrix to the model view matrix stack.
-#     # # • See glMatrixMode (https://www.khronos.org/registry/OpenGL-Refpages/gl2.1/xhtml/glMatrixMode.xml):
-#     # glMatrixMode(GL_PROJECTION)
-#     # gluPerspective(45, (WINDOW['width'] / WINDOW['height']), 0.1, 100.0)
-
-#     # glMatrixMode(GL_MODELVIEW)
-#     # glTranslatef(0.0, 0.0, -5)
-    
-#     # # Since the cross hair always should be on top of the view, you have to disable the depth test.
-#     # glDisable(GL_DEPTH_TEST)
-
-#     # mX, mY = pygame.mouse.get_pos()
-#     # Crosshair(mX, 600-mY, 20)
-
-#     # glEnable(GL_DEPTH_TEST)
-    
-#     # # Likely you can change the depth function (glDepthFunc) to GL_ALWAYS and change the glDepthMask.
-    
-#     # # Use glLoadIdentity to lad the identity matrix and use glOrtho to set up an orthographic projection 1:1 to window coordinates;
-#     # glLoadIdentity()
-#     # glOrtho(0.0, WINDOW['width'], 0.0, WINDOW['height'], -1.0, 1.0)
-    
-#     # # Use glPushMatrix/glPopMatrix to store and restore the matrixes on the matrix stack:
-#     pass
-  
-def create_orthographic_projection_matrix():
-    left, right = 0, WINDOW["width"]
-    bottom, top = 0, WINDOW["height"]
-    near, far = -1, 1
-    return pyrr.matrix44.create_orthogonal_projection_matrix(left, right, bottom, top, near, far)
+def update_hud_text(game):
+    ''' Lays out the HUD's strings: whose turn it is, check and the result, and the last moves (only when the position changed). '''
+    board = game.board
+    state = (len(board.move_stack), board.peek() if board.move_stack else None)
+    if state == hud_text_state.get("state"): return
+    hud_text_state["state"] = state
+    
+    margin = HUD_TEXT_MARGIN
+    text_renderer.set_text("turn", f"{game.get_whos_turn().capitalize()}'s turn", (WINDOW["width"] / 2, margin), HUD_TEXT_COLOR, anchor="midtop")
+    
+    # Check, and the result once the game is over (the claimable draws are left to `ChessGame.get_game_result`).
+    outcome = board.outcome()
+    if outcome: status = "Draw" if outcome.winner is None else f"Checkmate! {'White' if outcome.winner == chess.WHITE else 'Black'} wins"
+    else: status = "Check!" if board.is_check() else ""
+    text_renderer.set_text("status", status, (WINDOW["width"] / 2, margin + text_renderer.line_height), HUD_TEXT_ALERT_COLOR, anchor="midtop")
+    
+    # The move list (in SAN, one full move per line), replayed from the starting position.
+    replay_board, moves = board.root(), []
+    for move in board.move_stack:
+        moves.append(replay_board.san(move))
+        replay_board.push(move)
+    lines = [f"{i // 2 + 1}. {' '.join(moves[i:i + 2])}" for i in range(0, len(moves), 2)][-HUD_MOVE_LIST_LENGTH:]
+    text_renderer.set_text("moves", "\n".join(lines), (WINDOW["width"] - margin, margin), HUD_TEXT_COLOR, anchor="topright")
 
 def draw_hud_text():
-    global hud_text_model, hudShaderProgram
-
-    # Use the shader program for HUD
-    glUseProgram(hudShaderProgram.shader)
-
-    # Create Orthographic Projection Matrix
-    ortho_projection = create_orthographic_projection_matrix()
-
-    # Update shader uniforms
-    hudShaderProgram["model_matrix"] = hud_text_model["model_matrix"]
-    hudShaderProgram["projection_matrix"] = ortho_projection
-
-    # Disable Depth Test
-    glDisable(GL_DEPTH_TEST)
-
-    # Bind texture
-    glActiveTexture(GL_TEXTURE0)
-    glBindTexture(GL_TEXTURE_2D, hud_text_model["texture"]["texture_id"])
-
-    # Draw the HUD Text
-    glBindVertexArray(hud_text_model["vao"])
-    glDrawArrays(GL_TRIANGLES, 0, hud_text_model["obj"].n_vertices)
-
-    # Re-enable Depth Test
-    glEnable(GL_DEPTH_TEST)
-
-    # Unbind shader program
-    glUseProgram(0)
-    
-# def draw_hud_text():
-#     global hud_text_model, view_matrix, projection_matrix, rotated_eye, shaderProgram
-    
-#     # Get the inverse of the view matrix to obtain the camera's orientation.
-#     inv_view_matrix = np.linalg.inv(view_matrix)
-
-#     # Calculate a position in front of the camera.
-#     # This position is relative to the near plane.
-#     hud_distance = near_plane + 0.1  # Slightly in front of the near plane to avoid clipping.
-#     hud_position = np.array([0, 0, -hud_distance, 1])  # In the camera's local space.
-
-#     # Transform the position to world space using the inverse view matrix.
-#     hud_position_world = inv_view_matrix @ hud_position
-
-#     # Calculate the scale for the HUD text.
-#     hud_scale = 0.15  # Adjust this value as needed for a suitable size.
-#     hud_scale_matrix = pyrr.matrix44.create_from_scale([hud_scale, hud_scale, hud_scale])
-
-#     # Create a rotation matrix to rotate the HUD text by 90 degrees around the x-axis.
-#     hud_rotation_matrix = pyrr.matrix44.create_from_x_rotation(np.radians(90))
-
-#     # Create a translation matrix to position the HUD text in front of the camera.
-#     hud_translation_matrix = pyrr.matrix44.create_from_translation(hud_position_world[:3])
-
-#     # Combine the scale, rotation, and translation transformations.
-#     hud_model_matrix = pyrr.matrix44.multiply(hud_scale_matrix, hud_rotation_matrix)
-#     hud_model_matrix = pyrr.matrix44.multiply(hud_model_matrix, hud_translation_matrix)
-
-#     # Send the model matrix to the shader.
-#     shaderProgram["model_matrix"] = hud_model_matrix
-#     shaderProgram["view_matrix"] = np.eye(4)  # Use an identity matrix for the view matrix.
-#     shaderProgram["projection_matrix"] = projection_matrix
-#     shaderProgram["eye_pos"] = rotated_eye
-
-#     # Bind the object's texture.
-#     glActiveTexture(GL_TEXTURE0)
-#     glBindTexture(GL_TEXTURE_2D, hud_text_model["texture"]["texture_id"])
-
-#     # Draw the object.
-#     glBindVertexArray(hud_text_model["vao"])
-#     glDrawArrays(GL_TRIANGLES, 0, hud_text_model["obj"].n_vertices)
+    text_renderer.draw(render_target["width"], render_target["height"])
     
 # ~ Shader setup
 def setup_generic_shaderProgram():
-    global shaderProgram
+    global shaderProgram, rigidShaderProgram, boardShaderProgram, frame_data, piece_animation_data
     
     # Create a new (generic) shader program (compiles the object's shaders).
-    shaderProgram = ShaderProgram("shaders/obj/vert.glsl", "shaders/obj/frag.glsl")
-    
-    # Assign the texture units to the shader.
-    shaderProgram["tex2D"] = 0
-    shaderProgram["cubeMapTex"] = 1
-    shaderProgram["depthTex"] = 2
+    # The rigid variant transforms the normals by the model matrix directly (instead of a normal matrix).
+    # The board variant also draws the highlighted squares (from a mask texture, see `setup_highlights`).
+    defines = { "MAX_PIECE_ANIMATIONS": MAX_PIECE_ANIMATIONS }
+    shaderProgram = ShaderProgram("shaders/obj/vert.glsl", "shaders/obj/frag.glsl", defines=defines)
+    rigidShaderProgram = ShaderProgram("shaders/obj/vert.glsl", "shaders/obj/frag.glsl", defines={ **defines, "RIGID_TRANSFORMS": 1 })
+    boardShaderProgram = ShaderProgram("shaders/obj/vert.glsl", "shaders/obj/frag.glsl", defines={ **defines, "BOARD_HIGHLIGHTS": 1, "N_HIGHLIGHT_COLORS": len(BOARD_HIGHLIGHT_TEXTURE_PATHS) })
+    
+    # Create the uniform buffer for the per-frame data (its layout is read from the program).
+    frame_data = UniformBuffer(shaderProgram, FRAME_DATA_UNIFORM_BLOCK, FRAME_DATA_BINDING_POINT)
+    
+    # The projection never changes, so it is only written once (see `update_graphics` for the rest, and `setup_light_frustum` for the light data).
+    frame_data["projection_matrix"] = frame.projection_matrix
+    
+    rigidShaderProgram.bind_uniform_block(FRAME_DATA_UNIFORM_BLOCK, FRAME_DATA_BINDING_POINT)
+    boardShaderProgram.bind_uniform_block(FRAME_DATA_UNIFORM_BLOCK, FRAME_DATA_BINDING_POINT)
+    
+    # Create the uniform buffer for the piece animation table (and write the current table to it, e.g. after the context was recreated).
+    piece_animation_data = UniformBuffer(shaderProgram, PIECE_ANIMATION_UNIFORM_BLOCK, PIECE_ANIMATION_BINDING_POINT)
+    rigidShaderProgram.bind_uniform_block(PIECE_ANIMATION_UNIFORM_BLOCK, PIECE_ANIMATION_BINDING_POINT)
+    boardShaderProgram.bind_uniform_block(PIECE_ANIMATION_UNIFORM_BLOCK, PIECE_ANIMATION_BINDING_POINT)
+    piece_animations.is_dirty = True
+    
+    # Assign the texture units to the shaders.
+    for program in (shaderProgram, rigidShaderProgram, boardShaderProgram):
+        program["texArray"] = 0
+        program["cubeMapTex"] = 1
+        program["depthTex"] = 2
+    boardShaderProgram["highlightMask"] = 3
+
+def get_object_program(model):
+    ''' Returns the shader program to draw a model with: the rigid variant, unless its model matrix skews the normals (i.e. a non-uniform scale). '''
+    if "is_rigid" not in model: model["is_rigid"] = is_rigid_transform(model["model_matrix"])
+    return rigidShaderProgram if model["is_rigid"] else shaderProgram
+
+    
+# ~ Shadows
+def setup_light_frustum():
+    ''' Fits the (static) light frustum around the chessboard and the highest a piece can be lifted, then writes the light data once. '''
+    global frame, frame_data, chessboard, pieces
+    board_positions = transform_points(chessboard["obj"].v, chessboard["model_matrix"])
+    lifted_transform = calc_transform([0, PIECE_ANIMATION_MAX_HEIGHT, 0])
+    piece_height = max(transform_points(pieces[color][piece]["obj"].v, lifted_transform @ pieces[color][piece]["model_matrix"])[:, 1].max() for color in PIECE_COLORS for piece in PIECES)
+    bounds_min, bounds_max = board_positions.min(axis=0), board_positions.max(axis=0)
+    bounds_max[1] = max(bounds_max[1], piece_height)
+    frame.fit_light_frustum(bounds_min, bounds_max)
+
+    frame_data["light_view_mat"] = frame.light_view_matrix
+    frame_data["light_projection_mat"] = frame.light_projection_matrix
+    frame_data["lightPos"] = frame.light_position
 
-    
-def setup_hudShaderProgram():
-    global hudShaderProgram
-    
-    # Create a new HUD shader program (compiles the hud's shaders).
-    hudShaderProgram = ShaderProgram("shaders/hud/vert.glsl", "shaders/hud/frag.glsl")
-    
-    # Assign the texture units to the shader.
-    hudShaderProgram["tex2D"] = 0
-    
 # ~ Animations
 def update_animations(delta_time):
+    # (The piece animations are evaluated by the vertex shaders, see `PieceAnimationTable`.)
     update_camera_animation(delta_time)
-    for initial_piece_location, animation in piece_animations.items():
-        if animation["is_active"]:
-            update_piece_animation(animation, delta_time)
     
 # ~ Camera intro animation
 def start_intro_camera_animation():
-    global intro_animation_time, current_intro_keyframe
+    global intro_animation_time
     intro_animation_time = 0
-    current_intro_keyframe = 0
     
 def stop_intro_camera_animation():
-    global intro_animation_started, current_intro_keyframe, yaw, pitch
+    global intro_animation_started, yaw, pitch, camera_distance
     intro_animation_started = False
-    current_intro_keyframe = len(intro_keyframes) - 1  # Set to the last keyframe.
+    yaw, pitch, camera_distance = intro_camera_path.sample(intro_camera_path.duration) # (Jump to the end of the intro.)
 
 # ~ Piece animation
-def create_piece_animation(from_square, to_square, piece, start_time, duration):
-    global piece_animations
-    
-    # Use the starting square as the unique key for the animation
-    from_world_position = calculate_world_position(from_square)
-    to_world_position = calculate_world_position(to_square)
-    
-    piece_animations[to_square] = {
-        "start_position": from_world_position,
-        "end_position": to_world_position,
-        "current_position": from_world_position,
-        "start_time": start_time,
-        "duration": duration,
-        "piece": piece,
-        "from_square": from_square,
-        "to_square": to_square,
-        "is_active": True
-    }
-
-def update_piece_animation(animation, delta_time):
-    current_time = pygame.time.get_ticks() / 1000.0
-    progress = (current_time - animation["start_time"]) / animation["duration"]
-
-    if progress < 1:
-        # Define the proportions and maximum height as before
-        ascend_proportion = 0.25
-        descend_proportion = 0.25
-        move_proportion = 0.5
-        max_height = 2.5
-        max_shake_intensity = 0.05
-
-        # Adjust the range for shake progress
-        if progress < ascend_proportion:  # Ascending phase
-            eased_progress = ease_in_out(progress / ascend_proportion)
-            height = eased_progress * max_height
-            position = np.array([animation["start_position"][0], height, animation["start_position"][2]])
-
-            # Apply shake towards the end of the ascending phase
-            if progress > ascend_proportion * 0.7:  # Start shaking earlier
-                shake_progress = (progress - ascend_proportion * 0.7) / (ascend_proportion * 0.3)
-                position = add_shake(position, shake_progress, max_shake_intensity)
-
-            animation["current_position"] = position
-        
-        elif progress < ascend_proportion + move_proportion:  # Moving phase
-            eased_progress = ease_in_out((progress - ascend_proportion) / move_proportion)
-            horizontal_position = interpolate(animation["start_position"], animation["end_position"], eased_progress)
-            animation["current_position"] = np.array([horizontal_position[0], max_height, horizontal_position[2]])
-
-        else:  # Descending phase
-            eased_progress = ease_in_out((progress - ascend_proportion - move_proportion) / descend_proportion)
-            height = max_height * (1 - eased_progress)
-            position = np.array([animation["end_position"][0], height, animation["end_position"][2]])
-
-            # Apply shake at the start of the descending phase
-            if progress < ascend_proportion + move_proportion + descend_proportion * 0.3:  # Shake for a longer duration
-                shake_progress = (progress - ascend_proportion - move_proportion) / (descend_proportion * 0.3)
-                position = add_shake(position, shake_progress, max_shake_intensity)
-
-            animation["current_position"] = position
-    else:
-        animation["is_active"] = False
-        animation["current_position"] = animation["end_position"]
-
-def interpolate(start_position, end_position, progress):
-    # Use easing function to interpolate
-    eased_progress = ease_in_out(progress)
-    return tuple(np.add(start_position, np.multiply(np.subtract(end_position, start_position), eased_progress)))
+def create_piece_animation(from_square, to_square, piece, start_time, duration, curve="arc"):
+    ''' Animates the piece moved from `from_square` to `to_square` (see `PIECE_ANIMATION_CURVES`): the table is uploaded once, by the next frame. '''
+    piece_animations.add(calculate_world_position(from_square), calculate_world_position(to_square), to_square, start_time, duration, curve)
 
 def calculate_world_position(board_square):
-    # Assuming the chessboard is 8x8 units and centered at the origin
-    # and each square size is 1.575 units (as used in draw_piece_at_board_position).
-    square_size = 1.575
-    half_board_size = 8 / 2 * square_size
-
     # Convert algebraic chess notation to row and column
     file = ord(board_square[0]) - ord('a')
     rank = 8 - int(board_square[1])
 
-    # Calculate the world position based on the row and column
-    world_x = (file - 3.5) * square_size
-    world_z = (rank - 3.5) * square_size
-    world_y = 0  # Assuming the pieces are placed at y=0
+    # Calculate the world position based on the row and column (the pieces are placed at y=0).
+    return calc_square_position(rank, file)
+
+# ~ Debug toggles
+def toggle_profiler_overlay():
+    profiler_overlay.toggle()
 
-    return np.array([world_x, world_y, world_z])
+def toggle_dynamic_resolution():
+    dynamic_resolution.set_enabled(not dynamic_resolution.is_enabled)
+    print("Dynamic resolution", "enabled" if dynamic_resolution.is_enabled else "disabled")
+
+# ~ Scene activity (see `FrameScheduler`)
+def is_scene_animating():
+    ''' Returns whether the scene changes from frame to frame (i.e. it has to be re-rendered continuously). '''
+    # (Camera drags and every other input are events, which request a redraw by themselves.)
+    return bool(intro_animation_started or is_animating or skybox.get("is_streaming")
+                or piece_animations.is_active(get_scene_time()))
+
+def is_scene_pulsing():
+    ''' Returns whether the glow of a king pulses (see `submit_pieces`). '''
+    return DISPLAY_TURN
+
+# ~ Camera placement (e.g. a scripted camera path)
+def set_camera(yaw_degrees, pitch_degrees, distance):
+    ''' Places the camera (stopping any camera animation). '''
+    global yaw, pitch, camera_distance, intro_animation_started, is_animating
+    intro_animation_started, is_animating = False, False
+    yaw, pitch = np.deg2rad(yaw_degrees), np.deg2rad(pitch_degrees)
+    camera_distance = distance
 
 # ~ Camera rotation animation (ease-in-out)
-def start_camera_rotation_animation(new_yaw_degrees=yaw, new_pitch_degrees=pitch):
-    global target_yaw, target_pitch, is_animating
-    target_yaw = np.deg2rad(new_yaw_degrees)
-    target_pitch = np.deg2rad(new_pitch_degrees)
+def start_camera_rotation_animation(new_yaw_degrees=CAMERA_DEFAULT_YAW["white"], new_pitch_degrees=CAMERA_DEFAULT_PITCH):
+    ''' Rotates the camera to the given yaw and pitch (compiled into a camera path once, see `CameraPath`; only its yaw and pitch are used, so the camera can be zoomed meanwhile). '''
+    global camera_rotation_path, camera_rotation_time, is_animating
+    keyframes = [(0, np.rad2deg(yaw), np.rad2deg(pitch), camera_distance), (CAMERA_SIDE_SWITCH_DURATION, new_yaw_degrees, new_pitch_degrees, camera_distance)]
+    camera_rotation_path = CameraPath(keyframes)
+    camera_rotation_time = 0
     is_animating = True
     
 def update_camera_animation(delta_time):
-    global yaw, pitch, camera_distance, intro_animation_time, current_intro_keyframe, intro_animation_started, is_animating, target_yaw, target_pitch
-    
-    # If the intro animation is active, update it.
-    if intro_animation_started and current_intro_keyframe < len(intro_keyframes) - 1:
-        # Calculate the progress between the current and the next keyframe.
-        start_frame = intro_keyframes[current_intro_keyframe]
-        end_frame = intro_keyframes[current_intro_keyframe + 1]
-        frame_duration = end_frame["time"] - start_frame["time"]
-        progress = (intro_animation_time - start_frame["time"]) / frame_duration
-        eased_progress = ease_in_out(progress)
-        
-        # Interpolate yaw, pitch, and distance.
-        yaw = np.interp(eased_progress, [0, 1], [start_frame["yaw"], end_frame["yaw"]])
-        pitch = np.interp(eased_progress, [0, 1], [start_frame["pitch"], end_frame["pitch"]])
-        camera_distance = np.interp(eased_progress, [0, 1], [start_frame["distance"], end_frame["distance"]])
-        
-        # Update the time and check if we should move to the next keyframe.
+    ''' Moves the camera along the intro or the camera rotation (one lookup into the compiled path per frame). '''
+    global yaw, pitch, camera_distance, intro_animation_time, intro_animation_started, is_animating, camera_rotation_time
+    if intro_animation_started:
         intro_animation_time += delta_time
-        if intro_animation_time >= end_frame["time"]:
-            current_intro_keyframe += 1
-            if current_intro_keyframe >= len(intro_keyframes) - 1:
-                intro_animation_started = False  # End the intro animation.
+        yaw, pitch, camera_distance = intro_camera_path.sample(intro_animation_time)
+        if intro_animation_time >= intro_camera_path.duration: intro_animation_started = False # End the intro animation.
     elif is_animating:
-        # Define the threshold (in degrees) for when to stop the animation.
-        threshold = 0.1
-
-        # Convert yaw and pitch to degrees for easier control.
-        yaw_degrees = np.rad2deg(yaw)
-        pitch_degrees = np.rad2deg(pitch)
-        target_yaw_degrees = np.rad2deg(target_yaw)
-        target_pitch_degrees = np.rad2deg(target_pitch)
-
-        # Calculate the difference between current and target angles in degrees.
-        yaw_difference = target_yaw_degrees - yaw_degrees
-        pitch_difference = target_pitch_degrees - pitch_degrees
-
-        # Interpolate angles with an ease-out effect.
-        yaw_degrees += yaw_difference * animation_speed * delta_time
-        pitch_degrees += pitch_difference * animation_speed * delta_time
-
-        # Convert back to radians for the view matrix calculation.
-        yaw = np.deg2rad(yaw_degrees)
-        pitch = np.deg2rad(pitch_degrees)
-
-        # Check if the animation is close to finishing: if so, stop the animation.
-        if abs(yaw_difference) < threshold and abs(pitch_difference) < threshold:
-            yaw, pitch = np.deg2rad(target_yaw_degrees), np.deg2rad(target_pitch_degrees)
-            is_animating = False
+        camera_rotation_time += delta_time
+        yaw, pitch, _ = camera_rotation_path.sample(camera_rotation_time) # (The distance is left to the scroll zoom.)
+        if camera_rotation_time >= camera_rotation_path.duration: is_animating = False
 
 def rotate_camera_to_side(side):
     ''' Rotate the camera to view the board from a given side. '''
@@ -575,7 +584,7 @@ def rotate_camera_to_side(side):
 # ~ Chessboard
 def setup_chessboard():
     global chessboard
-    chessboard["obj"] = ObjLoader(CHESSBOARD_OBJECT_PATH)
+    chessboard["obj"] = load_model(CHESSBOARD_OBJECT_PATH)
     
     # Create a VAO and VBO for the object.
     chessboard["vao"] = glGenVertexArrays(1)
@@ -604,58 +613,52 @@ def setup_chessboard():
     scale_matrix = pyrr.matrix44.create_from_scale([scale_factor, scale_factor, scale_factor])
     chessboard["model_matrix"] = pyrr.matrix44.multiply(translation_matrix, scale_matrix)
     
-    # Load the object's texture.
-    chessboard["texture"] = {}
-    if(game.board_selection == 0):
-        chessboard["texture"]["texture_pixels"], chessboard["texture"]["texture_size"] = load_texture(WOOD_CHESSBOARD_TEXTURE_PATH, flip=True)
-    elif(game.board_selection == 1):
-        chessboard["texture"]["texture_pixels"], chessboard["texture"]["texture_size"] = load_texture(CLASSIC_CHESSBOARD_TEXTURE_PATH, flip=True)
-    elif(game.board_selection == 2):
-        chessboard["texture"]["texture_pixels"], chessboard["texture"]["texture_size"] = load_texture(RGB_CHESSBOARD_TEXTURE_PATH, flip=True)
-
-    
-    
-    chessboard["texture"]["texture_id"] = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, chessboard["texture"]["texture_id"])
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, chessboard["texture"]["texture_size"]["width"], chessboard["texture"]["texture_size"]["height"],
-                 0, GL_RGB, GL_UNSIGNED_BYTE, chessboard["texture"]["texture_pixels"])
-
-def draw_chessboard():
-    global chessboard, view_matrix, projection_matrix, rotated_eye, shaderProgram
-    
-    # Send each matrix (model, view, and projection) to the object's shader.
-    glUseProgram(shaderProgram.shader)
-    shaderProgram["model_matrix"] = chessboard["model_matrix"]
-    shaderProgram["view_matrix"] = view_matrix
-    shaderProgram["projection_matrix"] = projection_matrix
-    shaderProgram["eye_pos"] = rotated_eye
-    
-    # Bind the object's texture.
-    glActiveTexture(GL_TEXTURE0)
-    glBindTexture(GL_TEXTURE_2D, chessboard["texture"]["texture_id"])
+    # Load every board skin into a texture array (the board is drawn with the layer of the selected one, see `submit_chessboard`).
+    chessboard_textures.setup(CHESSBOARD_TEXTURE_PATHS, required_paths=[CHESSBOARD_TEXTURE_PATHS[game.board_selection]])
+    chessboard["texture"] = { "texture_id": chessboard_textures.texture_id, "target": GL_TEXTURE_2D_ARRAY }
 
-    # Bind the skybox texture (for environment mapping).
-    glActiveTexture(GL_TEXTURE1)
-    glBindTexture(GL_TEXTURE_CUBE_MAP, skybox["texture_id"])
-
-    # Draw the object.
-    glBindVertexArray(chessboard["vao"])
-    glDrawArrays(GL_TRIANGLES, 0, chessboard["obj"].n_vertices)
+def submit_chessboard():
+    global chessboard, shaderProgram
+    
+    # (The chessboard doesn't cast shadows: there is nothing for it to cast shadows onto.)
+    # (The board's program draws the highlighted squares too, so the board and every highlight take a single draw call.)
+    uniforms = { "normal_matrix": calc_normal_matrices(chessboard["model_matrix"]), "textureLayer": chessboard_textures.get_layer(CHESSBOARD_TEXTURE_PATHS[game.board_selection]) }
+    render_queue.submit(LAYER_CHESSBOARD, boardShaderProgram, chessboard, chessboard["model_matrix"], uniforms=uniforms)
 
 # ~ Highlights
 def setup_highlights():
-    global highlighted_square_model, selected_square_model, valid_move_square_model, invalid_move_square_model
-    setup_highlight(highlighted_square_model, HIGHLIGHTED_SQUARE_TEXTURE_PATH)
-    setup_highlight(selected_square_model, SELECTED_SQUARE_TEXTURE_PATH)
-    setup_highlight(valid_move_square_model, VALID_MOVES_SQUARE_TEXTURE_PATH)
-    setup_highlight(invalid_move_square_model, INVALID_MOVE_SQUARE_TEXTURE_PATH)
+    global board_highlights, boardShaderProgram
+    
+    # The highlights used to be square models placed on the board: the board's shader maps the world space back onto that placement
+    # (see `get_square_transform`), i.e. onto a grid where square (row, col) spans [col, col + 1] x [row, row + 1].
+    square = load_model(SQUARE_OBJECT_PATH)
+    scale_factor = 2 / square.dia * 0.1
+    translation_matrix = pyrr.matrix44.create_from_translation(-square.center)
+    scale_matrix = pyrr.matrix44.create_from_scale([scale_factor, scale_factor, scale_factor])
+    square_model_matrix = pyrr.matrix44.multiply(translation_matrix, scale_matrix)
+    grid_matrix = np.linalg.inv(square_model_matrix) @ pyrr.matrix44.create_from_scale([1 / BOARD_SQUARE_SIZE] * 3) @ pyrr.matrix44.create_from_translation([4, 0, 4])
+    
+    # The highlight textures are flat colors, so each highlight is drawn with the average color of its texture.
+    colors = []
+    for texture_path in BOARD_HIGHLIGHT_TEXTURE_PATHS:
+        texture_pixels, _ = load_texture_pixels(texture_path)
+        colors.append(np.frombuffer(texture_pixels, dtype=np.uint8).reshape(-1, 3).mean(axis=0) / 255)
+    
+    board_highlights["grid_matrix"] = grid_matrix # (Mouse picking maps the world space onto the same grid, see `pick_square`.)
+    boardShaderProgram["highlight_grid_matrix"] = grid_matrix
+    boardShaderProgram["highlightSize"] = (square.bounds_max[0] - square.bounds_min[0]) / BOARD_SQUARE_SIZE
+    boardShaderProgram["highlightColors"] = np.array(colors)
+    
+    # Create the (8x8) mask texture holding the highlight of each square (0 := none, 1 := `BOARD_HIGHLIGHT_TEXTURE_PATHS[0]`, ...).
+    board_highlights["mask"] = np.zeros((8, 8), dtype=np.uint8)
+    board_highlights["mask_texture_id"] = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, board_highlights["mask_texture_id"])
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_R8UI, 8, 8, 0, GL_RED_INTEGER, GL_UNSIGNED_BYTE, board_highlights["mask"])
 
 def setup_highlight(model, texture_path, scale_factor=0.1):
-    model["obj"] = ObjLoader(SQUARE_OBJECT_PATH)
+    model["obj"] = load_model(SQUARE_OBJECT_PATH)
     
     # Create a VAO and VBO for the object.
     model["vao"] = glGenVertexArrays(1)
@@ -684,25 +687,19 @@ def setup_highlight(model, texture_path, scale_factor=0.1):
     scale_matrix = pyrr.matrix44.create_from_scale([scale_factor, scale_factor, scale_factor])
     model["model_matrix"] = pyrr.matrix44.multiply(translation_matrix, scale_matrix)
     
-    # Load the object's texture.
-    model["texture"] = {}
-    model["texture"]["texture_pixels"], model["texture"]["texture_size"] = load_texture(texture_path, flip=True)
-    model["texture"]["texture_id"] = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, model["texture"]["texture_id"])
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, model["texture"]["texture_size"]["width"], model["texture"]["texture_size"]["height"],
-                 0, GL_RGB, GL_UNSIGNED_BYTE, model["texture"]["texture_pixels"])
+    # Load the object's texture (into a texture array of its own, like every object drawn by the object's shader).
+    model["texture_array"] = TextureArray(TEXTURE_ARRAY_LAYER_SIZE)
+    model["texture_array"].setup([texture_path], required_paths=[texture_path])
+    model["texture"] = { "texture_id": model["texture_array"].texture_id, "target": GL_TEXTURE_2D_ARRAY }
+    model["texture_layer"] = 0
 
 # ~ Pieces
 def setup_pieces():
     global pieces
     for color in PIECE_COLORS:
         for piece in PIECES:
-            # Load the 3D model for the piece (if the model has already been loaded for one color, it reuses that model for the other color to optimize resource usage).
-            pieces[color][piece]["obj"] = pieces['black' if color == 'white' else 'white'][piece].get("obj") or ObjLoader(PIECE_OBJECT_PATHS[piece])
+            # Load the 3D model for the piece (it's loaded once, and both colors share it).
+            pieces[color][piece]["obj"] = load_model(PIECE_OBJECT_PATHS[piece])
 
             # Create a VAO and VBO for the piece.
             pieces[color][piece]["vao"] = glGenVertexArrays(1)
@@ -722,185 +719,95 @@ def setup_pieces():
             glEnableVertexAttribArray(normal_loc)
             glEnableVertexAttribArray(uv_loc)
             
+            # Set up the decimated LODs of the piece (for white, then shared by black: they're re-created in each OpenGL context).
+            pieces[color][piece]["lods"] = pieces['white'][piece]["lods"] if color == 'black' else setup_mesh_lods(PIECE_OBJECT_PATHS[piece], pieces[color][piece]["obj"])
+            
             # Create a 4x4 model matrix (to transform the piece from model space to world space).
             scale_factor = 2 / pieces[color][piece]["obj"].dia * 0.1 # Scale the piece down to fit on the chessboard squares properly.
             translation_matrix = pyrr.matrix44.create_from_translation(-pieces[color][piece]["obj"].center)
             scale_matrix = pyrr.matrix44.create_from_scale([scale_factor, scale_factor, scale_factor])
             pieces[color][piece]["model_matrix"] = pyrr.matrix44.multiply(translation_matrix, scale_matrix)
-            
-            # Load the piece's texture.
-            pieces[color][piece]["texture"] = {}
-            
-            if(game.piece_selection == 0):
-                pieces[color][piece]["texture"]["texture_pixels"], pieces[color][piece]["texture"]["texture_size"] = load_texture(CLASSIC_PIECE_TEXTURE_PATHS[color][piece], flip=True)
-            elif(game.piece_selection == 1):
-                pieces[color][piece]["texture"]["texture_pixels"], pieces[color][piece]["texture"]["texture_size"] = load_texture(WOOD_PIECE_TEXTURE_PATHS[color][piece], flip=True)
-            elif(game.piece_selection == 2):
-                pieces[color][piece]["texture"]["texture_pixels"], pieces[color][piece]["texture"]["texture_size"] = load_texture(METAL_PIECE_TEXTURE_PATHS[color][piece], flip=True)
-
-            pieces[color][piece]["texture"]["texture_id"] = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, pieces[color][piece]["texture"]["texture_id"])
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, pieces[color][piece]["texture"]["texture_size"]["width"], pieces[color][piece]["texture"]["texture_size"]["height"],
-                         0, GL_RGB, GL_UNSIGNED_BYTE, pieces[color][piece]["texture"]["texture_pixels"])
-
-
-def draw_pieces():
-    # `board_array` is a 8x8 grid (2d array) of chess pieces.
-    #  • Each element in the grid is either None (if there is no piece at that location) or a <Piece> object.
-    #   - The <Piece> object has a `value` attribute:
-    #     • WHITE_PAWN = "P"
-    #     • BLACK_PAWN = "p"
-    #     • WHITE_KNIGHT = "N"
-    #     • BLACK_KNIGHT = "n"
-    #     • WHITE_BISHOP = "B"
-    #     • BLACK_BISHOP = "b"
-    #     • WHITE_ROOK = "R"
-    #     • BLACK_ROOK = "r"
-    #     • WHITE_QUEEN = "Q"
-    #     • BLACK_QUEEN = "q"
-    #     • WHITE_KING = "K"
-    #     • BLACK_KING = "k"
-    global pieces, game, shaderProgram, piece_animations, check_move_sound_played
-    board_array = game.get_2d_board_array()
-
-    # Activate the shader program.
-    glUseProgram(shaderProgram.shader)
-    
-
-    # Iterate over the 8x8 chessboard grid, starting from the bottom-right corner (a1).
-    for row in range(7, -1, -1):  # 7 corresponds to '1' in chess notation, and 0 corresponds to '8'
-        for col in range(8):  # 0 corresponds to 'a' in chess notation, and 7 corresponds to 'h'
-            piece = board_array[row][col]
-            if piece:
-                # Determine the color and type of the piece.
-                color = 'white' if piece.value.isupper() else 'black'
-                piece_type = PIECE_ABR_DICT[piece.value.lower()]
-                piece_model = pieces[color][piece_type]
-                piece_model['color'] = color
-
-                # Glowing effect for King to show turn/check
-                if(piece_type == "king" and DISPLAY_TURN):
-                    is_white_turn = game.board.turn == chess.WHITE
-                    is_in_check = game.board.is_check()
-                    if is_white_turn and color == 'white':
-                        if is_in_check:
-                            if not check_move_sound_played:
-                                check_move_sound.play()
-                                check_move_sound_played = True
-                                print('White in check sound')
-                        else:
-                            check_move_sound_played = False
-
-                        shaderProgram["glowColor"] = CHECK_TURN_GLOW_COLOR if is_in_check else WHITE_TURN_GLOW_COLOR
-                        shaderProgram["isGlowing"] = True
-                        shaderProgram["time"] = pygame.time.get_ticks() / 1000.0
-                    elif not is_white_turn and color == 'black':
-                        if is_in_check:
-                            if not check_move_sound_played:
-                                check_move_sound.play()
-                                check_move_sound_played = True
-                                print('Black in check sound')
-                        else:
-                            check_move_sound_played = False
-
-                        shaderProgram["glowColor"] = CHECK_TURN_GLOW_COLOR if is_in_check else BLACK_TURN_GLOW_COLOR
-                        shaderProgram["isGlowing"] = True
-                        shaderProgram["time"] = pygame.time.get_ticks() / 1000.0
-
-                # Determine the square name (e.g., 'e2')
-                square_name = chr(col + ord('a')) + str(8 - row)
-
-                # Check if there's an active animation for the piece on this square.
-                if square_name in piece_animations and piece_animations[square_name]["is_active"]:
-                    animation = piece_animations[square_name]
-                    draw_piece_at_position(piece_model, animation["current_position"])
-                else:
-                    draw_at_board_position(piece_model, row, col)
-                shaderProgram["isGlowing"] = False
-
-
-def draw_piece_at_position(piece_model, position):
-    global view_matrix, projection_matrix, rotated_eye, shaderProgram, shadowTex_id
-
-    # Calculate the model matrix for the piece using the position.
-    translation_matrix = pyrr.matrix44.create_from_translation(position)
-    model_matrix = pyrr.matrix44.multiply(translation_matrix, piece_model["model_matrix"])
-    
-    light_rotY_mat = pyrr.matrix44.create_from_y_rotation(np.deg2rad(0))
-    rotated_lightPos = pyrr.matrix44.apply_to_vector(light_rotY_mat, lightPos)
-    light_view_mat = pyrr.matrix44.create_look_at(rotated_lightPos, target, up)
-    light_projection_mat = pyrr.matrix44.create_perspective_projection_matrix(45, WINDOW["aspect_ratio"], near_plane, far_plane)
-    
-    # Apply additional rotation to the white pieces to face the center of the board.
-    if piece_model['color'] == 'white':
-        rotation_matrix = pyrr.matrix44.create_from_y_rotation(np.radians(180))
-        model_matrix = pyrr.matrix44.multiply(rotation_matrix, model_matrix)
-
-    # Send each matrix (model, view, and projection) to the piece's shader.
-    shaderProgram["model_matrix"] = model_matrix
-    shaderProgram["view_matrix"] = view_matrix
-    shaderProgram["projection_matrix"] = projection_matrix
-    shaderProgram["eye_pos"] = rotated_eye
-    shaderProgram["lightPos"] = lightPos
-    shaderProgram["light_projection_mat"] = light_projection_mat
-    shaderProgram["light_view_mat"] = light_view_mat
-
-    # Bind the piece's texture.
-    glActiveTexture(GL_TEXTURE0)
-    glBindTexture(GL_TEXTURE_2D, piece_model["texture"]["texture_id"])
-
-    # Bind the skybox texture (for environment mapping).
-    glActiveTexture(GL_TEXTURE1)
-    glBindTexture(GL_TEXTURE_CUBE_MAP, skybox["texture_id"])
     
-    # Bind the shadow texture
-    glActiveTexture(GL_TEXTURE2)
-    glBindTexture(GL_TEXTURE_2D, shadowTex_id)
+    piece_batch.set_base_matrices(pieces)
+    setup_piece_textures()
+
+def setup_piece_textures():
+    ''' Loads every piece skin into a texture array: each piece is drawn with the layer of the selected skin (see `submit_pieces`). '''
+    global pieces
+    paths = [path for skin in range(len(PIECE_TEXTURE_PATHS)) for path in get_piece_texture_paths(skin)]
+    piece_textures.setup(paths, required_paths=get_piece_texture_paths(game.piece_selection))
+    for color in PIECE_COLORS:
+        for piece in PIECES:
+            pieces[color][piece]["texture"] = { "texture_id": piece_textures.texture_id, "target": GL_TEXTURE_2D_ARRAY }
+            pieces[color][piece]["texture_layers"] = [piece_textures.get_layer(PIECE_TEXTURE_PATHS[skin][color][piece]) for skin in range(len(PIECE_TEXTURE_PATHS))]
+
+def get_piece_texture_paths(piece_selection):
+    return [PIECE_TEXTURE_PATHS[piece_selection][color][piece] for color in PIECE_COLORS for piece in PIECES]
+
+def setup_mesh_lods(obj_path, obj):
+    ''' Creates a VAO for each decimated LOD of a mesh (LOD 1, 2, ...), see `load_mesh_lods`. '''
+    lods = []
+    for vertices in load_asset("mesh_lods", obj_path, lambda: load_mesh_lods(obj_path, obj, MESH_LOD_GRID_SIZES, MESH_CACHE_DIR)):
+        lod = { "vao": glGenVertexArrays(1), "vbo": glGenBuffers(1), "n_vertices": len(vertices) * obj.itemsize // obj.stride }
+        
+        # Upload the LOD's model data to the GPU (with the same vertex attributes as the original mesh).
+        glBindVertexArray(lod["vao"])
+        glBindBuffer(GL_ARRAY_BUFFER, lod["vbo"])
+        glBufferData(GL_ARRAY_BUFFER, vertices, GL_STATIC_DRAW)
+        position_loc, normal_loc, uv_loc = 0, 1, 2
+        glVertexAttribPointer(position_loc, obj.size_position, GL_FLOAT, GL_FALSE, obj.stride, ctypes.c_void_p(obj.offset_position))
+        glVertexAttribPointer(normal_loc, obj.size_normal, GL_FLOAT, GL_FALSE, obj.stride, ctypes.c_void_p(obj.offset_normal))
+        glVertexAttribPointer(uv_loc, obj.size_texture, GL_FLOAT, GL_FALSE, obj.stride, ctypes.c_void_p(obj.offset_texture))
+        glEnableVertexAttribArray(position_loc)
+        glEnableVertexAttribArray(normal_loc)
+        glEnableVertexAttribArray(uv_loc)
+        lods.append(lod)
+    return lods
+
+def submit_pieces():
+    # `piece_batch` holds every piece on the board (color, type, square) with its model matrix (computed once per frame in `update_graphics`).
+    global pieces, game, shaderProgram, piece_batch, piece_lod_selector
+    
+    # Pick the LOD of every piece from its projected size on the screen.
+    lods = piece_lod_selector.select([instance[2] for instance in piece_batch.instances], *piece_batch.get_bounding_spheres(), frame.eye)
+
+    for i, ((color, piece_type, square_name, row, col, is_animating, model_matrix), lod) in enumerate(zip(piece_batch.get_instances(), lods)):
+        piece_model = pieces[color][piece_type]
+        piece_model['color'] = color
+        program = get_object_program(piece_model)
+        uniforms = { "normal_matrix": piece_batch.get_normal_matrices()[i] } if program is shaderProgram else {}
+        uniforms["animationSlot"] = int(piece_batch.animation_slots[i]) # (Also read by the shadow pass, which has no default uniforms.)
+        uniforms["textureLayer"] = piece_model["texture_layers"][game.piece_selection]
+
+        # Glowing effect for King to show turn/check
+        if(piece_type == "king" and DISPLAY_TURN):
+            is_white_turn = game.board.turn == chess.WHITE
+            is_in_check = game.board.is_check()
+            if is_white_turn and color == 'white':
+                uniforms.update({ "glowColor": CHECK_TURN_GLOW_COLOR if is_in_check else WHITE_TURN_GLOW_COLOR, "isGlowing": True })
+            elif not is_white_turn and color == 'black':
+                uniforms.update({ "glowColor": CHECK_TURN_GLOW_COLOR if is_in_check else BLACK_TURN_GLOW_COLOR, "isGlowing": True })
+
+        # (A moving piece is lifted out of its bounding sphere by its shader, so it is never culled.)
+        render_queue.submit(LAYER_PIECES, program, piece_model, model_matrix, uniforms=uniforms, casts_shadow=True, mesh=piece_model["lods"][lod - 1] if lod > 0 else None, is_cullable=not is_animating)
 
-    # Draw the piece.
-    glBindVertexArray(piece_model["vao"])
-    glDrawArrays(GL_TRIANGLES, 0, piece_model["obj"].n_vertices)
 
 def draw_at_board_position(model, row, col):
-    global view_matrix, projection_matrix, rotated_eye, shaderProgram, shadowTex_id
-
-    # Calculate the piece's model matrix based on its position on the board.
-    offset_x, offset_z, square_size = 0, 0, 1.575
-    position = np.array([
-        (col - 3.5) * square_size + offset_x, 
-        0, 
-        (row - 3.5) * square_size + offset_z
-    ])
-    translation_matrix = pyrr.matrix44.create_from_translation(position)
-    model_matrix = pyrr.matrix44.multiply(translation_matrix, model["model_matrix"])
-
-    light_rotY_mat = pyrr.matrix44.create_from_y_rotation(np.deg2rad(0))
-    rotated_lightPos = pyrr.matrix44.apply_to_vector(light_rotY_mat, lightPos)
-
-    light_view_mat = pyrr.matrix44.create_look_at(rotated_lightPos, target, up)
-    light_projection_mat = pyrr.matrix44.create_perspective_projection_matrix(45, WINDOW["aspect_ratio"], near_plane, far_plane)
-    
-    # Apply additional rotation to the white pieces to face the center of the board.
-    if 'color' in model and model['color'] == 'white':
-        rotation_matrix = pyrr.matrix44.create_from_y_rotation(np.radians(180))
-        model_matrix = pyrr.matrix44.multiply(rotation_matrix, model_matrix)
-
-    # Send each matrix (model, view, and projection) to the piece's shader.
+    # Calculate the piece's model matrix based on its position on the board (using the precomputed square transforms).
+    # (The white pieces are rotated to face the center of the board; the black pieces and the highlights aren't rotated.)
+    draw_model(model, get_square_transform(row, col, model.get('color', 'black')) @ model["model_matrix"])
+
+def draw_model(model, model_matrix):
+    global shaderProgram, shadowTex_id
+
+    # Send the model and normal matrices to the object's shader (the view, projection and light matrices are in the per-frame uniform block).
     shaderProgram["model_matrix"] = model_matrix
-    shaderProgram["view_matrix"] = view_matrix
-    shaderProgram["projection_matrix"] = projection_matrix
-    shaderProgram["eye_pos"] = rotated_eye
-    shaderProgram["lightPos"] = lightPos
-    shaderProgram["light_projection_mat"] = light_projection_mat
-    shaderProgram["light_view_mat"] = light_view_mat
-
-    # Bind the piece's texture.
+    shaderProgram["normal_matrix"] = calc_normal_matrices(model_matrix)
+
+    # Bind the object's texture (a layer of a texture array).
     glActiveTexture(GL_TEXTURE0)
-    glBindTexture(GL_TEXTURE_2D, model["texture"]["texture_id"])
+    glBindTexture(model["texture"]["target"], model["texture"]["texture_id"])
+    shaderProgram["textureLayer"] = model["texture_layer"]
 
     # Bind the skybox texture (for environment mapping).
     glActiveTexture(GL_TEXTURE1)
@@ -910,22 +817,19 @@ def draw_at_board_position(model, row, col):
     glActiveTexture(GL_TEXTURE2)
     glBindTexture(GL_TEXTURE_2D, shadowTex_id)
 
-    # Draw the piece.
+    # Draw the object.
     glBindVertexArray(model["vao"])
     glDrawArrays(GL_TRIANGLES, 0, model["obj"].n_vertices)
            
 # ~ Skybox
 def setup_skybox(game):
     # Load the skybox shader and texture.
-    global skybox, skybox_path
-
-    skybox_path = SKYBOX_PATHS[game.skybox_selection]
+    global skybox
     
     skybox = {
         "shaderProgram": ShaderProgram("shaders/skybox/vert.glsl", "shaders/skybox/frag.glsl"),
-        "texture_id": load_cubemap_textures([f"{skybox_path}/right.png", f"{skybox_path}/left.png",
-                                    f"{skybox_path}/top.png", f"{skybox_path}/bottom.png",
-                                    f"{skybox_path}/front.png", f"{skybox_path}/back.png"]),
+        "texture_id": None,
+        "pending_texture_id": None,
         "vertices": np.array([-1, -1,
                                1, -1,
                                1,  1,
@@ -947,35 +851,102 @@ def setup_skybox(game):
     glBufferData(GL_ARRAY_BUFFER, skybox["vertices"], GL_STATIC_DRAW)
 
     # Configure the vertex attributes for the skybox (position only).
-    glUseProgram(skybox["shaderProgram"].shader)
+    skybox["shaderProgram"].use()
     glBindAttribLocation(skybox["shaderProgram"].shader, skybox["position_loc"], "position")
     glVertexAttribPointer(skybox["position_loc"], skybox["size_position"], GL_FLOAT, GL_FALSE, skybox["stride"], ctypes.c_void_p(skybox["offset_position"]))
     glEnableVertexAttribArray(skybox["position_loc"])
     skybox["shaderProgram"]["cubeMapTex"] = 0
+    load_skybox(game.skybox_selection)
     
     return skybox
 
+def load_skybox(skybox_selection):
+    ''' Shows the low-resolution preview of the skybox right away (or a placeholder on the very first run) and streams in the full-resolution faces afterwards. '''
+    global skybox, skybox_path
+    skybox_path = SKYBOX_PATHS[skybox_selection]
+    preview_faces = skybox_streamer.request(skybox_path)
+    
+    # (Replaces the textures of the previous skybox, e.g. when the selection changes, see `apply_scene_selections`.)
+    old_texture_ids = [texture_id for texture_id in (skybox["texture_id"], skybox["pending_texture_id"]) if texture_id is not None]
+    if old_texture_ids: glDeleteTextures(len(old_texture_ids), old_texture_ids)
+    skybox.update({
+        "texture_id": create_cubemap_texture(preview_faces, placeholder_color=glGetFloatv(GL_COLOR_CLEAR_VALUE)[:3]),
+        "path": skybox_path,
+        "is_streaming": True,
+        "pending_texture_id": None,
+        "pending_face_index": 0,
+    })
+
+def update_skybox_streaming():
+    ''' Uploads the streamed full-resolution skybox faces (one face per frame, to avoid a hitch) and swaps them in once all 6 faces are uploaded. '''
+    global skybox
+    if not skybox.get("is_streaming"): return
+    
+    try: faces = skybox_streamer.get_faces(skybox["path"])
+    except Exception as error:
+        # Stop streaming, and keep showing the preview (or the placeholder).
+        print(f"Failed to stream skybox '{skybox['path']}': {error}")
+        if skybox["pending_texture_id"] is not None: glDeleteTextures(1, [skybox["pending_texture_id"]])
+        skybox.update({ "is_streaming": False, "pending_texture_id": None })
+        return
+    if faces is None: return
+    
+    if skybox["pending_texture_id"] is None: skybox["pending_texture_id"] = create_cubemap_texture()
+    upload_cubemap_face(skybox["pending_texture_id"], faces, skybox["pending_face_index"])
+    skybox["pending_face_index"] += 1
+    
+    # Swap in the full-resolution cubemap.
+    if skybox["pending_face_index"] == len(faces):
+        glDeleteTextures(1, [skybox["texture_id"]])
+        skybox["texture_id"] = skybox["pending_texture_id"]
+        skybox["pending_texture_id"] = None
+        skybox["is_streaming"] = False
+
+def preload_skybox(skybox_selection):
+    ''' Decodes the given skybox in the background (e.g. while the user is browsing environments), so it is ready by the time the game starts. '''
+    skybox_streamer.preload(SKYBOX_PATHS[skybox_selection])
+
 def draw_skybox():
-    global skybox, view_matrix, projection_matrix
-    
-    # Remove the translation component from the view matrix because we want the skybox to be static.
-    view_matrix_without_translation = view_matrix.copy()
-    view_matrix_without_translation[3][:3] = [0, 0, 0]
-    inverseViewProjection_matrix = pyrr.matrix44.inverse(pyrr.matrix44.multiply(view_matrix_without_translation, projection_matrix))
+    global skybox, frame
     
     # Draw the skybox.
     glDepthFunc(GL_LEQUAL)
-    glUseProgram(skybox["shaderProgram"].shader)
+    skybox["shaderProgram"].use()
     glActiveTexture(GL_TEXTURE0)
     glBindTexture(GL_TEXTURE_CUBE_MAP, skybox["texture_id"])
-    skybox["shaderProgram"]["invViewProjectionMatrix"] = inverseViewProjection_matrix
+    skybox["shaderProgram"]["invViewProjectionMatrix"] = frame.inv_view_projection_matrix
     glBindVertexArray(skybox["vao"])
     glDrawArrays(GL_TRIANGLES, 0, skybox["n_vertices"])
     glDepthFunc(GL_LESS)
-    
+    render_queue.stats["draw_calls"] += 1
+
+# ~ Picking
+def pick_square(x, y):
+    '''
+    Returns the square (file, rank) under the window position (x, y), or None (e.g. the cursor is off the board).
+    The cursor is unprojected with the last frame's camera and intersected with the board's plane analytically (no `glReadPixels` stall).
+    '''
+    if frame.view_matrix is None or "grid_matrix" not in board_highlights: return None
+    origin, direction = calc_ray_from_screen(x, y, WINDOW["width"], WINDOW["height"], frame.view_matrix, frame.projection_matrix)
+    board_hit = intersect_ray_with_grid(origin, direction, board_highlights["grid_matrix"])
+    if board_hit and 0 <= board_hit[1][0] < 8 and 0 <= board_hit[1][1] < 8:
+        row, col = board_hit[1]
+        return (col, 7 - row)
+
+    # Off the board: fall back on the pieces' bounding boxes (e.g. the top of a piece on the far rank sticks out past the board's edge).
+    # (The boxes are wider than the pieces, so they would steal the clicks on the squares right behind them if they were tested first.)
+    piece_distances = intersect_ray_with_boxes(origin, direction, *piece_batch.get_bounding_boxes(), piece_batch.model_matrices[:piece_batch.count])
+    for i, instance in enumerate(piece_batch.instances):
+        if instance[5]: piece_distances[i] = np.inf # (Moving pieces can't be picked.)
+    if len(piece_distances) == 0 or np.isinf(piece_distances.min()): return None
+    _, _, _, row, col, _ = piece_batch.instances[int(piece_distances.argmin())]
+    return (col, 7 - row)
+
 # ~ Mouse events
 def handle_mouse_events(events):
+    ''' Rotates and zooms the camera with the mouse. Returns the window position of the last click (a left click without dragging), or None. '''
     global is_dragging, last_mouse_pos, first_mouse_pos, yaw, pitch, camera_distance
+    click_position = None
 
     for event in events:
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -994,7 +965,7 @@ def handle_mouse_events(events):
                 delta_y = current_mouse_pos[1] - first_mouse_pos[1]
                 delta_maginitude = math.sqrt(delta_x**2 + delta_y**2)
                 if delta_maginitude < MOUSE_POSITION_DELTA:
-                    pass # Handle click event here
+                    click_position = current_mouse_pos
                 is_dragging = False
         elif event.type == pygame.MOUSEMOTION:
             if is_dragging:
@@ -1008,4 +979,5 @@ def handle_mouse_events(events):
                 pitch -= np.deg2rad(dy * CAMERA_MOUSE_DRAG_SENSITIVITY)
 
                 # Clamp pitch to prevent flipping.
-                pitch = max(min(pitch, np.deg2rad(89)), np.deg2rad(-89))
\ No newline at end of file
+                pitch = max(min(pitch, np.deg2rad(89)), np.deg2rad(-89))
+    return click_position
@@ -0,0 +1,251 @@
+'''
+Offscreen (headless) rendering backend, for benchmarks and CI machines without a display or a GPU.
+
+Creates an OpenGL 3.3 core context with EGL (or OSMesa), renders the scene into a framebuffer object and drives
+`draw_graphics` from a scripted camera path and a list of moves, then reports the frame time statistics and the cost of each pass.
+
+Usage (from the root of the repository):
+    python -m graphics.headless --frames 240
+    python -m graphics.headless --frames 600 --camera-path path.json --moves e2e4 e7e5 g1f3 --json results.json
+
+(Mesa's llvmpipe renders on the CPU, so the absolute frame times are only comparable between runs on the same machine.)
+'''
+
+# Standard library imports.
+import os
+import ctypes
+import ctypes.util
+
+# The OpenGL platform has to be chosen before PyOpenGL is first imported (i.e. before the renderer is imported).
+if "PYOPENGL_PLATFORM" not in os.environ:
+    os.environ["PYOPENGL_PLATFORM"] = "egl" if ctypes.util.find_library("EGL") else "osmesa"
+os.environ.setdefault("EGL_PLATFORM", "surfaceless") # (Mesa: render without a display server.)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Third-party imports.
+import argparse
+import json
+import time
+from OpenGL.GL import *
+import numpy as np
+import pygame
+import chess
+
+# Local application imports.
+from constants import WINDOW, DEFAULT_SELECTION, PIECE_ANIMATION_DURATION, CAMERA_DEFAULT_YAW, CAMERA_DEFAULT_PITCH
+from util.profiler import profiler, summarize
+import graphics.graphics_3d as graphics_3d
+
+# ~ Benchmark defaults
+DEFAULT_CAMERA_PATH = [ # Keyframes: [yaw, pitch, distance] (degrees, degrees, units), spread evenly over the run.
+    [CAMERA_DEFAULT_YAW["white"], CAMERA_DEFAULT_PITCH, 2.0],
+    [CAMERA_DEFAULT_YAW["white"] + 90, 45, 3.0],
+    [CAMERA_DEFAULT_YAW["white"] + 180, 60, 4.5],
+    [CAMERA_DEFAULT_YAW["white"] + 270, 35, 3.0],
+    [CAMERA_DEFAULT_YAW["white"] + 360, CAMERA_DEFAULT_PITCH, 2.0],
+]
+DEFAULT_MOVES = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5", "c2c3", "g8f6"]
+DEFAULT_FRAME_DELTA_TIME = 1 / 60 # seconds (the camera path advances by a fixed step per frame, so every run sees the same views)
+
+# ~ Offscreen context
+def create_offscreen_context(width, height):
+    ''' Creates an OpenGL 3.3 core context (with EGL or OSMesa, see `PYOPENGL_PLATFORM`) and makes it current. '''
+    if os.environ["PYOPENGL_PLATFORM"] == "osmesa": return create_osmesa_context(width, height)
+    return create_egl_context(width, height)
+
+def create_egl_context(width, height):
+    from OpenGL import EGL
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        raise RuntimeError("Could not initialize EGL (set PYOPENGL_PLATFORM=osmesa to use OSMesa instead).")
+
+    # (The scene is drawn into a framebuffer object: the pbuffer surface only makes the context current.)
+    config_attributes = (EGL.EGLint * 7)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_NONE)
+    config, n_configs = EGL.EGLConfig(), EGL.EGLint()
+    if not EGL.eglChooseConfig(display, config_attributes, ctypes.pointer(config), 1, ctypes.pointer(n_configs)) or n_configs.value == 0:
+        raise RuntimeError("No EGL config supports desktop OpenGL.")
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+
+    context_attributes = (EGL.EGLint * 7)(
+        EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+        EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT, EGL.EGL_NONE
+    )
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+    surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+    if not context or not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("Could not create an OpenGL 3.3 core context with EGL.")
+    return { "platform": "egl", "display": display, "surface": surface, "context": context }
+
+def create_osmesa_context(width, height):
+    from OpenGL import osmesa, arrays
+    context = osmesa.OSMesaCreateContextAttribs([
+        osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA, osmesa.OSMESA_DEPTH_BITS, 24,
+        osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+        osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3, osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3, 0
+    ], None)
+    buffer = arrays.GLubyteArray.zeros((height, width, 4)) # (OSMesa needs a buffer to be current, even though the scene is drawn into a framebuffer object.)
+    if not context or not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, width, height):
+        raise RuntimeError("Could not create an OpenGL 3.3 core context with OSMesa.")
+    return { "platform": "osmesa", "context": context, "buffer": buffer }
+
+def create_framebuffer(width, height):
+    ''' Creates a framebuffer object with a color and a depth renderbuffer (the offscreen "window"). '''
+    framebuffer = glGenFramebuffers(1)
+    color_renderbuffer, depth_renderbuffer = glGenRenderbuffers(2)
+    glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+
+    glBindRenderbuffer(GL_RENDERBUFFER, color_renderbuffer)
+    glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color_renderbuffer)
+
+    glBindRenderbuffer(GL_RENDERBUFFER, depth_renderbuffer)
+    glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth_renderbuffer)
+
+    if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+        raise Exception("Framebuffer is not complete!")
+    glViewport(0, 0, width, height)
+    return framebuffer
+
+def save_screenshot(path, width, height):
+    ''' Saves the current framebuffer to an image (e.g. to check that the benchmark actually rendered the scene). '''
+    pixels = glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE)
+    image = pygame.image.frombuffer(pixels, (width, height), "RGB")
+    pygame.image.save(pygame.transform.flip(image, False, True), path) # (OpenGL's rows go bottom to top.)
+
+# ~ Scripted scene
+class BenchmarkGame:
+    def __init__(self, selection=DEFAULT_SELECTION):
+        '''
+        This BenchmarkGame class holds the part of `ChessGame` the renderer reads (the board and the selected skins),
+        so the benchmark doesn't need the Stockfish engine.
+        '''
+        self.board = chess.Board()
+        self.piece_selection = selection
+        self.board_selection = selection
+        self.skybox_selection = selection
+
+    def get_whos_turn(self):
+        return "white" if self.board.turn == chess.WHITE else "black"
+
+def interpolate_camera_path(keyframes, progress):
+    ''' Returns the [yaw, pitch, distance] at `progress` (0 to 1) along a path of evenly spread keyframes. '''
+    keyframes = np.asarray(keyframes, dtype=np.float64)
+    if len(keyframes) == 1: return keyframes[0]
+    times = np.linspace(0, 1, len(keyframes))
+    return np.array([np.interp(progress, times, keyframes[:, i]) for i in range(keyframes.shape[1])])
+
+def play_move(game, uci_move, start_time):
+    ''' Plays a move the way the gameplay does (i.e. with the piece animation, starting at `start_time` on the benchmark's frame clock). '''
+    move = chess.Move.from_uci(uci_move)
+    if move not in game.board.legal_moves: raise ValueError(f"Illegal move in the benchmark: {uci_move}")
+    piece = game.board.piece_at(move.from_square)
+    game.board.push(move)
+    graphics_3d.create_piece_animation(chess.square_name(move.from_square), chess.square_name(move.to_square), piece.symbol(), start_time, PIECE_ANIMATION_DURATION)
+
+# ~ Benchmark
+def run_benchmark(frames, camera_path=DEFAULT_CAMERA_PATH, moves=DEFAULT_MOVES, move_interval=None, warmup_frames=10, width=WINDOW["width"], height=WINDOW["height"], selection=DEFAULT_SELECTION, screenshot_path=None, frame_time_budget=None):
+    '''
+    Renders `frames` frames offscreen along the camera path (playing one move every `move_interval` frames) and returns the statistics.
+
+    :param camera_path:     keyframes [yaw, pitch, distance] (degrees, degrees, units), spread evenly over the run
+    :param moves:           UCI moves played during the run (with their animations)
+    :param move_interval:   frames between two moves (by default, the moves are spread evenly over the run)
+    :param warmup_frames:   frames rendered (and not measured) before the run, e.g. for the shader compilation and the first uploads
+    :param frame_time_budget:   ms (enables dynamic resolution with this GPU time budget, see `DynamicResolution`; None := native resolution)
+    '''
+    pygame.init()
+    offscreen_context = create_offscreen_context(width, height)
+    framebuffer = create_framebuffer(width, height)
+
+    # Set up the scene (drawn into the framebuffer object instead of the window).
+    game = BenchmarkGame(selection)
+    graphics_3d.set_render_target(framebuffer, width, height)
+    graphics_3d.setup_3d_scene(game)
+    graphics_3d.dynamic_resolution.set_enabled(frame_time_budget is not None)
+    if frame_time_budget is not None: graphics_3d.dynamic_resolution.frame_time_budget = frame_time_budget
+    while graphics_3d.skybox.get("is_streaming"): # (The benchmark measures the full-resolution skybox.)
+        graphics_3d.update_skybox_streaming()
+        time.sleep(0.01)
+    for textures in (graphics_3d.chessboard_textures, graphics_3d.piece_textures): # (And no frame uploads a skin decoded in the background.)
+        while not textures.is_complete():
+            textures.update()
+            time.sleep(0.01)
+
+    move_interval = move_interval or max(frames // (len(moves) + 1), 1)
+    profiler.enabled, profiler.gpu_timers, profiler.sync, profiler.max_samples = True, True, glFinish, None
+    frame_times, render_stats, resolution_scales = [], [], []
+    # (The animations run on the frame clock, i.e. every run shows the same frames of them however fast the host renders.)
+    frame_clock = { "time": 0.0 }
+    graphics_3d.set_scene_clock(lambda: frame_clock["time"])
+
+    for i in range(-warmup_frames, frames):
+        frame_clock["time"] = (i + warmup_frames) * DEFAULT_FRAME_DELTA_TIME
+        if i == 0: profiler.reset()
+        if i > 0 and moves and i % move_interval == 0 and i // move_interval <= len(moves): play_move(game, moves[i // move_interval - 1], frame_clock["time"])
+
+        graphics_3d.set_camera(*interpolate_camera_path(camera_path, max(i, 0) / max(frames - 1, 1)))
+        start = time.perf_counter()
+        graphics_3d.draw_graphics(DEFAULT_FRAME_DELTA_TIME, None, None, None, None)
+        glFinish()
+        profiler.end_frame()
+        if i >= 0:
+            frame_times.append(time.perf_counter() - start)
+            render_stats.append(dict(graphics_3d.render_queue.stats))
+            resolution_scales.append(graphics_3d.dynamic_resolution.scale if graphics_3d.dynamic_resolution.is_enabled else 1.0)
+
+    if screenshot_path: save_screenshot(screenshot_path, width, height)
+    profiler.enabled, profiler.gpu_timers, profiler.sync = False, False, None
+    graphics_3d.set_scene_clock(None)
+
+    return {
+        "platform": offscreen_context["platform"],
+        "renderer": glGetString(GL_RENDERER).decode(),
+        "resolution": [width, height],
+        "frames": frames,
+        "resolution_scale": { "mean": float(np.mean(resolution_scales)), "min": float(np.min(resolution_scales)), "last": resolution_scales[-1] },
+        "frame": summarize(frame_times),
+        "passes": profiler.summary(),
+        "gpu_passes": profiler.gpu_summary(),
+        "render_queue": { key: float(np.mean([stats[key] for stats in render_stats])) for key in render_stats[0] } if render_stats else {},
+    }
+
+def print_report(results):
+    print(f"Renderer: {results['renderer']} ({results['platform']}, {results['resolution'][0]}x{results['resolution'][1]}, {results['frames']} frames)")
+    print(f"FPS: {1000 / results['frame']['mean']:.1f}")
+    if results["resolution_scale"]["min"] < 1: print("Resolution scale: " + ", ".join(f"{key}={value:.2f}" for key, value in results["resolution_scale"].items()))
+    print(f"{'pass':<20}{'mean':>9}{'median':>9}{'p95':>9}{'p99':>9}{'max':>9}{'gpu mean':>10}{'gpu p99':>9}  (ms)")
+    for name, stats in [("frame", results["frame"])] + list(results["passes"].items()):
+        gpu_stats = results["gpu_passes"].get(name)
+        gpu_columns = f"{gpu_stats['mean']:>10.2f}{gpu_stats['p99']:>9.2f}" if gpu_stats else f"{'-':>10}{'-':>9}"
+        print(f"{name:<20}" + "".join(f"{stats[key]:>9.2f}" for key in ("mean", "median", "p95", "p99", "max")) + gpu_columns)
+    print("Render queue (per frame): " + ", ".join(f"{key}={value:.1f}" for key, value in results["render_queue"].items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the scene offscreen and report the frame time statistics.")
+    parser.add_argument("--frames", type=int, default=240, help="number of measured frames")
+    parser.add_argument("--warmup", type=int, default=10, help="number of frames rendered before measuring")
+    parser.add_argument("--camera-path", help="JSON file with the camera keyframes: [[yaw, pitch, distance], ...]")
+    parser.add_argument("--moves", nargs="*", default=DEFAULT_MOVES, help="UCI moves played during the run")
+    parser.add_argument("--move-interval", type=int, help="frames between two moves (default: spread evenly)")
+    parser.add_argument("--selection", type=int, default=DEFAULT_SELECTION, help="skin of the pieces, board and skybox (0 := classic, 1 := wood, 2 := metal)")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--csv", help="write the statistics of each pass (CPU and GPU) to this CSV file")
+    parser.add_argument("--screenshot", help="save the last frame to this image")
+    parser.add_argument("--frame-budget", type=float, help="enable dynamic resolution with this GPU time budget (in ms)")
+    args = parser.parse_args()
+
+    camera_path = DEFAULT_CAMERA_PATH
+    if args.camera_path:
+        with open(args.camera_path) as file: camera_path = json.load(file)
+
+    results = run_benchmark(args.frames, camera_path, args.moves, args.move_interval, args.warmup, selection=args.selection, screenshot_path=args.screenshot, frame_time_budget=args.frame_budget)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as file: json.dump(results, file, indent=2)
+    if args.csv: profiler.dump_csv(args.csv)
+
+if __name__ == '__main__':
+    main()
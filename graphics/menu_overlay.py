@@ -0,0 +1,73 @@
+# Third-party imports.
+from OpenGL.GL import *
+import pygame
+
+# Local application imports.
+from util.shaderLoaderV3 import ShaderProgram
+
+class MenuOverlay:
+    def __init__(self):
+        '''
+        This MenuOverlay class draws the menus over the 3D scene, inside the window's OpenGL context.
+
+        The menus (pygame_menu) draw into `surface`, which is uploaded into a texture every frame and drawn as a single quad,
+        either over the live scene or over a frozen frame of it (see `freeze`, e.g. the game behind the pause menu).
+        So opening a menu keeps the OpenGL context, and every resource in it, alive.
+        '''
+        self.surface = None
+        self.is_frozen = False # Whether the frozen frame is drawn behind the menu (otherwise the caller draws the scene first).
+        self.program = None
+        self.vao = None
+        self.texture_id = None
+        self.frozen_texture_id = None
+        self.size = (0, 0)
+
+    def setup(self, width, height):
+        ''' Creates the overlay's OpenGL objects (in the current context) and the surface the menus draw into. '''
+        self.size = (width, height)
+        self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.program = ShaderProgram("shaders/overlay/vert.glsl", "shaders/overlay/frag.glsl")
+        self.program["tex2D"] = 0
+        self.vao = glGenVertexArrays(1) # (The quad's corners come from the vertex index, but the core profile needs a VAO bound.)
+        self.texture_id, self.frozen_texture_id = glGenTextures(2)
+        for texture_id, internal_format in ((self.texture_id, GL_RGBA8), (self.frozen_texture_id, GL_RGB8)):
+            glBindTexture(GL_TEXTURE_2D, texture_id)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexImage2D(GL_TEXTURE_2D, 0, internal_format, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        self.is_frozen = False
+
+    def cleanup(self):
+        if self.program is None: return
+        glDeleteProgram(self.program.shader)
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteTextures(2, [self.texture_id, self.frozen_texture_id])
+        self.program = None
+
+    def freeze(self, framebuffer):
+        ''' Copies the frame drawn into `framebuffer` (e.g. the last frame of the game), to be drawn behind the menus from now on. '''
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, framebuffer)
+        glBindTexture(GL_TEXTURE_2D, self.frozen_texture_id)
+        glCopyTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, 0, 0, *self.size)
+        self.is_frozen = True
+
+    def draw(self):
+        ''' Draws the menu's surface (and the frozen frame behind it, if any) over the window. '''
+        if self.program is None: return
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glViewport(0, 0, *self.size)
+        glDisable(GL_DEPTH_TEST)
+        self.program["rect"] = [-1, -1, 2, 2]
+        glActiveTexture(GL_TEXTURE0)
+        glBindVertexArray(self.vao)
+        if self.is_frozen:
+            glDisable(GL_BLEND)
+            glBindTexture(GL_TEXTURE_2D, self.frozen_texture_id)
+            glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+            glEnable(GL_BLEND)
+
+        # (Blended with the scene's blend function: pygame keeps the colors of the surface un-premultiplied.)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, *self.size, GL_RGBA, GL_UNSIGNED_BYTE, pygame.image.tobytes(self.surface, "RGBA", True))
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        glEnable(GL_DEPTH_TEST)
@@ -0,0 +1,98 @@
+# Third-party imports.
+import os
+import numpy as np
+
+# ~ Mesh decimation
+def decimate_vertex_clustering(vertices, floats_per_vertex, grid_size):
+    '''
+    Decimates a triangle mesh (an interleaved vertex array, see `ObjLoader.vertices`) by vertex clustering:
+    the bounding box is split into a grid of `grid_size` cells along its largest dimension, every vertex is snapped to the
+    mean position of its cell, and the triangles that collapse (i.e. with two corners in the same cell) are dropped.
+    The texture coordinates and normals of the remaining corners are kept as is (so the texture seams stay intact).
+
+    :param vertices:            1D array of interleaved vertices [x,y,z, ...]
+    :param floats_per_vertex:   number of floats per vertex (the position must come first)
+    :param grid_size:           number of cells along the largest dimension of the mesh (lower := coarser)
+    :return:                    the decimated (1D, float32) vertex array
+    '''
+    corners = vertices.reshape(-1, floats_per_vertex)
+    positions = corners[:, :3]
+
+    # Assign every vertex to a cell of the grid.
+    bounds_min, bounds_max = positions.min(axis=0), positions.max(axis=0)
+    cell_size = max((bounds_max - bounds_min).max() / grid_size, 1e-9)
+    cells = np.minimum(((positions - bounds_min) / cell_size).astype(np.int64), grid_size)
+    cell_ids = (cells[:, 0] * (grid_size + 1) + cells[:, 1]) * (grid_size + 1) + cells[:, 2]
+    unique_cell_ids, cell_indices = np.unique(cell_ids, return_inverse=True)
+
+    # The representative position of each cell is the mean of the vertices in it.
+    cell_positions = np.zeros((len(unique_cell_ids), 3))
+    np.add.at(cell_positions, cell_indices, positions)
+    cell_positions /= np.bincount(cell_indices)[:, np.newaxis]
+
+    # Drop the collapsed triangles.
+    triangle_cells = cell_indices.reshape(-1, 3)
+    is_kept = (triangle_cells[:, 0] != triangle_cells[:, 1]) & (triangle_cells[:, 1] != triangle_cells[:, 2]) & (triangle_cells[:, 0] != triangle_cells[:, 2])
+    is_kept_corner = np.repeat(is_kept, 3)
+
+    decimated = corners[is_kept_corner].copy()
+    decimated[:, :3] = cell_positions[cell_indices[is_kept_corner]]
+    return decimated.astype(np.float32).ravel()
+
+def load_mesh_lods(obj_path, obj, grid_sizes, cache_dir=None):
+    '''
+    Returns the decimated vertex arrays of a mesh (one per grid size, i.e. LOD 1, 2, ...; LOD 0 is the original mesh).
+    The LODs are generated on the first run and stored in `cache_dir` (keyed by the size and modification time of the obj file).
+    '''
+    floats_per_vertex = obj.size_position + obj.size_texture + obj.size_normal
+    stat = os.stat(obj_path)
+    name = os.path.splitext(os.path.basename(obj_path))[0]
+
+    lods = []
+    for grid_size in grid_sizes:
+        cache_path = os.path.join(cache_dir, f"{name}_{stat.st_size}_{stat.st_mtime_ns}_{grid_size}.npy") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            lods.append(np.load(cache_path))
+            continue
+
+        vertices = decimate_vertex_clustering(obj.vertices, floats_per_vertex, grid_size)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(cache_path, vertices)
+        lods.append(vertices)
+    return lods
+
+# ~ LOD selection
+class MeshLodSelector:
+    def __init__(self, screen_radii, hysteresis, fov, viewport_height):
+        '''
+        This MeshLodSelector class picks the LOD of every instance from its projected size on the screen.
+
+        :param screen_radii:    projected radius (in px) an instance needs to use LOD 0, 1, ... (descending; smaller instances use the next LOD)
+        :param hysteresis:      fraction of a threshold an instance must cross before switching LODs (so it doesn't flicker between two LODs)
+        :param fov:             vertical field of view of the camera (in degrees)
+        :param viewport_height: height of the viewport (in px)
+        '''
+        self.screen_radii = np.array(screen_radii, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.pixels_per_unit = viewport_height / 2 / np.tan(np.radians(fov) / 2) # (Projected size of 1 unit at a distance of 1 unit.)
+        self.lods = {} # key -> LOD of the instance in the previous frame
+
+    def select(self, keys, centers, radii, eye):
+        '''
+        Returns the LOD of every instance (given its world-space bounding sphere) as seen from `eye`.
+        `keys` identify the instances between frames (e.g. their square), for the hysteresis.
+        '''
+        distances = np.maximum(np.linalg.norm(centers - eye, axis=1), 1e-6)
+        projected_radii = radii * self.pixels_per_unit / distances
+
+        # The number of thresholds an instance is below is its LOD (with the thresholds moved away from the current LOD, for the hysteresis).
+        finest_lods = (projected_radii[:, np.newaxis] < self.screen_radii * (1 - self.hysteresis)).sum(axis=1)
+        coarsest_lods = (projected_radii[:, np.newaxis] < self.screen_radii * (1 + self.hysteresis)).sum(axis=1)
+        lods = (projected_radii[:, np.newaxis] < self.screen_radii).sum(axis=1)
+
+        for i, key in enumerate(keys):
+            previous_lod = self.lods.get(key)
+            if previous_lod is not None: lods[i] = min(max(previous_lod, finest_lods[i]), coarsest_lods[i])
+            self.lods[key] = int(lods[i])
+        return lods
@@ -0,0 +1,96 @@
+# Third-party imports.
+import time
+from OpenGL.GL import *
+import pygame
+
+# Local application imports.
+from util.shaderLoaderV3 import ShaderProgram
+from util.profiler import FrameProfiler
+
+class ProfilerOverlay:
+    def __init__(self, profiler: FrameProfiler, refresh_interval, font_size):
+        '''
+        This ProfilerOverlay class draws the rolling average and 99th percentile of each profiler section (CPU and GPU) over the scene.
+
+        The text is rendered with pygame into a texture every `refresh_interval` seconds (not every frame), then drawn as a single quad.
+        Showing the overlay enables the profiler (and its GPU timer queries); hiding it disables them again.
+        '''
+        self.profiler = profiler
+        self.refresh_interval = refresh_interval
+        self.font_size = font_size
+        self.is_visible = False
+        self.program = None
+        self.vao = None
+        self.texture_id = None
+        self.texture_size = (0, 0)
+        self.last_refresh_time = 0
+
+    def setup(self):
+        ''' Creates the overlay's OpenGL objects (in the current context). '''
+        if not pygame.font.get_init(): pygame.font.init()
+        self.font = pygame.font.SysFont("monospace", self.font_size)
+        self.program = ShaderProgram("shaders/overlay/vert.glsl", "shaders/overlay/frag.glsl")
+        self.program["tex2D"] = 0
+        self.vao = glGenVertexArrays(1) # (The quad's corners come from the vertex index, but the core profile needs a VAO bound.)
+        self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        self.last_refresh_time = 0
+
+    def cleanup(self):
+        if self.program is None: return
+        glDeleteProgram(self.program.shader)
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteTextures(1, [self.texture_id])
+        self.program = None
+
+    def set_visible(self, is_visible):
+        self.is_visible = is_visible
+        self.profiler.enabled = self.profiler.gpu_timers = is_visible
+        self.profiler.reset()
+        self.last_refresh_time = 0
+
+    def toggle(self):
+        self.set_visible(not self.is_visible)
+
+    def get_lines(self):
+        cpu_summary, gpu_summary = self.profiler.summary(), self.profiler.gpu_summary()
+        lines = [f"{'section':<18}{'cpu avg':>9}{'p99':>8}{'gpu avg':>9}{'p99':>8}  (ms)"]
+        for name, cpu_stats in cpu_summary.items():
+            gpu_stats = gpu_summary.get(name)
+            gpu_columns = f"{gpu_stats['mean']:>9.2f}{gpu_stats['p99']:>8.2f}" if gpu_stats else f"{'-':>9}{'-':>8}"
+            lines.append(f"{name:<18}{cpu_stats['mean']:>9.2f}{cpu_stats['p99']:>8.2f}{gpu_columns}")
+        frame_stats = cpu_summary.get("frame")
+        # (Only the CPU time of the frames that were drawn: with render-on-demand that is not the frame rate, so no FPS is derived from it.)
+        if frame_stats: lines.insert(0, f"frame {frame_stats['mean']:.2f} ms (CPU, {frame_stats['count']} frames drawn)")
+        return lines
+
+    def refresh(self):
+        ''' Re-renders the overlay's text into its texture. '''
+        lines = self.get_lines()
+        line_height = self.font.get_linesize()
+        padding = 6
+        surface = pygame.Surface((max(self.font.size(line)[0] for line in lines) + 2 * padding, line_height * len(lines) + 2 * padding), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, True, (255, 255, 255)), (padding, padding + i * line_height))
+
+        self.texture_size = surface.get_size()
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.texture_size[0], self.texture_size[1], 0, GL_RGBA, GL_UNSIGNED_BYTE, pygame.image.tobytes(surface, "RGBA", True))
+        self.last_refresh_time = time.perf_counter()
+
+    def draw(self, viewport_width, viewport_height, margin=10):
+        ''' Draws the overlay in the top-left corner of the viewport. '''
+        if not self.is_visible or self.program is None: return
+        if time.perf_counter() - self.last_refresh_time >= self.refresh_interval: self.refresh()
+
+        width, height = self.texture_size[0] / viewport_width * 2, self.texture_size[1] / viewport_height * 2
+        self.program["rect"] = [-1 + margin / viewport_width * 2, 1 - margin / viewport_height * 2 - height, width, height]
+        glDisable(GL_DEPTH_TEST)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        glEnable(GL_DEPTH_TEST)
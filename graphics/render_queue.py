@@ -0,0 +1,136 @@
+# Third-party imports.
+from operator import itemgetter
+from OpenGL.GL import *
+import numpy as np
+
+# Local application imports.
+from util.shaderLoaderV3 import ShaderProgram
+from graphics.frame_context import calc_bounding_spheres, cull_spheres
+
+# ~ Layers (drawn in this order)
+LAYER_CHESSBOARD = 0
+LAYER_PIECES = 1
+
+class RenderQueue:
+    def __init__(self):
+        '''
+        This RenderQueue class holds every object to draw in the current frame.
+
+        The scene is submitted once per frame (see `submit`), then the queue is sorted by layer, shader, VAO and texture
+        so that `draw` only rebinds state when it actually changes. The shadow (depth) pass and the main (color) pass
+        both draw from the same queue.
+
+        Each item has a world-space bounding sphere (from the model's `ObjLoader` bounds), so `draw` can skip
+        the items outside of the view frustum (main pass) or the light frustum (shadow pass).
+
+        `stats` counts the draw calls, state changes (program, VAO and texture binds) and culled items since the last `reset_stats()`.
+        '''
+        self.items = []
+        self.is_sorted = True
+        self.bounding_spheres = None # (The world-space (centers, radii) of the sorted items, computed once per frame.)
+        self.stats = { "draw_calls": 0, "state_changes": 0, "culled": 0, "shadow_culled": 0 }
+
+    def clear(self):
+        self.items.clear()
+        self.is_sorted = True
+        self.bounding_spheres = None
+
+    def reset_stats(self):
+        for key in self.stats: self.stats[key] = 0
+
+    def submit(self, layer, program, model, model_matrix, uniforms=None, casts_shadow=False, mesh=None, is_cullable=True):
+        '''
+        Adds a model (see `MODEL_TEMPLATE`) to the queue.
+
+        :param layer:           draw order of the item (see `LAYER_*`)
+        :param program:         shader program used by the main pass
+        :param model_matrix:    4x4 model matrix of the item
+        :param uniforms:        extra uniforms of the item (e.g. the glow of the kings)
+        :param casts_shadow:    whether the item is drawn in the shadow pass
+        :param mesh:            mesh to draw instead of the model's own mesh (e.g. a LOD): { "vao": ..., "n_vertices": ... }
+        :param is_cullable:     whether the item can be frustum culled (not e.g. a piece moved away from its model matrix by its vertex shader)
+        '''
+        texture_id, texture_target = model["texture"]["texture_id"], model["texture"].get("target", GL_TEXTURE_2D)
+        vao, n_vertices = (mesh["vao"], mesh["n_vertices"]) if mesh else (model["vao"], model["obj"].n_vertices)
+        self.items.append({
+            "sort_key": (layer, program.shader, vao, texture_id),
+            "layer": layer,
+            "program": program,
+            "vao": vao,
+            "texture_id": texture_id,
+            "texture_target": texture_target,
+            "n_vertices": n_vertices,
+            "model_matrix": model_matrix,
+            "uniforms": uniforms,
+            "casts_shadow": casts_shadow,
+            "bounds_center": model["obj"].bounds_center,
+            "bounds_radius": model["obj"].bounds_radius,
+            "is_cullable": is_cullable,
+        })
+        self.is_sorted = False
+        self.bounding_spheres = None
+
+    def sort(self):
+        if not self.is_sorted: self.items.sort(key=itemgetter("sort_key"))
+        self.is_sorted = True
+
+    def cull(self, frustum_planes):
+        ''' Returns which of the (sorted) items are inside the given frustum (the bounding spheres of all items are tested at once). '''
+        if self.bounding_spheres is None:
+            self.bounding_spheres = calc_bounding_spheres(
+                np.array([item["bounds_center"] for item in self.items]).reshape(-1, 3),
+                np.array([item["bounds_radius"] for item in self.items]),
+                np.array([item["model_matrix"] for item in self.items]).reshape(-1, 4, 4)
+            )
+        is_cullable = np.array([item["is_cullable"] for item in self.items], dtype=bool)
+        return cull_spheres(*self.bounding_spheres, frustum_planes) | ~is_cullable
+
+    def draw(self, program: ShaderProgram = None, model_matrix_uniform="model_matrix", shadow_casters_only=False, bind_textures=True, default_uniforms=None, frustum_planes=None, culled_stat="culled", layers=None):
+        '''
+        Draws the queued items (sorted by state), skipping redundant program, VAO and texture binds.
+
+        :param program:                 shader program to draw every item with (e.g. the shadow program), instead of the item's own program
+        :param model_matrix_uniform:    name of the model matrix uniform in the program
+        :param shadow_casters_only:     only draw the items that cast shadows (i.e. the depth pass)
+        :param bind_textures:           bind the item's texture (e.g. a texture array, see `TextureArray`) to texture unit 0 (not needed by the depth pass)
+        :param default_uniforms:        uniforms set for every item that doesn't override them (e.g. `{"isGlowing": False}`)
+        :param frustum_planes:          skip the items outside of this frustum (see `extract_frustum_planes`)
+        :param culled_stat:             name of the stat counting the culled items
+        :param layers:                  only draw the items of these layers (e.g. to time each layer separately)
+        '''
+        self.sort()
+        is_visible = self.cull(frustum_planes) if frustum_planes is not None else None
+        bound_vao, bound_texture_id = None, None
+        if bind_textures: glActiveTexture(GL_TEXTURE0)
+
+        for i, item in enumerate(self.items):
+            if shadow_casters_only and not item["casts_shadow"]: continue
+            if layers is not None and item["layer"] not in layers: continue
+            if is_visible is not None and not is_visible[i]:
+                self.stats[culled_stat] += 1
+                continue
+
+            # Bind the program, VAO and texture (only when they change).
+            item_program = program or item["program"]
+            if ShaderProgram.active_program != item_program.shader:
+                item_program.use()
+                self.stats["state_changes"] += 1
+            if item["vao"] != bound_vao:
+                glBindVertexArray(item["vao"])
+                bound_vao = item["vao"]
+                self.stats["state_changes"] += 1
+            if bind_textures and item["texture_id"] != bound_texture_id:
+                glBindTexture(item["texture_target"], item["texture_id"])
+                bound_texture_id = item["texture_id"]
+                self.stats["state_changes"] += 1
+
+            # Set the item's uniforms (the program skips the uploads of unchanged scalar uniforms).
+            item_program[model_matrix_uniform] = item["model_matrix"]
+            uniforms = item["uniforms"] or {}
+            if default_uniforms:
+                for name, value in default_uniforms.items(): item_program[name] = uniforms.get(name, value)
+            for name, value in uniforms.items():
+                if not default_uniforms or name not in default_uniforms: item_program[name] = value
+
+            glDrawArrays(GL_TRIANGLES, 0, item["n_vertices"])
+            self.stats["draw_calls"] += 1
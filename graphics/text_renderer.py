@@ -0,0 +1,207 @@
+# Third-party imports.
+import ctypes
+from OpenGL.GL import *
+import numpy as np
+import pygame
+
+# Local application imports.
+from util.shaderLoaderV3 import ShaderProgram
+
+# Where the (x, y) position of a string is, relative to its bounding box (fractions of its width and height, from the top-left corner).
+TEXT_ANCHORS = {
+    "topleft": (0, 0), "midtop": (0.5, 0), "topright": (1, 0),
+    "midleft": (0, 0.5), "center": (0.5, 0.5), "midright": (1, 0.5),
+    "bottomleft": (0, 1), "midbottom": (0.5, 1), "bottomright": (1, 1),
+}
+GLYPH_CHARACTERS = [chr(code) for code in range(32, 127)] # (Printable ASCII; any other character is drawn as '?'.)
+VERTEX_SIZE = 8 # Floats per vertex: position (x, y, in px from the top-left corner), uv, color (rgba).
+SLOT_GRANULARITY = 16 # A string's slot in the vertex buffer holds a multiple of this many glyphs (so most changes fit in place).
+
+class TextRenderer:
+    def __init__(self, font_path=None, font_size=24, shadow_offset=2, atlas_width=512, layout_cache_size=256):
+        '''
+        This TextRenderer class draws screen-space text (e.g. the HUD) from a glyph atlas, with a single draw call for every string.
+
+        The glyphs are rendered once (with pygame) into an atlas texture. Each string is laid out once into textured quads
+        (cached by text, see `layout`) and kept in its own slot of a shared vertex buffer: `set_text` only re-uploads the slot of a string
+        that changed (the whole buffer is only rebuilt when a string outgrows its slot, or a string is added or removed).
+
+        :param font_path:           font file (None := pygame's default font)
+        :param shadow_offset:       px (each glyph is drawn a second time in black behind itself, offset by this; 0 := no shadow)
+        :param layout_cache_size:   number of laid out strings kept (the cache is cleared when it's full)
+        '''
+        self.font_path = font_path
+        self.font_size = font_size
+        self.shadow_offset = shadow_offset
+        self.atlas_width = atlas_width
+        self.layout_cache_size = layout_cache_size
+        self.program = None
+        self.vao = None
+        self.vbo = None
+        self.atlas_texture_id = None
+        self.glyphs = {} # character -> (x, y, width, height) in the atlas (px)
+        self.atlas_size = (0, 0)
+        self.line_height = 0
+        self.layout_cache = {} # text -> (vertices (N, 4): position and uv, width, height)
+        self.strings = {} # name -> { "text", "position", "color", "anchor", "vertices", "first", "capacity" }
+        self.dirty_strings = set() # (Strings whose slot has to be re-uploaded.)
+        self.is_buffer_dirty = True # (The whole buffer has to be rebuilt.)
+        self.n_vertices = 0
+        self.stats = { "uploads": 0, "rebuilds": 0 }
+
+    def setup(self):
+        ''' Bakes the glyph atlas and creates the OpenGL objects (in the current context). '''
+        if not pygame.font.get_init(): pygame.font.init()
+        font = pygame.font.Font(self.font_path, self.font_size)
+        self.line_height = font.get_linesize()
+        self.bake_atlas(font)
+
+        self.program = ShaderProgram("shaders/hud/vert.glsl", "shaders/hud/frag.glsl")
+        self.program["glyphAtlas"] = 0
+        self.vao = glGenVertexArrays(1)
+        self.vbo = glGenBuffers(1)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        stride = VERTEX_SIZE * 4
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(2 * 4))
+        glVertexAttribPointer(2, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(4 * 4))
+        for location in range(3): glEnableVertexAttribArray(location)
+        glBindVertexArray(0)
+        self.is_buffer_dirty = True
+
+    def bake_atlas(self, font):
+        ''' Renders every glyph into a single-channel (coverage) atlas texture, packed in rows. '''
+        surfaces = { character: font.render(character, True, (255, 255, 255)) for character in GLYPH_CHARACTERS }
+        padding = 1 # px (between the glyphs, so the linear filtering doesn't bleed into a neighbor)
+        x, y, row_height = padding, padding, 0
+        for character, surface in surfaces.items():
+            width, height = surface.get_size()
+            if x + width + padding > self.atlas_width: x, y, row_height = padding, y + row_height + padding, 0
+            self.glyphs[character] = (x, y, width, height)
+            x, row_height = x + width + padding, max(row_height, height)
+        self.atlas_size = (self.atlas_width, y + row_height + padding)
+
+        coverage = np.zeros((self.atlas_size[1], self.atlas_size[0]), dtype=np.uint8)
+        for character, surface in surfaces.items():
+            x, y, width, height = self.glyphs[character]
+            coverage[y:y + height, x:x + width] = pygame.surfarray.array_alpha(surface).T
+
+        self.atlas_texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.atlas_texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1) # (The rows of a single-channel texture aren't 4-byte aligned.)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_R8, self.atlas_size[0], self.atlas_size[1], 0, GL_RED, GL_UNSIGNED_BYTE, coverage)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+
+    def cleanup(self):
+        if self.program is None: return
+        glDeleteProgram(self.program.shader)
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(1, [self.vbo])
+        glDeleteTextures(1, [self.atlas_texture_id])
+        self.program = None
+
+    # ~ Strings
+    def layout(self, text):
+        ''' Returns the quads (2 triangles per glyph: position and uv, relative to the top-left corner) and the size of a string (cached). '''
+        cached = self.layout_cache.get(text)
+        if cached: return cached
+
+        quads, width = [], 0
+        atlas_width, atlas_height = self.atlas_size
+        for line_index, line in enumerate(text.split("\n")):
+            x, y = 0, line_index * self.line_height
+            for character in line:
+                glyph_x, glyph_y, glyph_width, glyph_height = self.glyphs.get(character, self.glyphs["?"])
+                if character != " ":
+                    u0, v0, u1, v1 = glyph_x / atlas_width, glyph_y / atlas_height, (glyph_x + glyph_width) / atlas_width, (glyph_y + glyph_height) / atlas_height
+                    x0, y0, x1, y1 = x, y, x + glyph_width, y + glyph_height
+                    quads.append([[x0, y0, u0, v0], [x1, y0, u1, v0], [x1, y1, u1, v1], [x0, y0, u0, v0], [x1, y1, u1, v1], [x0, y1, u0, v1]])
+                x += glyph_width
+            width = max(width, x)
+
+        vertices = np.array(quads, dtype=np.float32).reshape(-1, 4)
+        if len(self.layout_cache) >= self.layout_cache_size: self.layout_cache.clear()
+        self.layout_cache[text] = (vertices, width, self.line_height * (text.count("\n") + 1))
+        return self.layout_cache[text]
+
+    def set_text(self, name, text, position, color=(1, 1, 1, 1), anchor="topleft"):
+        '''
+        Shows the string `name` (replacing its previous text), at `position` (px from the top-left corner of the viewport, see `TEXT_ANCHORS`).
+        Nothing is re-uploaded if the string didn't change.
+        '''
+        string = self.strings.get(name)
+        if string and string["text"] == text and string["position"] == tuple(position) and string["color"] == tuple(color) and string["anchor"] == anchor: return
+
+        quads, width, height = self.layout(text)
+        anchor_x, anchor_y = TEXT_ANCHORS[anchor]
+        origin = np.array([round(position[0] - width * anchor_x), round(position[1] - height * anchor_y)], dtype=np.float32)
+        vertices = self.build_vertices(quads, origin, color)
+
+        if string is None:
+            string = self.strings[name] = { "first": 0, "capacity": 0 }
+            self.is_buffer_dirty = True
+        string.update({ "text": text, "position": tuple(position), "color": tuple(color), "anchor": anchor, "vertices": vertices })
+        if len(vertices) > string["capacity"]: self.is_buffer_dirty = True
+        else: self.dirty_strings.add(name)
+
+    def build_vertices(self, quads, origin, color):
+        ''' Returns the vertices of a laid out string at `origin` (with its shadow first, so the glyphs are blended over it). '''
+        layers = [(origin + self.shadow_offset, (0, 0, 0, color[3] * 0.75))] if self.shadow_offset else []
+        layers.append((origin, color))
+
+        vertices = np.empty((len(quads) * len(layers), VERTEX_SIZE), dtype=np.float32)
+        for i, (layer_origin, layer_color) in enumerate(layers):
+            layer_vertices = vertices[i * len(quads):(i + 1) * len(quads)]
+            layer_vertices[:, 0:2] = quads[:, 0:2] + layer_origin
+            layer_vertices[:, 2:4] = quads[:, 2:4]
+            layer_vertices[:, 4:8] = layer_color
+        return vertices
+
+    def remove_text(self, name):
+        if self.strings.pop(name, None) is not None: self.is_buffer_dirty = True
+        self.dirty_strings.discard(name)
+
+    # ~ Drawing
+    def upload(self):
+        ''' Re-uploads the strings that changed (or rebuilds the whole vertex buffer, see `set_text`). '''
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if self.is_buffer_dirty:
+            # Give each string a slot rounded up to `SLOT_GRANULARITY` glyphs (the unused vertices stay zero, i.e. degenerate triangles).
+            first = 0
+            for string in self.strings.values():
+                glyph_vertices = 6 * SLOT_GRANULARITY * (2 if self.shadow_offset else 1)
+                string["first"], string["capacity"] = first, max(-(-len(string["vertices"]) // glyph_vertices), 1) * glyph_vertices
+                first += string["capacity"]
+            buffer = np.zeros((first, VERTEX_SIZE), dtype=np.float32)
+            for string in self.strings.values():
+                buffer[string["first"]:string["first"] + len(string["vertices"])] = string["vertices"]
+            glBufferData(GL_ARRAY_BUFFER, buffer.nbytes, buffer, GL_DYNAMIC_DRAW)
+            self.n_vertices = first
+            self.stats["rebuilds"] += 1
+        else:
+            for name in self.dirty_strings:
+                string = self.strings[name]
+                slot = np.zeros((string["capacity"], VERTEX_SIZE), dtype=np.float32)
+                slot[:len(string["vertices"])] = string["vertices"]
+                glBufferSubData(GL_ARRAY_BUFFER, string["first"] * VERTEX_SIZE * 4, slot.nbytes, slot)
+                self.stats["uploads"] += 1
+        self.is_buffer_dirty = False
+        self.dirty_strings.clear()
+
+    def draw(self, viewport_width, viewport_height):
+        ''' Draws every string (over whatever is in the framebuffer) in a single draw call. '''
+        if self.program is None or not self.strings: return
+        if self.is_buffer_dirty or self.dirty_strings: self.upload()
+
+        self.program["viewport_size"] = [viewport_width, viewport_height]
+        glDisable(GL_DEPTH_TEST)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, self.atlas_texture_id)
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_TRIANGLES, 0, self.n_vertices)
+        glEnable(GL_DEPTH_TEST)
@@ -0,0 +1,105 @@
+# Third-party imports.
+import hashlib
+import threading
+from OpenGL.GL import *
+import pygame
+
+class TextureArray:
+    def __init__(self, layer_size):
+        '''
+        This TextureArray class holds every skin of a model (e.g. the pieces in each material) in the layers of one texture array,
+        so the models share a single texture binding and switching skins only changes which layer they sample (a uniform, see `get_layer`).
+
+        Every image is scaled to `layer_size` (the layers of a texture array share one size) and stored in a single layer,
+        even when several paths hold the same image (e.g. every white piece of a skin has the same texture).
+        The layers asked for by `setup` are uploaded right away, the others are decoded on a background thread
+        and uploaded by `update` (one layer per frame, to avoid a hitch), or right away by `require`.
+
+        The decoded images are dropped once uploaded (a new OpenGL context decodes them again).
+
+        :param layer_size:  size (in px) of the (square) layers
+        '''
+        self.layer_size = layer_size
+        self.texture_id = None
+        self.layers = {} # path -> layer
+        self.layer_paths = [] # layer -> path of its image (the first path holding it)
+        self.is_uploaded = []
+        self.pixels = {} # path of a layer's image -> decoded pixels (scaled to the layer size), until they are uploaded
+        self.lock = threading.Lock() # (Held while an image is decoded, so the background thread and `require` never decode the same image at once.)
+
+    def setup(self, paths, required_paths=()):
+        '''
+        Creates the texture array (in the current OpenGL context), with a layer for each distinct image of `paths`.
+        The layers of `required_paths` are uploaded right away, the others are decoded in the background.
+        '''
+        digests = {} # (Files with the same contents share a layer.)
+        self.layers, self.layer_paths = {}, []
+        for path in paths:
+            with open(path, 'rb') as file: digest = hashlib.sha1(file.read()).digest()
+            if digest not in digests:
+                digests[digest] = len(self.layer_paths)
+                self.layer_paths.append(path)
+            self.layers[path] = digests[digest]
+        self.is_uploaded = [False] * len(self.layer_paths)
+        self.pixels.clear()
+
+        self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, 0, GL_RGB8, self.layer_size, self.layer_size, len(self.layer_paths), 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+
+        self.require(required_paths)
+        remaining_paths = [path for layer, path in enumerate(self.layer_paths) if not self.is_uploaded[layer]]
+        if remaining_paths:
+            thread = threading.Thread(target=lambda: [self.decode(path, is_background=True) for path in remaining_paths], name="texture-array-decoder", daemon=True)
+            thread.start()
+
+    def cleanup(self):
+        if self.texture_id is None: return
+        glDeleteTextures(1, [self.texture_id])
+        self.texture_id = None
+
+    def get_layer(self, path):
+        return self.layers[path]
+
+    def decode(self, path, is_background=False):
+        '''
+        Returns the pixels of the image at `path`, scaled to the layer size (decoded on first use).
+        In the background, the layers uploaded in the meantime (see `require`) are skipped (their pixels would never be freed).
+        '''
+        with self.lock:
+            if is_background and self.is_uploaded[self.layers[path]]: return None
+            if path not in self.pixels:
+                image = pygame.image.load(path)
+                if image.get_size() != (self.layer_size, self.layer_size): image = pygame.transform.smoothscale(image, (self.layer_size, self.layer_size))
+                self.pixels[path] = pygame.image.tobytes(image, "RGB", True)
+            return self.pixels[path]
+
+    def upload(self, layer, pixels):
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+        glTexSubImage3D(GL_TEXTURE_2D_ARRAY, 0, 0, 0, layer, self.layer_size, self.layer_size, 1, GL_RGB, GL_UNSIGNED_BYTE, pixels)
+        with self.lock:
+            self.is_uploaded[layer] = True
+            self.pixels.pop(self.layer_paths[layer], None)
+
+    def require(self, paths):
+        ''' Uploads the layers of `paths` now, if they aren't yet (decoding them first if the background thread hasn't). '''
+        for path in paths:
+            layer = self.layers[path]
+            if not self.is_uploaded[layer]: self.upload(layer, self.decode(self.layer_paths[layer]))
+
+    def is_complete(self):
+        ''' Returns whether every layer is uploaded (i.e. `update` has nothing left to do). '''
+        return all(self.is_uploaded)
+
+    def update(self):
+        ''' Uploads the next layer decoded in the background, if any (call once per frame). '''
+        for layer, path in enumerate(self.layer_paths):
+            if self.is_uploaded[layer]: continue
+            pixels = self.pixels.get(path)
+            if pixels is not None:
+                self.upload(layer, pixels)
+                return
@@ -1,96 +1,101 @@
 # Third-party imports.
-import pygame
 import sys
 
 # Local application imports.
-from constants import WINDOW, SKIP_MAIN_MENU, RESET_GAME_EVENT
-from game.gameplay import pre_draw_gameloop, post_draw_gameloop, gameplay_setup
-from menu.menu import init_main_menu
-from menu.menu_pause import open_pause_menu
-from menu.menu_promote_pawn import open_promote_pawn_menu
-from menu.menu_game_over import open_game_over_menu
-from graphics.graphics_3d import setup_3d_graphics, draw_graphics, cleanup_graphics
+from util.startup_profiler import startup_profiler # (First, so it times the other imports.)
+if "-profile-startup" in sys.argv: startup_profiler.enable()
 
-pygame.mixer.init()
+# (The menus, and pygame_menu, are imported when they are first opened.)
+with startup_profiler.phase("imports"):
+    import pygame
+    from constants import SKIP_MAIN_MENU, RESET_GAME_EVENT, AMBIENCE_MUSIC
+    from game.gameplay import pre_draw_gameloop, post_draw_gameloop, gameplay_setup, begin_frame, request_redraw, wait_for_next_frame
+    from graphics.graphics_3d import setup_3d_graphics, draw_graphics, cleanup_graphics, open_menu_surface
+    from util.profiler import profiler
+    from util.sound_bank import sound_bank
 
-def main(game_settings=None):
 
-    # Setup.
-    game, gui = gameplay_setup(game_settings)
-    if "-nomenu" not in sys.argv and not SKIP_MAIN_MENU:
-        init_main_menu(pygame.display.set_mode(WINDOW["display"]), game)
+def main():
+    ''' Runs the session: menu -> game -> game over -> menu ..., with one window, one engine and one HUD for the whole process. '''
+
+    # Setup (once per session).
+    with startup_profiler.phase("gameplay_setup"): game, gui = gameplay_setup()
+    show_main_menu = "-nomenu" not in sys.argv and not SKIP_MAIN_MENU
+    
+    state = 'menu' if show_main_menu else 'game'
+    while state != 'quit':
+        if state == 'menu':
+            with startup_profiler.phase("main_menu (includes the time spent in it)"):
+                from menu.menu import init_main_menu
+                init_main_menu(open_menu_surface(game), game)
+            state = 'game'
+        elif state == 'game':
+            state = play_game(game, gui)
+            if state == 'menu' and not show_main_menu: state = 'game'
+        elif state == 'game_over':
+            from menu.menu_game_over import open_game_over_menu
+            open_game_over_menu(open_menu_surface(game, is_over_game=True), game)
+            state = 'menu' if show_main_menu else 'game'
+
+    cleanup()
+
+def play_game(game, gui):
+    ''' Plays one game (from the starting position), then returns the next state of the session: 'game_over', 'menu' or 'quit'. '''
+    game.reset()
     
     # Ambient music setup.
-    if(game.ambience_selection == 0):
-        pygame.mixer.music.load('sounds/chill.mp3')
-        pygame.mixer.music.set_volume(0.2)  
-        pygame.mixer.music.play(-1)  
-    elif(game.ambience_selection == 1):
-        pygame.mixer.music.load('sounds/orchestra.mp3')
-        pygame.mixer.music.set_volume(0.1) 
-        pygame.mixer.music.play(-1)  
-    elif(game.ambience_selection == 2):
-        pygame.mixer.music.load('sounds/beats.mp3')
-        pygame.mixer.music.set_volume(0.2)
-        pygame.mixer.music.play(-1)
+    if game.ambience_selection < len(AMBIENCE_MUSIC):
+        sound_bank.play_music(*AMBIENCE_MUSIC[game.ambience_selection])
 
-    setup_3d_graphics(game, gui)
+    with startup_profiler.phase("setup_3d_graphics"): setup_3d_graphics(game, gui)
     
     # Reset the game after the main menu is closed.
     pygame.time.set_timer(RESET_GAME_EVENT, 1, 1)
     
-    notify_sound = pygame.mixer.Sound('sounds/notify.mp3')
-    game_over_sound = pygame.mixer.Sound('sounds/game-end.mp3')
-    
     # Main Loop.
-    last_time = pygame.time.get_ticks()
     while True:
-        current_time = pygame.time.get_ticks()
-        delta_time = (current_time - last_time) / 1000.0  # Convert milliseconds to seconds
-        last_time = current_time
-        
-        result = pre_draw_gameloop()
-        if result == 'quit': break
+        wait_for_next_frame()
+        with profiler.section("pre_draw_gameloop"): result = pre_draw_gameloop()
+        if result == 'quit': return 'quit'
         elif result == 'pause':
-            pause_game_and_continue(lambda: open_pause_menu(pygame.display.set_mode(WINDOW["display"]), game), game, gui)
+            from menu.menu_pause import open_pause_menu
+            pause_game_and_continue(lambda: open_pause_menu(open_menu_surface(game, is_over_game=True), game), game, gui)
             continue
         elif result == 'needs_pawn_promotion':
-            notify_sound.play()
-            pause_game_and_continue(lambda: open_promote_pawn_menu(pygame.display.set_mode(WINDOW["display"]), game), game, gui)
+            sound_bank.play("notify")
+            from menu.menu_promote_pawn import open_promote_pawn_menu
+            pause_game_and_continue(lambda: open_promote_pawn_menu(open_menu_surface(game, is_over_game=True), game), game, gui)
             continue
         elif result == 'game_over':
-            game_over_sound.play()
-            restart_game(game, display_menu_first_func=lambda: open_game_over_menu(pygame.display.set_mode(WINDOW["display"]), game))
-            return
+            sound_bank.play("game_end")
+            return 'game_over'
         elif result == 'play_bowling_animation':
-            # pause_game_and_continue(lambda: play_bowling_animation(pygame.display.set_mode(WINDOW["display"]), game, use_random_animation=True), game, gui)
+            # pause_game_and_continue(lambda: play_bowling_animation(open_menu_surface(game, is_over_game=True), game, use_random_animation=True), game, gui)
             continue
-        if game.get_go_to_main_menu():
-            restart_game(game)
-            return
+        if game.get_go_to_main_menu(): return 'menu'
             
-        draw_graphics(delta_time, result['highlighted_square'], result['selected_square'], result['valid_move_squares'], result['invalid_move_square'])
-        post_draw_gameloop()
-
-    cleanup(quitting=True)
-    
-def restart_game(game, display_menu_first_func=None):
-    if display_menu_first_func: display_menu_first_func()
-    cleanup()
-    main(game_settings=game.get_settings())
+        # Only re-render the scene when something changed or moves (see `FrameScheduler`).
+        delta_time = begin_frame()
+        if delta_time is None: continue
+        
+        with profiler.section("frame", gpu=False), startup_profiler.phase("first_frame"):
+            draw_graphics(delta_time, result['highlighted_square'], result['selected_square'], result['valid_move_squares'], result['invalid_move_square'])
+            post_draw_gameloop()
+        profiler.end_frame()
+        startup_profiler.finish() # (The first frame was presented.)
     
 def pause_game_and_continue(menu_func, game, gui):
     menu_func()
     setup_3d_graphics(game, gui, is_resume=True)
+    request_redraw()
 
-def cleanup(quitting=False):
+def cleanup():
     # Cleanup.
     cleanup_graphics()
     
     # Close the graphics window and exit the program.
-    if quitting:
-        pygame.quit()
-        quit()
+    pygame.quit()
+    quit()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,64 +1,67 @@
 # Third-party imports.
 import pygame_menu
-import pygame
 
 # Local application imports.
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
 from menu.menu_settings import open_settings_menu
 from menu.menu_store import open_store_menu
 from menu.menu_credits import open_credits_menu
-
-pygame.mixer.init()
-
-click_sound = pygame.mixer.Sound('./sounds/item_click.wav')
-game_start_sound = pygame.mixer.Sound('./sounds/game-start.mp3')
+from graphics.graphics_3d import preload_skybox
+from util.sound_bank import sound_bank
+from constants import MENU_MUSIC
 
 def background_music():
-    pygame.mixer.music.load('./sounds/menu.mp3')
-    pygame.mixer.music.set_volume(0.5)  # Set the volume to 50%
-    pygame.mixer.music.play(-1)  # -1 means the music will loop indefinitely
+    sound_bank.play_music(*MENU_MUSIC) # (Looped indefinitely.)
 
 def init_main_menu(surface, game):
+    main_menu = get_menu('main', surface, build_main_menu)
+    main_menu.set_attribute('game', game) # (The menu is built once, then re-shown.)
+    main_menu.set_attribute('surface', surface)
+
+    background_music()
+    preload_skybox(game.get_skybox_selection()) # Decode the selected environment while the user is in the menu.
+    
+    run_menu(main_menu, surface, menu_type='main')
+
+    return main_menu
+
+def build_main_menu(width, height):
     # Define the main menu interface.
     main_menu = pygame_menu.Menu(
         title='3D Chess',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme,
         enabled=True
     )
 
-    background_music()
-
-    # Add main menu buttons.
-    main_menu.add.button('Play', lambda: play_and_start_game(main_menu, game))
-    main_menu.add.button('Settings', lambda: play_and_open_settings(surface, game))
-    main_menu.add.button('Store', lambda: play_and_open_store(surface, game))
-    main_menu.add.button('Credits', lambda: play_and_open_credits(surface, game))
+    # Add main menu buttons (for the game and surface the menu was last opened with).
+    main_menu.add.button('Play', lambda: play_and_start_game(main_menu, main_menu.get_attribute('game')))
+    main_menu.add.button('Settings', lambda: play_and_open_settings(main_menu.get_attribute('surface'), main_menu.get_attribute('game')))
+    main_menu.add.button('Store', lambda: play_and_open_store(main_menu.get_attribute('surface'), main_menu.get_attribute('game')))
+    main_menu.add.button('Credits', lambda: play_and_open_credits(main_menu.get_attribute('surface'), main_menu.get_attribute('game')))
     main_menu.add.button('Quit', pygame_menu.events.EXIT)
-    
-    main_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface))
 
     return main_menu
 
 def play_and_start_game(main_menu, game):
-    game_start_sound.play()
+    sound_bank.play("game_start")
     start_the_game(main_menu, game)
 
 def play_and_open_settings(surface, game):
-    click_sound.play()
+    sound_bank.play("click")
     open_settings_menu(surface, game)
 
 def play_and_open_store(surface, game):
-    click_sound.play()
+    sound_bank.play("click")
     open_store_menu(surface, game)
 
 def play_and_open_credits(surface, game):
-    click_sound.play()
+    sound_bank.play("click")
     open_credits_menu(surface, game)
 
 def start_the_game(menu, game):
     menu.disable()
-    pygame.mixer.music.stop()  # Stop the music
+    sound_bank.stop_music()
 
     # game.start() # TODO: if necessary (e.g. if we wanted to add a timer / reset game functionality / etc.)
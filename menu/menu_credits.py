@@ -3,13 +3,19 @@ import pygame_menu
 
 # Local application imports.
 from constants import developers, third_party_credits
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
 
 def open_credits_menu(surface, game):
+    credits_menu = get_menu('credits', surface, build_credits_menu)
+    run_menu(credits_menu, surface, menu_type='credits')
+    
+    return credits_menu
+
+def build_credits_menu(width, height):
     credits_menu = pygame_menu.Menu(
         title='credits',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
     
@@ -25,9 +31,8 @@ def open_credits_menu(surface, game):
     # Add a button to return to the main menu.
     credits_menu.add.button('Return To Main Menu'.replace(" ", " \t "), credits_menu.disable)
     credits_menu.add.label('')
-    credits_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='credits'))
     
     return credits_menu
 
 # Example usage:
-# open_credits_menu(surface, game)
\ No newline at end of file
+# open_credits_menu(surface, game)
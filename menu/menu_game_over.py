@@ -2,31 +2,38 @@
 import pygame_menu
 
 # Local application imports.
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
 
 def open_game_over_menu(surface, game):
+    game_over_menu = get_menu('game_over', surface, build_game_over_menu)
+    
+    # Show the result of the game (the menu is built once, then re-shown).
+    game_over_menu.set_attribute('game', game)
+    winner = game.get_winner()
+    game_over_menu.get_widget('winner').set_title('Draw' if winner == 'draw' else f'{winner.capitalize()} wins!'.replace(' ', ' \t '))
+    
+    run_menu(game_over_menu, surface, menu_type='game_over')
+    
+    return game_over_menu
+
+def build_game_over_menu(width, height):
     game_over_menu = pygame_menu.Menu(
         title='Game Over',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
     
     # Add game_over menu options.
     game_over_menu.add.label('GAME OVER'.replace(' ', ' \t '))
     game_over_menu.add.label('')
-    
-    winner = game.get_winner()
-    if winner == 'draw': game_over_menu.add.label('Draw'.replace(' ', ' \t '))
-    else: game_over_menu.add.label(f'{winner.capitalize()} wins!'.replace(' ', ' \t '))
+    game_over_menu.add.label('', label_id='winner') # (Set when the menu is opened.)
     game_over_menu.add.label('')
     
-    game_over_menu.add.button('Return To Main Menu'.replace(" ", " \t "), lambda: return_to_main_menu(game_over_menu,  game))
-    
-    game_over_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='game_over'))
+    game_over_menu.add.button('Return To Main Menu'.replace(" ", " \t "), lambda: return_to_main_menu(game_over_menu, game_over_menu.get_attribute('game')))
     
     return game_over_menu
 
 def return_to_main_menu(pause_menu, game):
     pause_menu.disable()
-    game.set_go_to_main_menu(True)
\ No newline at end of file
+    game.set_go_to_main_menu(True)
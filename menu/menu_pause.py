@@ -3,59 +3,68 @@ import pygame_menu
 
 # Local application imports.
 from menu.menu_store import change_selected_piece, change_selected_board, change_selected_skybox #, change_selected_ambience
-from menu.menu_settings import change_elo, toggle_ai
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.menu_settings import change_elo, toggle_ai, get_elo_index
+from menu.theme import menu_theme, get_menu, run_menu
 
 def open_pause_menu(surface, game):
+    pause_menu = get_menu('pause', surface, build_pause_menu)
+    
+    # Show the current options of the game (the menu is built once, then re-shown).
+    pause_menu.set_attribute('game', game)
+    pause_menu.get_widget('difficulty').set_value(get_elo_index(game.get_ai_elo()))
+    pause_menu.get_widget('toggle_ai').set_value(game.get_ai_opponent_enabled())
+    pause_menu.get_widget('board').set_value(game.get_board_selection())
+    pause_menu.get_widget('piece').set_value(game.get_piece_selection())
+    pause_menu.get_widget('skybox').set_value(game.get_skybox_selection())
+    
+    run_menu(pause_menu, surface, menu_type='pause')
+    
+    return pause_menu
+
+def build_pause_menu(width, height):
     pause_menu = pygame_menu.Menu(
         title='Pause',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
     
-    cur_elo = game.get_ai_elo()
-    ai_enabled = game.get_ai_opponent_enabled()
-    
-    # Add pause menu options.
+    # Add pause menu options (for the game the menu was last opened for).
     pause_menu.add.label('[Quick \t Options]:')
     pause_menu.add.selector(
         'Difficulty \t (Elo): \t ',
         [('Easy', 400), ('Medium', 900), ('Hard', 1750)],
-        default=0 if cur_elo <= 400 else 1 if cur_elo <= 900 else 2,
-        onchange=lambda selected_value, _: change_elo(selected_value[0][0], selected_value[0][1], game)
+        selector_id='difficulty',
+        onchange=lambda selected_value, _: change_elo(selected_value[0][0], selected_value[0][1], pause_menu.get_attribute('game'))
     )
     pause_menu.add.toggle_switch(
         'Enable \t AI \t Opponent: ',
         toggleswitch_id='toggle_ai',
-        default=ai_enabled,
-        onchange=lambda enabled: toggle_ai(enabled, game)
+        onchange=lambda enabled: toggle_ai(enabled, pause_menu.get_attribute('game'))
     )
     pause_menu.add.label('')
     pause_menu.add.label('[Quick \t Customization]:')
     pause_menu.add.selector(
         'Board : \t ',
         [('Wood', 0), ('Classic', 1), ('RGB', 2)],
-        default=game.get_board_selection(),
-        onchange=lambda value, _: change_selected_board(value[0], value[1], game)
+        selector_id='board',
+        onchange=lambda value, _: change_selected_board(value[0], value[1], pause_menu.get_attribute('game'))
     )
     pause_menu.add.selector(
         'Piece : \t ',
         [('Classic', 0), ('Wood', 1), ('Metal', 2)],
-        default=game.get_piece_selection(),
-        onchange=lambda value, _: change_selected_piece(value[0], value[1], game)
+        selector_id='piece',
+        onchange=lambda value, _: change_selected_piece(value[0], value[1], pause_menu.get_attribute('game'))
     )
     pause_menu.add.selector(
         'Environment : \t ',
         [('Galaxy', 0), ('Dinner \t in \t space', 1), ('Fantasy \t Land \t (1)', 2), ('Fantasy \t Land \t (2)', 2)],
-        default=game.get_skybox_selection(),
-        onchange=lambda value, _: change_selected_skybox(value[0], value[1], game)
+        selector_id='skybox',
+        onchange=lambda value, _: change_selected_skybox(value[0], value[1], pause_menu.get_attribute('game'))
     )
     pause_menu.add.label('')
     pause_menu.add.button('Return To Game'.replace(" ", " \t "), pause_menu.disable)
-    pause_menu.add.button('Return To Main Menu'.replace(" ", " \t "), lambda: return_to_main_menu(pause_menu,  game))
-    
-    pause_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='pause'))
+    pause_menu.add.button('Return To Main Menu'.replace(" ", " \t "), lambda: return_to_main_menu(pause_menu, pause_menu.get_attribute('game')))
     
     return pause_menu
 
@@ -65,4 +74,4 @@ def return_to_main_menu(pause_menu, game):
     
 
 # Example usage:
-# open_pause_menu(surface, game)
\ No newline at end of file
+# open_pause_menu(surface, game)
@@ -2,27 +2,30 @@
 import pygame_menu
 
 # Local application imports.
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
 
 def open_promote_pawn_menu(surface, game):
+    promote_pawn_menu = get_menu('promote_pawn', surface, build_promote_pawn_menu)
+    promote_pawn_menu.set_attribute('game', game) # (The menu is built once, then re-shown.)
+    run_menu(promote_pawn_menu, surface, menu_type='promote_pawn')
+    
+    return promote_pawn_menu
+
+def build_promote_pawn_menu(width, height):
     promote_pawn_menu = pygame_menu.Menu(
         title='Promote Pawn',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
     
     # Add promote_pawn menu options.
     promote_pawn_menu.add.label('Promote pawn to:'.replace(' ', ' \t '))
-    promote_pawn_menu.add.button('Queen', lambda: return_to_game(game, promote_pawn_menu, 'Queen'))
-    promote_pawn_menu.add.button('Rook', lambda: return_to_game(game, promote_pawn_menu, 'Rook'))
-    promote_pawn_menu.add.button('Bishop', lambda: return_to_game(game, promote_pawn_menu, 'Bishop'))
-    promote_pawn_menu.add.button('Knight', lambda: return_to_game(game, promote_pawn_menu, 'Knight'))
-    
-    promote_pawn_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='promote_pawn'))
+    for pawn_selection in ('Queen', 'Rook', 'Bishop', 'Knight'):
+        promote_pawn_menu.add.button(pawn_selection, lambda pawn_selection=pawn_selection: return_to_game(promote_pawn_menu.get_attribute('game'), promote_pawn_menu, pawn_selection))
     
     return promote_pawn_menu
 
 def return_to_game(game, promote_pawn_menu, pawn_selection="Queen"):
     game.set_pawn_promotion_selection(pawn_selection)
-    promote_pawn_menu.disable()
\ No newline at end of file
+    promote_pawn_menu.disable()
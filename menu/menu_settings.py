@@ -2,7 +2,7 @@
 import pygame_menu
 
 # Local application imports.
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
 
 def change_elo(difficulty_name, elo, game):
     # Change the Elo of the AI opponent.
@@ -16,36 +16,46 @@ def toggle_ai(enabled, game):
         game.set_ai_opponent_enabled(enabled)
         print(f"AI opponent {'enabled' if enabled else 'disabled'}.")
 
+def get_elo_index(elo):
+    ''' Returns the index of the difficulty (Easy, Medium, Hard) of an Elo in the difficulty selectors. '''
+    return 0 if elo <= 400 else 1 if elo <= 900 else 2
+
 def open_settings_menu(surface, game):
+    settings_menu = get_menu('settings', surface, build_settings_menu)
+    
+    # Show the current settings of the game (the menu is built once, then re-shown).
+    settings_menu.set_attribute('game', game)
+    settings_menu.get_widget('difficulty').set_value(get_elo_index(game.get_ai_elo()))
+    settings_menu.get_widget('toggle_ai').set_value(game.get_ai_opponent_enabled())
+    
+    run_menu(settings_menu, surface, menu_type='settings')
+    
+    return settings_menu
+
+def build_settings_menu(width, height):
     settings_menu = pygame_menu.Menu(
         title='Settings',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
     
-    cur_elo = game.get_ai_elo()
-    ai_enabled = game.get_ai_opponent_enabled()
-    
-    # Add settings menu options.
+    # Add settings menu options (for the game the menu was last opened for).
     settings_menu.add.selector(
         'Difficulty \t (Elo): \t ',
         [('Easy', 400), ('Medium', 900), ('Hard', 1750)],
-        default=0 if cur_elo <= 400 else 1 if cur_elo <= 900 else 2,
-        onchange=lambda selected_value, _: change_elo(selected_value[0][0], selected_value[0][1], game)
+        selector_id='difficulty',
+        onchange=lambda selected_value, _: change_elo(selected_value[0][0], selected_value[0][1], settings_menu.get_attribute('game'))
     )
     settings_menu.add.toggle_switch(
         'Enable \t AI \t Opponent: ',
         toggleswitch_id='toggle_ai',
-        default=ai_enabled,
-        onchange=lambda enabled: toggle_ai(enabled, game)
+        onchange=lambda enabled: toggle_ai(enabled, settings_menu.get_attribute('game'))
     )
     settings_menu.add.label('')
     settings_menu.add.button('Return To Main Menu'.replace(" ", " \t "), settings_menu.disable)
     
-    settings_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='settings'))
-    
     return settings_menu
 
 # Example usage:
-# open_settings_menu(surface, game)
\ No newline at end of file
+# open_settings_menu(surface, game)
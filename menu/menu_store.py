@@ -2,7 +2,8 @@
 import pygame_menu
 
 # Local application imports.
-from menu.theme import menu_theme, draw_main_menu_background
+from menu.theme import menu_theme, get_menu, run_menu
+from graphics.graphics_3d import preload_skybox
 
 
 def change_selected_piece(selected_piece_name, selected_piece_index, game):
@@ -16,50 +17,65 @@ def change_selected_ambience(selected_ambience_name, selected_ambience_index, ga
 
 def change_selected_skybox(selected_skybox_name, selected_skybox_index, game):
     game.set_skybox_selection(selected_skybox_index)
+    preload_skybox(selected_skybox_index) # Start decoding the newly selected environment right away.
 
 def open_store_menu(surface, game):
+    store_menu = get_menu('store', surface, build_store_menu)
+    
+    # Show the current selections of the game (the menu is built once, then re-shown).
+    store_menu.set_attribute('game', game)
+    store_menu.get_widget('skybox').set_value(game.get_skybox_selection())
+    store_menu.get_widget('board').set_value(game.get_board_selection())
+    store_menu.get_widget('piece').set_value(game.get_piece_selection())
+    store_menu.get_widget('ambience').set_value(game.get_ambience_selection())
+    
+    run_menu(store_menu, surface, menu_type='store')
+    
+    return store_menu
+
+def build_store_menu(width, height):
     store_menu = pygame_menu.Menu(
         title='Store',
-        width=surface.get_width(),
-        height=surface.get_height(),
+        width=width,
+        height=height,
         theme=menu_theme
     )
 
+    # (The selections apply to the game the menu was last opened for.)
     store_menu.add.selector(
         'Environment : \t ',
         [('Galaxy', 0), ('Dinner \t in \t space', 1), ('Fantasy \t Land \t (1)', 2), ('Fantasy \t Land \t (2)', 2)],
-        default=game.get_skybox_selection(),
-        onchange=lambda value, _: change_selected_skybox(value[0], value[1], game)
+        selector_id='skybox',
+        onchange=lambda value, _: change_selected_skybox(value[0], value[1], store_menu.get_attribute('game'))
     )
 
     store_menu.add.selector(
         'Board : \t ',
         [('Wood', 0), ('Classic', 1), ('RGB', 2)],
-        default=game.get_board_selection(),
-        onchange=lambda value, _: change_selected_board(value[0], value[1], game)
+        selector_id='board',
+        onchange=lambda value, _: change_selected_board(value[0], value[1], store_menu.get_attribute('game'))
     )
 
     store_menu.add.selector(
         'Piece : \t ',
         [('Classic', 0), ('Wood', 1), ('Metal', 2)],
-        default=game.get_piece_selection(),
-        onchange=lambda value, _: change_selected_piece(value[0], value[1], game)
+        selector_id='piece',
+        onchange=lambda value, _: change_selected_piece(value[0], value[1], store_menu.get_attribute('game'))
     )
 
     store_menu.add.selector(
         'Game Ambience : \t ',
         [('Chill', 0), ('Orchestral', 1), ('Beats', 2), ('Off', 3)],
-        default=game.get_ambience_selection(),
-        onchange=lambda value, _: change_selected_ambience(value[0], value[1], game)
+        selector_id='ambience',
+        onchange=lambda value, _: change_selected_ambience(value[0], value[1], store_menu.get_attribute('game'))
     )
     
     # Add a button to return to the main menu.
     store_menu.add.label('')
     store_menu.add.button('Return To Main Menu'.replace(" ", " \t "), store_menu.disable)
-    store_menu.mainloop(surface, bgfun=lambda: draw_main_menu_background(surface, menu_type='store'))
     
     return store_menu
 
 
 # Example usage:
-# open_store_menu(surface, game)
\ No newline at end of file
+# open_store_menu(surface, game)
@@ -1,9 +1,11 @@
 # Third-party imports.
 import math
+import pygame
 import pygame_menu
 
 # Local application imports.
-from constants import MAIN_MENU_BACKGROUND_IMAGE, SETTINGS_MENU_BACKGROUND_IMAGE, STORE_MENU_BACKGROUND_IMAGE, PAUSE_MENU_BACKGROUND_IMAGE, PROMOTE_PAWN_BACKGROUND_IMAGE, GAME_OVER_BACKGROUND_IMAGE
+from graphics.graphics_3d import present_menu
+from constants import MAIN_MENU_3D_BACKGROUND, MAIN_MENU_BACKGROUND_IMAGE, SETTINGS_MENU_BACKGROUND_IMAGE, STORE_MENU_BACKGROUND_IMAGE, PAUSE_MENU_BACKGROUND_IMAGE, PROMOTE_PAWN_BACKGROUND_IMAGE, GAME_OVER_BACKGROUND_IMAGE
 
 menu_theme = pygame_menu.themes.THEME_SOLARIZED.copy() # Copy a theme to build off of.
 theme_extension = {
@@ -25,20 +27,60 @@ theme_extension = {
     'widget_font_shadow_position': pygame_menu.locals.POSITION_SOUTHWEST,
     'widget_font_size': 48,
 }
-main_menu_background_image = pygame_menu.BaseImage(MAIN_MENU_BACKGROUND_IMAGE)
-settings_menu_background_image = pygame_menu.BaseImage(SETTINGS_MENU_BACKGROUND_IMAGE)
-store_menu_background_image = pygame_menu.BaseImage(STORE_MENU_BACKGROUND_IMAGE)
-pause_menu_background_image = pygame_menu.BaseImage(PAUSE_MENU_BACKGROUND_IMAGE)
-promote_pawn_menu_background_image = pygame_menu.BaseImage(PROMOTE_PAWN_BACKGROUND_IMAGE)
-game_over_menu_background_image = pygame_menu.BaseImage(GAME_OVER_BACKGROUND_IMAGE)
 [setattr(menu_theme, attr, value) for attr, value in theme_extension.items()] # Apply the theme extension.
 
+# The background image of each menu (loaded the first time the menu is drawn, see `get_menu_background`).
+MENU_BACKGROUND_IMAGES = {
+    'main': MAIN_MENU_BACKGROUND_IMAGE,
+    'settings': SETTINGS_MENU_BACKGROUND_IMAGE,
+    'store': STORE_MENU_BACKGROUND_IMAGE,
+    'pause': PAUSE_MENU_BACKGROUND_IMAGE,
+    'promote_pawn': PROMOTE_PAWN_BACKGROUND_IMAGE,
+    'game_over': GAME_OVER_BACKGROUND_IMAGE,
+}
+menu_backgrounds = {} # (menu type, surface size) -> background image, scaled to the surface
+menus = {} # (name, surface size) -> menu (built the first time it is opened, see `get_menu`)
+
+def get_menu_background(menu_type, size):
+    ''' Returns the background image of a menu, scaled to `size` (loaded and scaled once, then cached), or None if the menu has none. '''
+    key = (menu_type, size)
+    if key not in menu_backgrounds:
+        path = MENU_BACKGROUND_IMAGES.get(menu_type)
+        image = pygame.image.load(path) if path else None
+        if image is not None:
+            image = pygame.transform.smoothscale(image, size)
+            # (Convert the image to the pixel format of the display once, so it isn't converted every time it is drawn.)
+            if pygame.display.get_surface() is not None: image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+        menu_backgrounds[key] = image
+    return menu_backgrounds[key]
+
 def draw_main_menu_background(surface, menu_type='main'):
-    if menu_type == 'main': main_menu_background_image.draw(surface)
-    elif menu_type == 'settings': settings_menu_background_image.draw(surface)
-    elif menu_type == 'store': store_menu_background_image.draw(surface)
-    elif menu_type == 'pause': pause_menu_background_image.draw(surface)
-    elif menu_type == 'promote_pawn': promote_pawn_menu_background_image.draw(surface)
-    elif menu_type == 'game_over': game_over_menu_background_image.draw(surface)
-        
-    # TODO: Draw a 3D rotating chessboard with a skybox instead.
\ No newline at end of file
+    # (With `MAIN_MENU_3D_BACKGROUND`, the menus outside of a game show the 3D chessboard and its skybox, orbited by the camera, instead, see `present_menu`.)
+    if MAIN_MENU_3D_BACKGROUND and menu_type in ('main', 'settings', 'store', 'credits'): return
+    background = get_menu_background(menu_type, surface.get_size())
+    if background is not None: surface.blit(background, (0, 0))
+
+def run_menu(menu, surface, menu_type='main'):
+    '''
+    Runs a menu until it is disabled (like `menu.mainloop`, which flips the display itself): the menu is drawn into `surface`
+    (see `graphics.graphics_3d.open_menu_surface`), which is then drawn over the 3D scene, in the window's OpenGL context.
+    '''
+    clock = pygame.time.Clock()
+    while menu.is_enabled():
+        delta_time = clock.tick(menu_theme.fps) / 1000
+        surface.fill((0, 0, 0, 0))
+        draw_main_menu_background(surface, menu_type)
+        menu.draw(surface)
+        menu.update(pygame.event.get())
+        present_menu(delta_time)
+
+def get_menu(name, surface, build_menu):
+    '''
+    Returns the menu `name` for the size of `surface`: it is built (by `build_menu(width, height)`) the first time it is opened,
+    then re-shown (the caller updates its values, e.g. from the current game).
+    '''
+    key = (name, surface.get_size())
+    if key not in menus: menus[key] = build_menu(*key[1])
+    menu = menus[key]
+    menu.enable()
+    return menu
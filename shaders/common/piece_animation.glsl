@@ -0,0 +1,61 @@
+// Piece animations (see `PieceAnimationTable`): the table is written once per move, and every piece is animated here from the frame's `time`.
+// (Included after the `FrameData` block, by the shaders that draw the pieces.)
+#define PIECE_ANIMATION_ARC 0
+#define PIECE_ANIMATION_SLIDE 1
+
+layout (std140) uniform PieceAnimations {
+    vec4 animationStarts[MAX_PIECE_ANIMATIONS]; // xyz: start position (board units), w: start time (seconds)
+    vec4 animationEnds[MAX_PIECE_ANIMATIONS];   // xyz: end position (board units), w: duration (seconds)
+    vec4 animationCurves[MAX_PIECE_ANIMATIONS]; // x: curve id (see `PIECE_ANIMATION_CURVES`)
+    float animationMaxHeight;                   // board units
+    float animationShakeIntensity;              // board units
+};
+
+uniform int animationSlot; // The slot of the piece's animation + 1 (0 := the piece isn't animated).
+
+float ease_in_out(float t) {
+    if (t < 0.5) return 4.0 * t * t * t;
+    float f = 2.0 * t - 2.0;
+    return 0.5 * f * f * f + 1.0;
+}
+
+// A horizontal shake of up to `intensity` in each direction (pseudo-random: it changes every frame).
+vec3 calc_shake(float intensity) {
+    vec2 noise = fract(sin(vec2(time * 12.9898, time * 78.233) + float(animationSlot)) * 43758.5453) * 2.0 - 1.0;
+    return vec3(noise.x, 0.0, noise.y) * intensity;
+}
+
+// Returns the position (board units) of the piece animated by slot `i`, at `progress` (0 to 1) through its animation.
+vec3 calc_animated_position(int i, float progress) {
+    vec3 start_position = animationStarts[i].xyz;
+    vec3 end_position = animationEnds[i].xyz;
+    if (int(animationCurves[i].x) == PIECE_ANIMATION_SLIDE) return mix(start_position, end_position, ease_in_out(progress));
+
+    // Arc: lift the piece (shaking it at the top), carry it over the board, then put it down (shaking it as it starts to descend).
+    const float ascend_proportion = 0.25, move_proportion = 0.5, descend_proportion = 0.25;
+    if (progress < ascend_proportion) {
+        vec3 position = vec3(start_position.x, ease_in_out(progress / ascend_proportion) * animationMaxHeight, start_position.z);
+        if (progress > ascend_proportion * 0.7)
+            position += calc_shake(ease_in_out((progress - ascend_proportion * 0.7) / (ascend_proportion * 0.3)) * animationShakeIntensity);
+        return position;
+    }
+    if (progress < ascend_proportion + move_proportion) {
+        vec3 horizontal_position = mix(start_position, end_position, ease_in_out(ease_in_out((progress - ascend_proportion) / move_proportion)));
+        return vec3(horizontal_position.x, animationMaxHeight, horizontal_position.z);
+    }
+    float descend_progress = progress - ascend_proportion - move_proportion;
+    vec3 position = vec3(end_position.x, animationMaxHeight * (1.0 - ease_in_out(descend_progress / descend_proportion)), end_position.z);
+    if (descend_progress < descend_proportion * 0.3)
+        position += calc_shake(ease_in_out(descend_progress / (descend_proportion * 0.3)) * animationShakeIntensity);
+    return position;
+}
+
+// Returns the world-space offset of the piece from its square (the end of its animation), given its model matrix.
+// (The pieces are scaled uniformly after they are placed on their square, see `PieceTransformBatch`, so a position offset is scaled by the length of a basis vector.)
+vec3 calc_piece_animation_offset(mat4 piece_model_matrix) {
+    if (animationSlot == 0) return vec3(0.0);
+    int i = animationSlot - 1;
+    float progress = (time - animationStarts[i].w) / animationEnds[i].w;
+    if (progress >= 1.0) return vec3(0.0);
+    return (calc_animated_position(i, max(progress, 0.0)) - animationEnds[i].xyz) * length(piece_model_matrix[0].xyz);
+}
@@ -1,10 +1,11 @@
 #version 330 core
 
 in vec2 fragUV;
-uniform sampler2D tex2D; // Texture for HUD elements
+in vec4 fragColor;
+uniform sampler2D glyphAtlas; // Coverage of each glyph (single channel)
 
 out vec4 outColor;
 
 void main() {
-    outColor = texture(tex2D, fragUV);
+    outColor = vec4(fragColor.rgb, fragColor.a * texture(glyphAtlas, fragUV).r);
 }
@@ -1,15 +1,17 @@
 #version 330 core
 
-layout (location = 0) in vec3 position;
-layout (location = 1) in vec3 normal;
-layout (location = 2) in vec2 uv;
+// Screen-space text (see `TextRenderer`): the glyph quads are laid out in pixels, from the top-left corner of the viewport.
+layout (location = 0) in vec2 position;
+layout (location = 1) in vec2 uv;
+layout (location = 2) in vec4 color;
 
-uniform mat4 model_matrix;
-uniform mat4 projection_matrix; // Only model and projection matrices
+uniform vec2 viewport_size; // px
 
 out vec2 fragUV;
+out vec4 fragColor;
 
 void main() {
-    gl_Position = projection_matrix * model_matrix * vec4(position, 1.0);
+    gl_Position = vec4(position / viewport_size * vec2(2.0, -2.0) + vec2(-1.0, 1.0), 0.0, 1.0);
     fragUV = uv;
+    fragColor = color;
 }
@@ -7,14 +7,31 @@ in vec4 fragPosLightSpace;
 // in vec4 gl_FragCoord;
 // in vec2 screen_pos;
 
-uniform vec3 eye_pos;
-uniform sampler2D tex2D;
+// Per-frame data (shared by every program, uploaded once per frame).
+layout (std140) uniform FrameData {
+    mat4 view_matrix;
+    mat4 projection_matrix;
+    mat4 light_view_mat;
+    mat4 light_projection_mat;
+    vec3 eye_pos;
+    float time;
+    vec3 lightPos;
+};
+
+uniform sampler2DArray texArray; // Every skin of the object (see `TextureArray`)
+uniform int textureLayer;        // Layer of the object's skin in `texArray`
 uniform samplerCube cubeMapTex;
 uniform sampler2D depthTex;  // depth texture bound to texture unit 0
 uniform bool isGlowing;
 uniform vec3 glowColor;
-uniform float time;
-uniform vec3 lightPos;
+
+#ifdef BOARD_HIGHLIGHTS
+// Highlighted squares of the board (the board variant of the program draws them, instead of a quad per square).
+uniform usampler2D highlightMask;               // 8x8 mask: the highlight of each square (0 := none, 1 := highlightColors[0], ...)
+uniform vec3 highlightColors[N_HIGHLIGHT_COLORS];
+uniform mat4 highlight_grid_matrix;             // World space -> board grid space (square (row, col) spans [col, col + 1] x [row, row + 1] in x and z)
+uniform float highlightSize;                    // Fraction of a square covered by its highlight
+#endif
 
 out vec4 outColor;
 
@@ -25,7 +42,18 @@ void main() {
     vec3 R = reflect(-V, N);
     
     // Sample color from 2D texture and cube map.
-    vec3 color_tex = texture(tex2D, fragUV).rgb;
+    vec3 color_tex = texture(texArray, vec3(fragUV, textureLayer)).rgb;
+
+#ifdef BOARD_HIGHLIGHTS
+    // Replace the color of the (top of the) board under a highlighted square.
+    vec3 grid_pos = (highlight_grid_matrix * vec4(frag_pos, 1.0)).xyz;
+    ivec2 square = ivec2(floor(grid_pos.xz));
+    if (N.y > 0.5 && all(greaterThanEqual(square, ivec2(0))) && all(lessThan(square, ivec2(8)))) {
+        uint highlight = texelFetch(highlightMask, square, 0).r;
+        vec2 offset = abs(fract(grid_pos.xz) - 0.5);
+        if (highlight > 0u && max(offset.x, offset.y) <= 0.5 * highlightSize) color_tex = highlightColors[highlight - 1u];
+    }
+#endif
     vec3 envColor = texture(cubeMapTex, R).rgb;
 
     if (isGlowing) {
@@ -4,13 +4,23 @@ layout (location = 0) in vec3 position;
 layout (location = 1) in vec3 normal;
 layout (location = 2) in vec2 uv;
 
-uniform mat4 model_matrix;
-uniform mat4 view_matrix;
-uniform mat4 projection_matrix;
-
+// Per-frame data (shared by every program, uploaded once per frame).
+layout (std140) uniform FrameData {
+    mat4 view_matrix;
+    mat4 projection_matrix;
+    mat4 light_view_mat;
+    mat4 light_projection_mat;
+    vec3 eye_pos;
+    float time;
+    vec3 lightPos;
+};
+
+#include "../common/piece_animation.glsl"
 
-uniform mat4 light_projection_mat;
-uniform mat4 light_view_mat;
+uniform mat4 model_matrix;
+#ifndef RIGID_TRANSFORMS
+uniform mat3 normal_matrix; // The transpose of the inverse of the model matrix (computed once per object on the CPU).
+#endif
 
 out vec3 frag_pos;
 out vec3 fragNormal;
@@ -19,8 +29,9 @@ out vec4 fragPosLightSpace;
 // out vec2 screen_pos;
 
 void main() {
-    // Transform the position from object space to world space using the model matrix
+    // Transform the position from object space to world space using the model matrix (then move the piece along its animation, if any).
     vec4 world_pos = model_matrix * vec4(position, 1.0);
+    world_pos.xyz += calc_piece_animation_offset(model_matrix);
     frag_pos = world_pos.xyz;
 
     // Transform the position from world space to the clip coordinates
@@ -31,8 +42,12 @@ void main() {
     // screen_pos = ndc.xy * 0.5 + 0.5;
 
     // For normal attribute, transform the normal of the vertex by using the transpose of the inverse of the model matrix.
-    mat4 normal_matrix = transpose(inverse(model_matrix));
-    vec3 new_normal = (normal_matrix * vec4(normal, 0)).xyz;
+#ifdef RIGID_TRANSFORMS
+    // (Rotations, translations and uniform scales don't skew the normals, so the model matrix can be used as is: the normal is normalized anyway.)
+    vec3 new_normal = mat3(model_matrix) * normal;
+#else
+    vec3 new_normal = normal_matrix * normal;
+#endif
     fragNormal = normalize(new_normal);
 
     fragUV = uv;
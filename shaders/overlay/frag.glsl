@@ -0,0 +1,10 @@
+#version 330 core
+
+in vec2 fragUV;
+uniform sampler2D tex2D; // Pre-rendered text (with a translucent background)
+
+out vec4 outColor;
+
+void main() {
+    outColor = texture(tex2D, fragUV);
+}
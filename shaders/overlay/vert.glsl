@@ -0,0 +1,12 @@
+#version 330 core
+
+// Screen-space quad: the corners are generated from the vertex index (drawn as a triangle strip of 4 vertices, without a vertex buffer).
+uniform vec4 rect; // x, y, width, height (in normalized device coordinates, from the bottom-left corner)
+
+out vec2 fragUV;
+
+void main() {
+    vec2 corner = vec2(gl_VertexID & 1, gl_VertexID >> 1);
+    fragUV = corner;
+    gl_Position = vec4(rect.xy + corner * rect.zw, 0.0, 1.0);
+}
@@ -5,10 +5,24 @@ layout (location = 0) in vec3 position;    // we can also use layout to specify
 layout (location = 1) in vec2 uv;
 layout (location = 2) in vec3 normal;
 
+// Per-frame data (shared by every program, uploaded once per frame).
+layout (std140) uniform FrameData {
+    mat4 view_matrix;
+    mat4 projection_matrix;
+    mat4 light_view_mat;
+    mat4 light_projection_mat;
+    vec3 eye_pos;
+    float time;
+    vec3 lightPos;
+};
+
+#include "../common/piece_animation.glsl"
+
 uniform mat4 modelMatrix;
-uniform mat4 viewMatrix;
-uniform mat4 projectionMatrix;
 
 void main() {
-    gl_Position =  projectionMatrix * viewMatrix * modelMatrix * vec4(position, 1.0);
+    // Render the scene from the light's point of view.
+    vec4 world_pos = modelMatrix * vec4(position, 1.0);
+    world_pos.xyz += calc_piece_animation_offset(modelMatrix);
+    gl_Position =  light_projection_mat * light_view_mat * world_pos;
 }
\ No newline at end of file
@@ -1,7 +1,18 @@
 # Third-party imports.
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import threading
 from OpenGL.GL import *
 import pygame as pg
 
+# Define the faces of the cubemap (in the order OpenGL expects them).
+CUBEMAP_FACE_NAMES = ["right", "left", "top", "bottom", "front", "back"]
+CUBEMAP_FACE_TARGETS = [GL_TEXTURE_CUBE_MAP_POSITIVE_X, GL_TEXTURE_CUBE_MAP_NEGATIVE_X,
+                        GL_TEXTURE_CUBE_MAP_POSITIVE_Y, GL_TEXTURE_CUBE_MAP_NEGATIVE_Y,
+                        GL_TEXTURE_CUBE_MAP_POSITIVE_Z, GL_TEXTURE_CUBE_MAP_NEGATIVE_Z]
+
 def load_image(filename, format="RGB", flip=False):
     img = pg.image.load(filename)
     img_data = pg.image.tobytes(img, format, flip)
@@ -24,16 +35,10 @@ def load_cubemap_textures(filenames):
     glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_NEAREST)
     glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
 
-
-    # Define the faces of the cubemap
-    faces = [GL_TEXTURE_CUBE_MAP_POSITIVE_X, GL_TEXTURE_CUBE_MAP_NEGATIVE_X,
-             GL_TEXTURE_CUBE_MAP_POSITIVE_Y, GL_TEXTURE_CUBE_MAP_NEGATIVE_Y,
-             GL_TEXTURE_CUBE_MAP_POSITIVE_Z, GL_TEXTURE_CUBE_MAP_NEGATIVE_Z]
-
     # Load and bind images to the corresponding faces
     for i in range(6):
         img_data, img_w, img_h = load_image(filenames[i], format="RGB", flip=False)
-        glTexImage2D(faces[i], 0, GL_RGB, img_w, img_h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
+        glTexImage2D(CUBEMAP_FACE_TARGETS[i], 0, GL_RGB, img_w, img_h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
 
     # Generate mipmaps
     glGenerateMipmap(GL_TEXTURE_CUBE_MAP)
@@ -41,4 +46,178 @@ def load_cubemap_textures(filenames):
     # Unbind the texture
     glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
 
-    return texture_id
\ No newline at end of file
+    return texture_id
+
+# ~ Cubemap streaming
+def calc_max_cubemap_face_size(vram_budget_mb, bytes_per_pixel=3):
+    ''' Returns the largest face size (in px) whose 6 faces (plus a full mipmap chain, i.e. ~4/3 of the base level) fit in the given VRAM budget. '''
+    budget_bytes = vram_budget_mb * 1024 * 1024
+    return int(math.sqrt(budget_bytes / (6 * bytes_per_pixel * 4 / 3)))
+
+def create_cubemap_texture(faces=None, placeholder_color=(0, 0, 0)):
+    '''
+    Creates a cubemap texture from decoded faces (see `decode_cubemap_faces`).
+    If no faces are given, a 1x1 placeholder cubemap of the given color is created instead.
+    '''
+    texture_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_CUBE_MAP, texture_id)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_NEAREST)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    if faces is None:
+        pixel = bytes(int(channel * 255) for channel in placeholder_color)
+        faces = [[(pixel, 1, 1)] for _ in CUBEMAP_FACE_TARGETS]
+    for face_index in range(6): upload_cubemap_face(texture_id, faces, face_index)
+
+    glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+    return texture_id
+
+def upload_cubemap_face(texture_id, faces, face_index):
+    ''' Uploads one face (and its precomputed mipmap chain) of `faces` into the given cubemap texture. '''
+    glBindTexture(GL_TEXTURE_CUBE_MAP, texture_id)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, (img_data, img_w, img_h) in enumerate(faces[face_index]):
+        glTexImage2D(CUBEMAP_FACE_TARGETS[face_index], level, GL_RGB, img_w, img_h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
+    glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAX_LEVEL, len(faces[face_index]) - 1)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+
+def decode_cubemap_faces(path, max_face_size=None, preview_path=None, preview_face_size=None):
+    '''
+    Decodes the 6 faces of the skybox at `path` (CPU only, so it is safe to call from a worker thread).
+
+    Each face is capped to `max_face_size` and comes with its full mipmap chain, so the main thread only has to upload it:
+        faces = [ [(level_0_bytes, w, h), (level_1_bytes, w/2, h/2), ..., (level_n_bytes, 1, 1)],  # right (+X)
+                  ... ]                                                                               # left, top, bottom, front, back
+
+    If `preview_path` is given, a low-resolution copy of every face is also written there (see `load_cubemap_preview`).
+    '''
+    surfaces = []
+    for face_name in CUBEMAP_FACE_NAMES:
+        filename = f"{path}/{face_name}.png"
+        if os.path.exists(filename): surfaces.append(load_rgb_surface(filename))
+        else:
+            print(f"Missing skybox face: {filename} (using a blank face instead).")
+            surfaces.append(None)
+
+    # Replace missing faces with a solid face of the average color of the other faces.
+    loaded_surfaces = [surface for surface in surfaces if surface is not None]
+    if not loaded_surfaces: raise FileNotFoundError(f"No skybox faces found in: {path}")
+    average_color = pg.transform.average_color(loaded_surfaces[0])[:3]
+    for i, surface in enumerate(surfaces):
+        if surface is None:
+            surfaces[i] = pg.Surface(loaded_surfaces[0].get_size(), depth=24)
+            surfaces[i].fill(average_color)
+
+    faces = []
+    for surface in surfaces:
+        # Cap the face resolution (to stay within the VRAM budget).
+        face_size = surface.get_width()
+        if max_face_size and face_size > max_face_size:
+            face_size = max_face_size
+            surface = pg.transform.smoothscale(surface, (face_size, face_size))
+        faces.append(build_mipmap_chain(surface))
+
+    if preview_path and preview_face_size: save_cubemap_preview(surfaces, preview_path, preview_face_size)
+    return faces
+
+def load_rgb_surface(filename):
+    ''' Loads an image as a 24-bit surface (`smoothscale` only supports 24/32-bit surfaces, e.g. not paletted PNGs). '''
+    surface = pg.image.load(filename)
+    if surface.get_bitsize() in (24, 32): return surface
+    rgb_surface = pg.Surface(surface.get_size(), depth=24)
+    rgb_surface.blit(surface, (0, 0))
+    return rgb_surface
+
+def build_mipmap_chain(surface):
+    ''' Builds the mipmap chain of a surface on the CPU (so `glGenerateMipmap` doesn't stall the main thread). '''
+    levels = []
+    while True:
+        w, h = surface.get_size()
+        levels.append((pg.image.tobytes(surface, "RGB", False), w, h))
+        if w == 1 and h == 1: break
+        surface = pg.transform.smoothscale(surface, (max(1, w // 2), max(1, h // 2)))
+    return levels
+
+def save_cubemap_preview(surfaces, preview_path, preview_face_size):
+    os.makedirs(preview_path, exist_ok=True)
+    for face_name, surface in zip(CUBEMAP_FACE_NAMES, surfaces):
+        preview = pg.transform.smoothscale(surface, (preview_face_size, preview_face_size))
+        pg.image.save(preview, f"{preview_path}/{face_name}.png")
+
+def has_cubemap_preview(preview_path):
+    ''' Returns whether the low-resolution faces written by `decode_cubemap_faces` exist (without loading them). '''
+    return all(os.path.exists(f"{preview_path}/{face_name}.png") for face_name in CUBEMAP_FACE_NAMES)
+
+def load_cubemap_preview(preview_path):
+    ''' Loads the low-resolution faces written by `decode_cubemap_faces` (returns None if they don't exist yet). '''
+    if not has_cubemap_preview(preview_path): return None
+    return [build_mipmap_chain(load_rgb_surface(f"{preview_path}/{face_name}.png")) for face_name in CUBEMAP_FACE_NAMES]
+
+class CubemapStreamer:
+    def __init__(self, max_face_size=None, preview_face_size=64, cache_dir=None, max_cached_sets=2):
+        '''
+        This CubemapStreamer class decodes skybox faces on a background thread.
+
+        The render loop asks for a skybox with `request(path)`, shows its low-resolution preview right away
+        and polls `get_faces(path)` every frame until the full-resolution faces are ready to be uploaded.
+        Decoded skyboxes are kept in a small LRU cache, so `preload(path)` can be used to decode
+        a skybox before it is needed (e.g. while the user is browsing environments in the store).
+
+        :param max_face_size:       cap (in px) for the full-resolution faces (see `calc_max_cubemap_face_size`)
+        :param preview_face_size:   size (in px) of the low-resolution faces shown while streaming
+        :param cache_dir:           directory where the low-resolution faces are stored between runs
+        :param max_cached_sets:     number of decoded skyboxes kept in memory
+        '''
+        self.max_face_size = max_face_size
+        self.preview_face_size = preview_face_size
+        self.cache_dir = cache_dir
+        self.max_cached_sets = max_cached_sets
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cubemap-streamer")
+        self.lock = threading.Lock()
+        self.decoded = OrderedDict() # path -> Future (resolving to the decoded faces)
+        self.streaming_path = None # The skybox last requested (never evicted from the cache, see `preload`).
+
+    def get_preview_path(self, path):
+        if not self.cache_dir: return None
+        return os.path.join(self.cache_dir, "skybox", os.path.basename(os.path.normpath(path)), str(self.preview_face_size))
+
+    def preload(self, path):
+        ''' Starts decoding the skybox at `path` in the background (no-op if it is already decoded or decoding). '''
+        with self.lock:
+            if path in self.decoded:
+                self.decoded.move_to_end(path)
+                return self.decoded[path]
+
+            preview_path = self.get_preview_path(path)
+            if preview_path and has_cubemap_preview(preview_path): preview_path = None # (The preview is already cached on disk.)
+            future = self.executor.submit(decode_cubemap_faces, path, self.max_face_size, preview_path, self.preview_face_size)
+            self.decoded[path] = future
+
+            # Evict the least recently used skyboxes (but not the one being streamed: it is still waited for, see `get_faces`).
+            evicted_paths = [cached_path for cached_path in self.decoded if cached_path != self.streaming_path]
+            for evicted_path in evicted_paths[:max(0, len(self.decoded) - self.max_cached_sets)]: del self.decoded[evicted_path]
+            return future
+
+    def request(self, path):
+        ''' Starts streaming the skybox at `path` and returns its low-resolution preview faces (or None if there is no preview yet). '''
+        with self.lock: self.streaming_path = path
+        self.preload(path)
+        preview_path = self.get_preview_path(path)
+        return load_cubemap_preview(preview_path) if preview_path else None
+
+    def get_faces(self, path):
+        '''
+        Returns the full-resolution faces of the skybox at `path` if they are done decoding (None otherwise).
+        Raises the decoding's exception if it failed (the skybox is dropped from the cache, so a later request tries again).
+        '''
+        with self.lock: future = self.decoded.get(path)
+        if future is None: future = self.preload(path) # (E.g. it was evicted while another skybox was being streamed.)
+        if not future.done(): return None
+        if future.exception():
+            with self.lock: self.decoded.pop(path, None)
+            raise future.exception()
+        return future.result()
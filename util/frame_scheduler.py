@@ -0,0 +1,58 @@
+# Third-party imports.
+import time
+import pygame
+
+class FrameScheduler:
+    def __init__(self, frame_rate, pulse_frame_rate, idle_frame_rate, max_delta_time):
+        '''
+        This FrameScheduler class decides when the game loop re-renders the scene (render on demand), instead of every iteration.
+
+        - Something changed (input, a timer event, an engine move, see `request_redraw`) or something moves (e.g. an animation):
+          the scene is re-rendered as soon as possible, up to `frame_rate`.
+        - Only the glow of the king pulses: the scene is re-rendered at `pulse_frame_rate` (the pulse is slow, so this looks the same).
+        - Otherwise, nothing is re-rendered: the loop only wakes up at `idle_frame_rate` to poll.
+
+        Between two frames, `wait` sleeps in short steps until the next frame is due, but wakes up as soon as an event arrives
+        (so the input latency stays low without busy-waiting).
+
+        :param frame_rate:          max FPS while something changes or moves
+        :param pulse_frame_rate:    FPS while only the glow pulses
+        :param idle_frame_rate:     how often the loop wakes up to poll while nothing changes (nothing is rendered)
+        :param max_delta_time:      max time step (in seconds) passed to the animations after an idle period
+        '''
+        self.frame_intervals = { "active": 1 / frame_rate, "pulse": 1 / pulse_frame_rate, "idle": 1 / idle_frame_rate }
+        self.max_delta_time = max_delta_time
+        self.is_dirty = True
+        self.last_frame_time = time.perf_counter()
+        self.last_wake_time = self.last_frame_time
+
+    def request_redraw(self):
+        self.is_dirty = True
+
+    def get_mode(self, is_animating, is_pulsing):
+        if self.is_dirty or is_animating: return "active"
+        return "pulse" if is_pulsing else "idle"
+
+    def wait(self, is_animating, is_pulsing, sleep_step=0.002):
+        ''' Sleeps until the next frame is due (see `get_mode`), or until an event arrives. '''
+        mode = self.get_mode(is_animating, is_pulsing)
+        deadline = (self.last_wake_time if mode == "idle" else self.last_frame_time) + self.frame_intervals[mode]
+        while not pygame.event.peek():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0: break
+            time.sleep(min(remaining, sleep_step))
+        self.last_wake_time = time.perf_counter()
+
+    def begin_frame(self, is_animating, is_pulsing):
+        '''
+        Returns the time step (in seconds) since the last rendered frame if the scene should be re-rendered now,
+        or None (nothing changed, or the frame rate cap for the current mode isn't reached yet).
+        '''
+        mode = self.get_mode(is_animating, is_pulsing)
+        now = time.perf_counter()
+        if mode == "idle" or now - self.last_frame_time < self.frame_intervals[mode]: return None
+
+        delta_time = min(now - self.last_frame_time, self.max_delta_time)
+        self.last_frame_time = now
+        self.is_dirty = False
+        return delta_time
@@ -1,5 +1,6 @@
 # Third-party imports.
 import tkinter as tk
+import _tkinter
 
 # Local application imports.
 from constants import WINDOW, ENABLE_GUI, GUI_WIDTH, GUI_HEIGHT
@@ -30,6 +31,8 @@ def __SimpleGUI__show(self):
 SimpleGUI.widgets = {}
 SimpleGUI.game_state = {
     "whos_turn": None,
+    "status": None,
+    "last_move": None,
 }
 SimpleGUI.add_text = __SimpleGUI__add_text
 SimpleGUI.hide = __SimpleGUI__hide
@@ -37,47 +40,70 @@ SimpleGUI.show = __SimpleGUI__show
 
 def setup_gui(game: ChessGame):
     gui = SimpleGUI("")
+    gui.widgets = {} # (Each gui has its own widgets and state: one is created per session, see `gameplay_setup`.)
+    gui.game_state = dict.fromkeys(SimpleGUI.game_state)
+    gui.pending_events = []
+    gui.is_geometry_dirty = True
     gui.hide()
     resize_gui(gui)
     return gui
 
 def prepare_gui(gui, game: ChessGame):
-    auto_position_gui(gui)
+    # (Called again when the game resumes from a menu: the widgets are only created once.)
+    if not gui.widgets:
+        # Add a plaintext title drawn to the top of the gui with a padding of 20 pixels.
+        gui.add_text("title", "3D Chess HUD", font=("Helvetica", 16, "bold"), anchor="n", pady=20)
+        
+        # Add labels to placehold the current turn, check and the last move.
+        gui.add_text("whos_turn", "Turn: ", font=("Helvetica", 12, "bold"), anchor="w", pady=5)
+        gui.add_text("status", "", font=("Helvetica", 12, "bold"), fg="red", anchor="w", pady=5)
+        gui.add_text("last_move", "", font=("Helvetica", 12), anchor="w", pady=5)
+        
+        # The window's geometry is only checked again after Tk reports that it changed (it was moved, resized, or shown).
+        gui.root.bind("<Configure>", lambda event: mark_gui_geometry_dirty(gui))
     
-    # Add a plaintext title drawn to the top of the gui with a padding of 20 pixels.
-    gui.add_text("title", "3D Chess HUD", font=("Helvetica", 16, "bold"), anchor="n", pady=20)
+    post_gui_event(gui, "game_state_changed")
+    gui.is_geometry_dirty = True
+    if ENABLE_GUI: gui.show()
+    else: gui.hide()
+
+def mark_gui_geometry_dirty(gui):
+    gui.is_geometry_dirty = True
+
+def post_gui_event(gui, event):
+    ''' Tells the gui that the game state changed (e.g. "move_made", "game_reset"): it's only updated on the next `update_gui` after an event. '''
+    if gui and ENABLE_GUI and event not in gui.pending_events: gui.pending_events.append(event)
+
+def update_gui(gui, game: ChessGame):
+    ''' Processes the gui's pending events: Tk's own (e.g. redraws), the geometry changes and the game state changes (nothing else is polled). '''
+    if not ENABLE_GUI: return
     
-    # Add a label to placehold the current turn.
-    gui.add_text("whos_turn", "Turn: ", font=("Helvetica", 12, "bold"), anchor="w", pady=5)
+    # Let Tk handle its events (without blocking, i.e. nothing happens if there are none).
+    while gui.root.tk.dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT): pass
     
-def update_gui(gui, game: ChessGame):
-    # If the gui is hidden, show it.
-    if not gui.root.winfo_viewable() and ENABLE_GUI:
-        gui.show()
-    elif not ENABLE_GUI:
-        gui.hide()
-        return
-        
-    # If the gui is not the correct size, resize it.
-    if gui.root.winfo_width() != GUI_WIDTH or gui.root.winfo_height() != GUI_HEIGHT:
-        resize_gui(gui)
-        
-    # If the gui is not in the correct position, reposition it.
-    x, y = calc_gui_position(gui)
-    if gui.root.winfo_x() != x or gui.root.winfo_y() != y:
-        auto_position_gui(gui)
+    # If the gui was resized or moved, restore its size and position.
+    if gui.is_geometry_dirty:
+        gui.is_geometry_dirty = False
+        if gui.root.winfo_width() != GUI_WIDTH or gui.root.winfo_height() != GUI_HEIGHT:
+            resize_gui(gui)
+        x, y = calc_gui_position(gui)
+        if gui.root.winfo_x() != x or gui.root.winfo_y() != y:
+            auto_position_gui(gui)
     
     # ~ Game state
-    # Display whose turn it is.
-    whos_turn = game.get_whos_turn()
-    if whos_turn != gui.game_state["whos_turn"]:
-        # Update the gui.
-        gui.game_state["whos_turn"] = whos_turn
-        gui.widgets["whos_turn"].config(text=f"Turn: {whos_turn.capitalize()}")
+    if not gui.pending_events: return
+    gui.pending_events.clear()
     
-    # Update the gui.
-    gui.root.update_idletasks()
-        
+    # Display whose turn it is, check and the last move (only the labels whose text changed are updated).
+    board = game.board
+    set_gui_text(gui, "whos_turn", f"Turn: {game.get_whos_turn().capitalize()}")
+    set_gui_text(gui, "status", "Check!" if board.is_check() else "")
+    set_gui_text(gui, "last_move", f"Last move: {board.peek().uci()}" if board.move_stack else "")
+
+def set_gui_text(gui, name, text):
+    if gui.game_state[name] == text: return
+    gui.game_state[name] = text
+    gui.widgets[name].config(text=text)
 
 def resize_gui(gui, width=GUI_WIDTH, height=GUI_HEIGHT):
     # 1. Set the width to 1px less than the desired width to force update the new dimensions (idk why, but this is a functioning workaround).
@@ -62,6 +62,13 @@ class ObjLoader:
 
         self.compute_model_extent(self.v)
 
+        self.bounds_min = None
+        self.bounds_max = None
+        self.bounds_center = None
+        self.bounds_radius = None
+
+        self.compute_bounding_volume(self.v)
+
 
         self.size_position = None
         self.size_texture = None
@@ -188,6 +195,19 @@ class ObjLoader:
         self.center = np.array([self.center[0], 0.0, self.center[1]]).astype('float32')  # Construct center with y as 0.0
 
 
+    def compute_bounding_volume(self, positions):
+        '''
+        Compute the 3D bounding box and bounding sphere of the model (e.g. for frustum culling).
+        (Unlike `compute_model_extent`, this considers all three components.)
+        :param positions: An (N, 3) array of positions
+        :return: None
+        '''
+        self.bounds_min = positions.min(axis=0)
+        self.bounds_max = positions.max(axis=0)
+        self.bounds_center = (self.bounds_min + self.bounds_max) / 2
+        self.bounds_radius = float(np.linalg.norm(positions - self.bounds_center, axis=1).max())
+
+
     def compute_properties_of_vertices(self):
         '''
         Compute the properties of the vertices
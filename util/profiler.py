@@ -0,0 +1,137 @@
+# Third-party imports.
+import csv
+import ctypes
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v # (The wrapped version can't return 64-bit results.)
+import numpy as np
+
+# Local application imports.
+from constants import PROFILER_MAX_SAMPLES
+
+class FrameProfiler:
+    def __init__(self, max_samples=None, gpu_query_latency=3):
+        '''
+        This FrameProfiler class times the passes of each frame (see `section`): on the CPU, and on the GPU with timer queries (`GL_TIME_ELAPSED`).
+
+        It is disabled by default, so the sections cost next to nothing in the game (the overlay and the headless benchmark enable it).
+        The GPU timings are read back `gpu_query_latency` frames later at most, and only once they are available (see `end_frame`),
+        so the queries never stall the pipeline. Timer queries can't nest, so a section inside another one is only timed on the CPU.
+        `sync` is called around each section when set (e.g. `glFinish`), so the CPU timings include the GPU work of the pass that issued it.
+
+        :param max_samples:         number of samples kept per section (i.e. a rolling window; None := every sample until `reset()`)
+        :param gpu_query_latency:   max number of frames the GPU timings can lag behind (they are dropped if not available by then)
+        '''
+        self.enabled = False
+        self.gpu_timers = False
+        self.sync = None
+        self.max_samples = max_samples
+        self.gpu_query_latency = gpu_query_latency
+        self.samples = {} # name -> durations on the CPU (in seconds)
+        self.gpu_samples = {} # name -> durations on the GPU (in seconds)
+        self.free_queries = []
+        self.frame_queries = [] # (name, query) of the current frame
+        self.pending_frames = deque() # (name, query) lists of the previous frames, oldest first
+        self.is_gpu_query_active = False
+
+    def reset(self):
+        self.samples = {}
+        self.gpu_samples = {}
+
+    @contextmanager
+    def section(self, name, gpu=True):
+        ''' Times the enclosed code as the section `name` (and on the GPU too, unless `gpu` is False: e.g. a section around other sections). '''
+        if not self.enabled:
+            yield
+            return
+
+        if self.sync: self.sync()
+        query = self.begin_gpu_query() if gpu and self.gpu_timers and not self.is_gpu_query_active else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.sync: self.sync()
+            self.record(self.samples, name, time.perf_counter() - start)
+            if query is not None:
+                glEndQuery(GL_TIME_ELAPSED)
+                self.is_gpu_query_active = False
+                self.frame_queries.append((name, query))
+
+    def begin_gpu_query(self):
+        if not self.free_queries: self.free_queries.extend(int(query) for query in np.atleast_1d(glGenQueries(8)))
+        query = self.free_queries.pop()
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        self.is_gpu_query_active = True
+        return query
+
+    def end_frame(self):
+        ''' Reads back the GPU timings of the previous frames that are available (call once per frame, after the last section). '''
+        if not self.frame_queries and not self.pending_frames: return
+        self.pending_frames.append(self.frame_queries)
+        self.frame_queries = []
+
+        # (The queries of a frame complete in order, so a frame is done once its last query is available.)
+        while self.pending_frames:
+            queries = self.pending_frames[0]
+            is_available = not queries or glGetQueryObjectiv(queries[-1][1], GL_QUERY_RESULT_AVAILABLE)
+            if not is_available and len(self.pending_frames) <= self.gpu_query_latency: break
+
+            self.pending_frames.popleft()
+            for name, query in queries:
+                if is_available:
+                    elapsed = ctypes.c_uint64()
+                    glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(elapsed))
+                    self.record(self.gpu_samples, name, elapsed.value / 1e9)
+                self.free_queries.append(query)
+
+    def record(self, samples, name, duration):
+        if name not in samples: samples[name] = deque(maxlen=self.max_samples)
+        samples[name].append(duration)
+
+    def summary(self):
+        ''' Returns the statistics (in ms, see `summarize`) of each section, in the order they were first recorded. '''
+        return { name: summarize(durations) for name, durations in self.samples.items() }
+
+    def gpu_summary(self):
+        return { name: summarize(durations) for name, durations in self.gpu_samples.items() }
+
+    def dump_json(self, path):
+        ''' Writes the statistics and every sample (in ms) of each section to a JSON file (for offline analysis). '''
+        with open(path, "w") as file:
+            json.dump({
+                "cpu": self.summary(),
+                "gpu": self.gpu_summary(),
+                "cpu_samples": { name: [duration * 1000 for duration in durations] for name, durations in self.samples.items() },
+                "gpu_samples": { name: [duration * 1000 for duration in durations] for name, durations in self.gpu_samples.items() },
+            }, file, indent=2)
+
+    def dump_csv(self, path):
+        ''' Writes the statistics (in ms) of each section to a CSV file: one row per section and timer (CPU or GPU). '''
+        columns = ["count", "mean", "median", "p95", "p99", "min", "max"]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["section", "timer"] + columns)
+            for timer, summary in (("cpu", self.summary()), ("gpu", self.gpu_summary())):
+                for name, stats in summary.items():
+                    writer.writerow([name, timer] + [stats.get(column, "") for column in columns])
+
+def summarize(durations):
+    ''' Returns the count, mean, median, 95th/99th percentile, min and max of a list of durations (in seconds), in ms. '''
+    ms = np.asarray(durations, dtype=np.float64) * 1000
+    if len(ms) == 0: return { "count": 0 }
+    return {
+        "count": len(ms),
+        "mean": float(ms.mean()),
+        "median": float(np.median(ms)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "min": float(ms.min()),
+        "max": float(ms.max()),
+    }
+
+# The profiler shared by the game loop, the renderer (see `graphics.graphics_3d.draw_graphics`) and the headless benchmark.
+profiler = FrameProfiler(max_samples=PROFILER_MAX_SAMPLES)
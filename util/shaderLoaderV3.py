@@ -1,69 +1,217 @@
+import os
+import re
 from OpenGL.GL import *
 import OpenGL.GL.shaders
 import numpy as np
 
 
-def load_shader(shader_file):
+def load_shader(shader_file, defines=None):
     shader_source = ""
     with open(shader_file) as f:
         shader_source = f.read()
     f.close()
+    shader_source = resolve_includes(shader_source, os.path.dirname(shader_file))
+    if defines: shader_source = inject_defines(shader_source, defines)
     return str.encode(shader_source)
 
 
-def compile_shader(vs, fs):
-    vert_shader = load_shader(vs)
-    frag_shader = load_shader(fs)
+def resolve_includes(shader_source, directory):
+    ''' Replace the `#include "path"` lines (relative to the including shader) with the contents of the file, e.g. GLSL shared by several shaders. '''
+    def include(match):
+        include_path = os.path.join(directory, match.group(1))
+        with open(include_path) as f:
+            return resolve_includes(f.read(), os.path.dirname(include_path))
+    return re.sub(r'^[ \t]*#include[ \t]+"([^"]+)"[ \t]*$', include, shader_source, flags=re.MULTILINE)
+
+
+def inject_defines(shader_source, defines):
+    ''' Insert `#define NAME VALUE` lines right after the `#version` line (which has to stay the first line of the shader). '''
+    define_lines = "".join(f"#define {name} {value}\n" for name, value in defines.items())
+    if shader_source.lstrip().startswith("#version"):
+        version_line, _, body = shader_source.lstrip().partition("\n")
+        return f"{version_line}\n{define_lines}{body}"
+    return define_lines + shader_source
+
+
+def compile_shader(vs, fs, defines=None):
+    vert_shader = load_shader(vs, defines)
+    frag_shader = load_shader(fs, defines)
 
     shader = OpenGL.GL.shaders.compileProgram(OpenGL.GL.shaders.compileShader(vert_shader, GL_VERTEX_SHADER),
                                               OpenGL.GL.shaders.compileShader(frag_shader, GL_FRAGMENT_SHADER), validate=False)
     return shader
 
 
+# Uniform setters (keyed by the uniform's GLSL type, as reported by `glGetActiveUniform`).
+# Each setter takes: (location, number of array elements, value).
+UNIFORM_SETTERS = {
+    GL_FLOAT: lambda location, count, value: glUniform1fv(location, count, np.asarray(value, dtype=np.float32)),
+    GL_FLOAT_VEC2: lambda location, count, value: glUniform2fv(location, count, np.asarray(value, dtype=np.float32)),
+    GL_FLOAT_VEC3: lambda location, count, value: glUniform3fv(location, count, np.asarray(value, dtype=np.float32)),
+    GL_FLOAT_VEC4: lambda location, count, value: glUniform4fv(location, count, np.asarray(value, dtype=np.float32)),
+    GL_INT: lambda location, count, value: glUniform1iv(location, count, np.asarray(value, dtype=np.int32)),
+    GL_BOOL: lambda location, count, value: glUniform1iv(location, count, np.asarray(value, dtype=np.int32)),
+    GL_FLOAT_MAT3: lambda location, count, value: glUniformMatrix3fv(location, count, GL_FALSE, np.asarray(value, dtype=np.float32)),
+    GL_FLOAT_MAT4: lambda location, count, value: glUniformMatrix4fv(location, count, GL_FALSE, np.asarray(value, dtype=np.float32)),
+}
+# (Samplers are set to the texture unit they read from.)
+for sampler_type in (GL_SAMPLER_2D, GL_SAMPLER_CUBE, GL_SAMPLER_2D_ARRAY, GL_SAMPLER_2D_SHADOW, GL_UNSIGNED_INT_SAMPLER_2D):
+    UNIFORM_SETTERS[sampler_type] = UNIFORM_SETTERS[GL_INT]
+
+# Number of components of each uniform type (used to work out how many array elements a value holds).
+UNIFORM_COMPONENTS = {
+    GL_FLOAT: 1, GL_FLOAT_VEC2: 2, GL_FLOAT_VEC3: 3, GL_FLOAT_VEC4: 4,
+    GL_INT: 1, GL_BOOL: 1, GL_FLOAT_MAT3: 9, GL_FLOAT_MAT4: 16,
+    GL_SAMPLER_2D: 1, GL_SAMPLER_CUBE: 1, GL_SAMPLER_2D_ARRAY: 1, GL_SAMPLER_2D_SHADOW: 1, GL_UNSIGNED_INT_SAMPLER_2D: 1,
+}
+
+
 class ShaderProgram:
+    # The program that is currently in use (so that redundant `glUseProgram` calls can be skipped).
+    active_program = None
+
+    def __init__(self, vs, fs, defines=None):
+        '''
+        :param vs:          path to the vertex shader
+        :param fs:          path to the fragment shader
+        :param defines:     preprocessor defines of this variant of the program, e.g. `{"RIGID_TRANSFORMS": 1}`
+        '''
+        self.defines = defines or {}
+        self.shader = compile_shader(vs, fs, self.defines)
+
+        self.uniforms = {}      # name -> (location, array size, GLSL type)
+        self.values = {}        # name -> last scalar value uploaded (to skip redundant uploads)
 
-    def __init__(self, vs, fs):
-        self.shader = compile_shader(vs, fs)
+        self.introspect_uniforms()
+
+    def introspect_uniforms(self):
+        '''
+        Query the active uniforms of the program once (at link time) and cache their locations and types.
+        Uniforms that live in a uniform block (see `UniformBuffer`) have no location and are skipped.
+        '''
+        for index in range(glGetProgramiv(self.shader, GL_ACTIVE_UNIFORMS)):
+            name, size, gl_type = glGetActiveUniform(self.shader, index)
+            name = name.decode() if isinstance(name, bytes) else name
+            if name.endswith("[0]"): name = name[:-3] # (Uniform arrays are reported as "name[0]".)
+
+            location = glGetUniformLocation(self.shader, name)
+            if location != -1: self.uniforms[name] = (location, int(size), int(gl_type))
+
+    def use(self):
+        if ShaderProgram.active_program != self.shader:
+            glUseProgram(self.shader)
+            ShaderProgram.active_program = self.shader
+
+    @staticmethod
+    def invalidate_active_program():
+        ''' Forget which program is in use (e.g. after the OpenGL context has been recreated). '''
+        ShaderProgram.active_program = None
+
+    def bind_uniform_block(self, block_name, binding_point):
+        ''' Read the uniform block `block_name` from the uniform buffer bound to `binding_point` (no-op if the program doesn't use the block). '''
+        block_index = glGetUniformBlockIndex(self.shader, block_name)
+        if block_index != GL_INVALID_INDEX: glUniformBlockBinding(self.shader, block_index, binding_point)
 
     def __getitem__(self, key):
-        return glGetUniformLocation(self.shader, key)
+        return self.uniforms[key][0] if key in self.uniforms else -1
 
     def __setitem__(self, key, value):
-        glUseProgram(self.shader)
-        location = self[key]
-
-        if location != -1:
-            if isinstance(value, (int, np.integer)):
-                glUniform1i(location, value)
-            elif isinstance(value, (float, np.floating)):
-                glUniform1f(location, value)
-            # for bool
-            elif isinstance(value, (bool, np.bool_)):
-                glUniform1i(location, value)
-            elif isinstance(value, (tuple, list)):
-                if len(value) == 3:
-                    glUniform3fv(location, 1, value)
-                elif len(value) == 4:
-                    glUniform4fv(location, 1, value)
-            elif isinstance(value, (np.ndarray, np.generic)):
-                if value.shape == (4, 4):
-                    glUniformMatrix4fv(location, 1, GL_FALSE, value)
-                elif value.shape == (3, 3):
-                    glUniformMatrix3fv(location, 1, GL_FALSE, value)
-                elif value.shape == (4,):
-                    glUniform4fv(location, 1, value)
-                elif value.shape == (3,):
-                    glUniform3fv(location, 1, value)
-                elif value.shape == (2,):
-                    glUniform2fv(location, 1, value)
-                elif value.shape == (1,):
-                    glUniform1fv(location, 1, value)
-                else:
-                    raise ValueError(f"Unsupported matrix shape: {value.shape}")
-            else:
-                raise ValueError(f"Unsupported value type: {type(value)}")
-                # Add more cases for different types of matrices if needed
-            # Add more cases for different uniform types if needed
+        uniform = self.uniforms.get(key)
+        if uniform is None: return # (The uniform doesn't exist or was optimized away by the compiler.)
+        location, size, gl_type = uniform
+
+        # Skip the upload if a scalar uniform (int, float, bool) already holds this value.
+        is_scalar = isinstance(value, (int, float, bool, np.integer, np.floating, np.bool_))
+        if is_scalar and key in self.values and self.values[key] == value: return
+
+        setter = UNIFORM_SETTERS.get(gl_type)
+        if setter is None: raise ValueError(f"Unsupported uniform type for '{key}': {gl_type}")
+
+        self.use()
+        count = min(size, max(1, np.size(value) // UNIFORM_COMPONENTS[gl_type]))
+        setter(location, count, value)
+        if is_scalar: self.values[key] = value
+
+
+class UniformBuffer:
+    def __init__(self, program: ShaderProgram, block_name, binding_point):
+        '''
+        This UniformBuffer class holds the data of a uniform block (UBO) that is shared by several shader programs,
+        e.g. the per-frame view, projection, eye and light data:
+
+            layout (std140) uniform FrameData {
+                mat4 view_matrix;
+                mat4 projection_matrix;
+                ...
+            };
+
+        The layout (size, offsets and types of the members) is introspected from `program`, values are written to a
+        CPU-side copy of the block with `uniform_buffer["name"] = value`, and `upload()` sends the whole block to the GPU
+        in a single call (typically once per frame). Every program that uses the block has to call
+        `bind_uniform_block(block_name, binding_point)`.
+
+        :param program:         a linked shader program that declares the uniform block
+        :param block_name:      the name of the uniform block
+        :param binding_point:   the uniform buffer binding point to attach the buffer to
+        '''
+        self.block_name = block_name
+        self.binding_point = binding_point
+        self.members = {}   # name -> (byte offset, GLSL type, matrix stride)
+
+        # Introspect the layout of the uniform block.
+        block_index = glGetUniformBlockIndex(program.shader, block_name)
+        if block_index == GL_INVALID_INDEX: raise ValueError(f"Uniform block not found: {block_name}")
+        param = np.zeros(1, dtype=np.int32)
+        glGetActiveUniformBlockiv(program.shader, block_index, GL_UNIFORM_BLOCK_DATA_SIZE, param)
+        size = int(param[0])
+        glGetActiveUniformBlockiv(program.shader, block_index, GL_UNIFORM_BLOCK_ACTIVE_UNIFORMS, param)
+        n_members = int(param[0])
+
+        indices = np.zeros(n_members, dtype=np.int32)
+        offsets, types, matrix_strides = np.zeros(n_members, dtype=np.int32), np.zeros(n_members, dtype=np.int32), np.zeros(n_members, dtype=np.int32)
+        glGetActiveUniformBlockiv(program.shader, block_index, GL_UNIFORM_BLOCK_ACTIVE_UNIFORM_INDICES, indices)
+        glGetActiveUniformsiv(program.shader, n_members, indices, GL_UNIFORM_OFFSET, offsets)
+        glGetActiveUniformsiv(program.shader, n_members, indices, GL_UNIFORM_TYPE, types)
+        glGetActiveUniformsiv(program.shader, n_members, indices, GL_UNIFORM_MATRIX_STRIDE, matrix_strides)
+        for index, offset, gl_type, matrix_stride in zip(indices, offsets, types, matrix_strides):
+            name = glGetActiveUniform(program.shader, int(index))[0]
+            name = name.decode() if isinstance(name, bytes) else name
+            if name.endswith("[0]"): name = name[:-3] # (Arrays are written as a whole, e.g. `vec4 values[N]` from an (N, 4) array: std140 pads their elements to a vec4.)
+            self.members[name] = (int(offset), int(gl_type), int(matrix_stride))
+
+        # Create the buffer (and its CPU-side copy) and attach it to the binding point.
+        self.data = np.zeros(size, dtype=np.uint8)
+        self.is_dirty = True
+        self.ubo = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferData(GL_UNIFORM_BUFFER, size, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        glBindBufferBase(GL_UNIFORM_BUFFER, binding_point, self.ubo)
+
+        program.bind_uniform_block(block_name, binding_point)
+
+    def __setitem__(self, key, value):
+        offset, gl_type, matrix_stride = self.members[key]
+        value = np.asarray(value, dtype=np.float32)
+
+        if gl_type == GL_FLOAT_MAT3: # (std140 pads each column of a mat3 to a vec4.)
+            for column in range(3):
+                self.data[offset + column * matrix_stride:offset + column * matrix_stride + 12] = value[column].view(np.uint8)
+        else:
+            value = value.ravel()
+            self.data[offset:offset + value.nbytes] = value.view(np.uint8)
+        self.is_dirty = True
+
+    def upload(self):
+        ''' Send the block to the GPU (only if any value changed since the last upload). '''
+        if not self.is_dirty: return
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, self.data.nbytes, self.data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        self.is_dirty = False
+
+    def delete(self):
+        glDeleteBuffers(1, [self.ubo])
 
 
 if __name__ == '__main__':
@@ -82,10 +230,11 @@ if __name__ == '__main__':
         shaderProgram["model"] = model_mat
         shaderProgram["intensity"] = 0.5
         
-    Every time you set a uniform variable, the shader program will be activated and the uniform variable will be set using the following three steps:
-        1. glUseProgram(shader)
-        2. location = glGetUniformLocation(shader, "uniform_name")
-        3. glUniform*(location, 1, value)
+    The locations and types of all active uniforms are queried once, when the program is created.
+    Every time you set a uniform variable, the shader program will be activated (only if it isn't already in use) and the uniform variable will be set using the cached location:
+        1. glUseProgram(shader)                     (skipped if the program is already in use)
+        2. location = shaderProgram.uniforms["uniform_name"]
+        3. glUniform*(location, 1, value)           (skipped if a scalar uniform already holds the value)
         
     The line
         shaderProgram["scale"] = (2, 2, 2) 
@@ -96,6 +245,13 @@ if __name__ == '__main__':
         location = glGetUniformLocation(shader, "scale")
         glUniform3fv(location, 1, (2, 2, 2))
         
+    Data that is shared by several programs and changes once per frame (e.g. the view and projection matrices) should live in a uniform block instead:
+    
+        frame_data = UniformBuffer(shaderProgram, "FrameData", binding_point=0)
+        otherShaderProgram.bind_uniform_block("FrameData", binding_point=0)
+        
+        frame_data["view_matrix"] = view_mat
+        frame_data.upload()     # (once per frame)
         
     '''
 
@@ -0,0 +1,88 @@
+# Third-party imports.
+import threading
+import time
+import pygame
+
+# Local application imports.
+from constants import SOUND_EFFECTS, SOUND_CHANNELS
+
+class SoundBank:
+    def __init__(self, sound_effects, n_channels):
+        '''
+        This SoundBank class plays every sound effect and the music of the game, from a single mixer.
+
+        The effects are decoded the first time they are played (then cached, as decoded PCM in a `pygame.mixer.Sound`),
+        or ahead of time on a background thread (see `preload`, e.g. for the sounds of a move). They are played on a fixed pool
+        of channels: when every channel is busy, the sound that started first is cut off. The music is streamed from its file
+        by `pygame.mixer.music` (it is never decoded as a whole).
+
+        The mixer is initialized on first use. If it can't be (e.g. there is no audio device), the sound bank is silent.
+
+        :param sound_effects:   name -> (path, volume)
+        :param n_channels:      size of the channel pool
+        '''
+        self.sound_effects = sound_effects
+        self.n_channels = n_channels
+        self.is_initialized = False
+        self.is_enabled = False
+        self.sounds = {} # name -> decoded sound
+        self.lock = threading.Lock() # (Held while a sound is decoded, so the same sound is never decoded twice.)
+        self.channels = []
+        self.channel_start_times = []
+
+    def init(self):
+        ''' Initializes the mixer and the channel pool (once). Returns whether sounds can be played. '''
+        if self.is_initialized: return self.is_enabled
+        self.is_initialized = True
+        try:
+            if not pygame.mixer.get_init(): pygame.mixer.init()
+        except pygame.error as error:
+            print(f"Sound disabled: {error}")
+            return False
+        pygame.mixer.set_num_channels(self.n_channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.n_channels)]
+        self.channel_start_times = [0.0] * self.n_channels
+        self.is_enabled = True
+        return True
+
+    # ~ Effects
+    def get(self, name):
+        ''' Returns the decoded sound effect `name` (decoded on first use), or None if sound is disabled. '''
+        sound = self.sounds.get(name)
+        if sound is not None or not self.init(): return sound
+        with self.lock:
+            if name not in self.sounds:
+                path, volume = self.sound_effects[name]
+                sound = pygame.mixer.Sound(path)
+                sound.set_volume(volume)
+                self.sounds[name] = sound
+            return self.sounds[name]
+
+    def preload(self, names):
+        ''' Decodes the given sound effects on a background thread (so they play right away the first time). '''
+        if not self.init(): return
+        thread = threading.Thread(target=lambda: [self.get(name) for name in names], name="sound-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def play(self, name):
+        ''' Plays the sound effect `name` on a free channel of the pool (or on the one whose sound started first). '''
+        sound = self.get(name)
+        if sound is None: return
+        busy_channels = [channel.get_busy() for channel in self.channels]
+        i = busy_channels.index(False) if False in busy_channels else min(range(self.n_channels), key=self.channel_start_times.__getitem__)
+        self.channels[i].play(sound)
+        self.channel_start_times[i] = time.perf_counter()
+
+    # ~ Music
+    def play_music(self, path, volume, loops=-1):
+        ''' Streams a music file (looped forever by default). '''
+        if not self.init(): return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
+
+    def stop_music(self):
+        if self.is_enabled: pygame.mixer.music.stop()
+
+sound_bank = SoundBank(SOUND_EFFECTS, SOUND_CHANNELS)
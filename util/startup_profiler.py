@@ -0,0 +1,101 @@
+# Third-party imports.
+# (Only the standard library: this module is imported first, so it can time every other import.)
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    def __init__(self):
+        '''
+        This StartupProfiler class times the startup of the game, from launch to the first presented frame (see `finish`).
+
+        The time is broken down by phase (see `phase`, phases can nest) and by imported module: while it is enabled,
+        every first import of a module (on the main thread) is timed, with and without the modules it imports in turn
+        (i.e. "self" and "cumulative" time, like `python -X importtime`).
+
+        It is disabled by default (enable it with `python -m main -profile-startup`), so the phases cost next to nothing.
+        '''
+        self.start_time = time.perf_counter() # (Launch: this module is the first one `main` imports.)
+        self.enabled = False
+        self.is_finished = False
+        self.phases = [] # [name, depth, duration] in the order they started
+        self.phase_depth = 0
+        self.modules = {} # name -> (self duration, cumulative duration)
+        self.import_stack = [] # [name, duration of the nested imports] of the imports in progress
+        self.original_import = None
+        self.thread_id = threading.get_ident()
+
+    def enable(self):
+        self.enabled = True
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        ''' Replaces `builtins.__import__` while enabled: times the first import of each module. '''
+        module_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__')) if level else name
+        if module_name in sys.modules or threading.get_ident() != self.thread_id:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        entry = [module_name, 0.0]
+        self.import_stack.append(entry)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.perf_counter() - start
+            self.import_stack.pop()
+            if self.import_stack: self.import_stack[-1][1] += duration
+            self.modules[module_name] = (duration - entry[1], duration)
+
+    @contextmanager
+    def phase(self, name):
+        ''' Times the enclosed code as the startup phase `name` (ignored once the first frame was presented). '''
+        if not self.enabled or self.is_finished:
+            yield
+            return
+
+        entry = [name, self.phase_depth, 0.0]
+        self.phases.append(entry)
+        self.phase_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[2] = time.perf_counter() - start
+            self.phase_depth -= 1
+
+    def finish(self):
+        ''' Ends the startup (call once the first frame was presented): prints the report if enabled. '''
+        if self.is_finished: return
+        self.is_finished = True
+        if not self.enabled: return
+        self.total_time = time.perf_counter() - self.start_time
+        builtins.__import__ = self.original_import
+        print(self.report())
+
+    def report(self, max_modules=15):
+        ''' Returns the breakdown of the startup (in ms): the phases, then the packages and modules that took the longest to import. '''
+        lines = [f"Startup: {self.total_time * 1000:.1f} ms from launch to the first frame"]
+        lines.append("  Phases:")
+        for name, depth, duration in self.phases:
+            lines.append(f"    {'  ' * depth}{name:<{44 - 2 * depth}} {duration * 1000:8.1f} ms")
+
+        # (The self time of every module of a package, e.g. `OpenGL.GL.VERSION.GL_1_1` counts towards `OpenGL`.)
+        packages = {}
+        for name, (self_duration, _) in self.modules.items():
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0.0) + self_duration
+        lines.append(f"  Imports by package ({len(self.modules)} modules, {sum(packages.values()) * 1000:.1f} ms):")
+        for package, duration in sorted(packages.items(), key=lambda item: -item[1])[:max_modules]:
+            lines.append(f"    {package:<44} {duration * 1000:8.1f} ms")
+
+        lines.append("  Slowest modules (self / cumulative):")
+        for name, (self_duration, cumulative_duration) in sorted(self.modules.items(), key=lambda item: -item[1][0])[:max_modules]:
+            lines.append(f"    {name:<44} {self_duration * 1000:8.1f} / {cumulative_duration * 1000:.1f} ms")
+        return "\n".join(lines)
+
+# The startup profiler shared by `main` and the setup of the scene (see `graphics.graphics_3d.setup_3d_scene`).
+startup_profiler = StartupProfiler()